@@ -0,0 +1,50 @@
+"""
+Columnar snapshot of published blog posts for PostListView.
+
+Mirrors the ORM filters in views.py; see apps.core.catalogue for the engine.
+"""
+import numpy as np
+
+from apps.core.catalogue import Catalogue, build_bitsets, encode
+
+from .models import BlogPost
+
+
+class PostCatalogue(Catalogue):
+    """Published posts as NumPy columns, in the default (-is_featured, -published_at) order."""
+
+    def build(self):
+        from apps.core.models import UniversalTag
+        from apps.team.models import TeamMember
+
+        rows = list(
+            BlogPost.objects.filter(status="published")
+            .order_by("-is_featured", "-published_at")
+            .values_list("id", "content_type", "author_id")
+        )
+        ids, content_types, authors = zip(*rows) if rows else ([],) * 3
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.content_type, self.content_type_codes = encode(content_types, BlogPost.CONTENT_TYPE_CHOICES)
+        self.author = np.array([author or 0 for author in authors], dtype=np.int64)
+
+        self.author_ids = dict(TeamMember.objects.values_list("slug", "id"))
+        self.tag_ids = dict(UniversalTag.objects.values_list("slug", "id"))
+        self.tags, self.tag_bits = build_bitsets(
+            self.ids,
+            BlogPost.related_tags.through.objects.filter(blogpost__status="published").values_list(
+                "blogpost_id", "universaltag_id"
+            ),
+            list(self.tag_ids.values()),
+        )
+
+    def query(self, params):
+        """Evaluate listing params (tag, type, author) and return ordered ids."""
+        mask = self.all_rows()
+        if params.get("tag"):
+            mask &= self.bit_mask(self.tags, self.tag_bits, self.tag_ids.get(params["tag"]))
+        if params.get("type"):
+            mask &= self.code_mask(self.content_type, self.content_type_codes, params["type"])
+        if params.get("author"):
+            mask &= self.author == self.author_ids.get(params["author"], -1)
+        return self.ordered_ids(mask)
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0002_alter_blogcategory_options_and_more"),
+        ("core", "0005_public_indexes"),
+        ("team", "0002_public_indexes"),
+        ("trips", "0005_public_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="blogpost",
+            index=models.Index(
+                condition=models.Q(("status", "published")),
+                fields=["-is_featured", "-published_at", "slug", "updated_at"],
+                name="post_pub_featured_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blogpost",
+            index=models.Index(
+                condition=models.Q(("status", "published")),
+                fields=["content_type", "-is_featured", "-published_at"],
+                name="post_pub_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blogpost",
+            index=models.Index(
+                condition=models.Q(("status", "published")),
+                fields=["region", "-is_featured", "-published_at"],
+                name="post_pub_region_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blogpost",
+            index=models.Index(
+                condition=models.Q(("status", "published")),
+                fields=["author", "-is_featured", "-published_at"],
+                name="post_pub_author_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0003_public_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="content_html",
+            field=models.TextField(blank=True, editable=False, help_text="content with responsive images (see apps.core.richcontent)"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_rich_content_html'),
+        ('core', '0006_job'),
+        ('team', '0002_public_indexes'),
+        ('trips', '0008_rich_content_html'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blogpost',
+            name='post_pub_featured_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-is_featured', '-published_at'], name='post_pub_featured_idx'),
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.db import models
 from django.urls import reverse
 from django.utils import timezone
 
+from apps.core import richcontent
+
 
 class BlogCategory(models.Model):
     """Optional hierarchical categories for blog posts."""
@@ -24,6 +26,10 @@ class BlogCategory(models.Model):
         return self.name
 
 
+class BlogPostQuerySet(richcontent.RichContentQuerySetMixin, models.QuerySet):
+    pass
+
+
 class BlogPost(models.Model):
     """
     Content marketing posts.
@@ -55,6 +61,9 @@ class BlogPost(models.Model):
     slug = models.SlugField(max_length=220, unique=True, db_index=True)
     excerpt = models.TextField(max_length=300, help_text="Brief summary for listings and social sharing")
     content = models.TextField(help_text="Main content (HTML supported)")
+    content_html = models.TextField(
+        blank=True, editable=False, help_text="content with responsive images (see apps.core.richcontent)"
+    )
     content_type = models.CharField(max_length=20, choices=CONTENT_TYPE_CHOICES, default="guide")
 
     # CONTENT INJECTION - Explicit trip links
@@ -113,10 +122,36 @@ class BlogPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BlogPostQuerySet.as_manager()
+
     class Meta:
         ordering = ["-is_featured", "-published_at"]
         verbose_name = "Blog Post"
         verbose_name_plural = "Blog Posts"
+        # Partial indexes over published posts, one per public filter/sort.
+        # The first index also serves the sitemap's order.
+        indexes = [
+            models.Index(
+                fields=["-is_featured", "-published_at"],
+                condition=models.Q(status="published"),
+                name="post_pub_featured_idx",
+            ),
+            models.Index(
+                fields=["content_type", "-is_featured", "-published_at"],
+                condition=models.Q(status="published"),
+                name="post_pub_type_idx",
+            ),
+            models.Index(
+                fields=["region", "-is_featured", "-published_at"],
+                condition=models.Q(status="published"),
+                name="post_pub_region_idx",
+            ),
+            models.Index(
+                fields=["author", "-is_featured", "-published_at"],
+                condition=models.Q(status="published"),
+                name="post_pub_author_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -132,6 +167,9 @@ class BlogPost(models.Model):
         if self.status == "published" and not self.published_at:
             self.published_at = timezone.now()
 
+        richcontent.render(self)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = richcontent.with_html_fields("content.BlogPost", kwargs["update_fields"])
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -2,6 +2,8 @@
 from django.db.models import Q
 from django.views.generic import DetailView, ListView
 
+from apps.core.catalogue import CatalogueRows, get_catalogue
+
 from .models import BlogCategory, BlogPost
 
 
@@ -14,6 +16,17 @@ class PostListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
+        from .catalogue import PostCatalogue
+
+        # Serve filters and ordering from the in-memory catalogue when enabled;
+        # only the current page is then loaded. Search uses the ORM.
+        catalogue = get_catalogue(PostCatalogue)
+        if catalogue is not None and not self.request.GET.get("q"):
+            return CatalogueRows(
+                BlogPost.objects.filter(status="published").select_related("author", "region"),
+                catalogue.query(self.request.GET),
+            )
+
         queryset = BlogPost.objects.filter(status="published").select_related("author", "region")
 
         # Filter by tag
@@ -44,7 +57,7 @@ class PostListView(ListView):
         context = super().get_context_data(**kwargs)
         from apps.core.models import UniversalTag
 
-        context["tags"] = UniversalTag.objects.filter(blogposts__status="published").distinct()[:15]
+        context["tags"] = UniversalTag.objects.filter(blogposts__status="published").distinct().cached()[:15]
         context["content_types"] = BlogPost.CONTENT_TYPE_CHOICES
         return context
 
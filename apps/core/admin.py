@@ -1,9 +1,11 @@
 """Admin configuration for Core app with Django Unfold."""
 from django.contrib import admin
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin
 
-from .models import Region, SiteConfiguration, UniversalTag
+from .models import Job, Region, SiteConfiguration, UniversalTag
 
 
 @admin.register(UniversalTag)
@@ -215,3 +217,127 @@ class SiteConfigurationAdmin(ModelAdmin):
             },
         ),
     ]
+
+
+# Request profiles (apps.core.profiling), browsable by staff at /admin/profiles/
+
+
+def profile_list_view(request):
+    from django.shortcuts import render
+
+    from .profiling import list_profiles
+
+    context = {**admin.site.each_context(request), "title": "Request profiles", "profiles": list_profiles()}
+    return render(request, "admin/profiles/profile_list.html", context)
+
+
+def profile_detail_view(request, profile_id):
+    from django.http import Http404
+    from django.shortcuts import render
+
+    from .profiling import load_profile
+
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise Http404("Profile not found")
+    context = {**admin.site.each_context(request), "title": f"Profile {profile_id}", "profile": profile}
+    return render(request, "admin/profiles/profile_detail.html", context)
+
+
+def profile_download_view(request, profile_id):
+    from django.http import FileResponse, Http404
+
+    from .profiling import get_profile_dir, load_profile
+
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise Http404("Profile not found")
+    path = get_profile_dir() / profile["raw_file"]
+    if not path.exists():
+        raise Http404("Profile file not found")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
+
+
+# Per-worker memory diagnostics (apps.core.diagnostics) at /admin/memory/
+
+
+def memory_view(request):
+    """
+    This worker's memory snapshot, saved snapshots from every worker, and
+    the diff of two saved snapshots (?a=<id>&b=<id>). POST saves a snapshot
+    of the worker serving the request; ?format=json returns the current one.
+    """
+    from django.http import Http404, JsonResponse
+    from django.shortcuts import redirect, render
+
+    from . import diagnostics
+
+    if request.method == "POST":
+        snapshot = diagnostics.take_snapshot(label=request.POST.get("label", "")[:100])
+        diagnostics.save_snapshot(snapshot)
+        return redirect("admin:memory")
+
+    snapshot = diagnostics.take_snapshot()
+    if request.GET.get("format") == "json":
+        return JsonResponse(snapshot)
+
+    diff = None
+    if request.GET.get("a") and request.GET.get("b"):
+        old, new = diagnostics.load_snapshot(request.GET["a"]), diagnostics.load_snapshot(request.GET["b"])
+        if old is None or new is None:
+            raise Http404("Snapshot not found")
+        diff = {"old": old, "new": new, **diagnostics.diff_snapshots(old, new)}
+
+    if snapshot["allocations"] is not None:
+        snapshot["allocations"] = snapshot["allocations"][: diagnostics.TOP_ALLOCATIONS]
+    context = {
+        **admin.site.each_context(request),
+        "title": "Memory diagnostics",
+        "snapshot": snapshot,
+        "snapshots": diagnostics.list_snapshots(),
+        "diff": diff,
+    }
+    return render(request, "admin/memory/memory.html", context)
+
+
+def get_admin_urls(get_urls=admin.site.get_urls):
+    from django.urls import path
+
+    return [
+        path("profiles/", admin.site.admin_view(profile_list_view), name="profiles"),
+        path("profiles/<str:profile_id>/", admin.site.admin_view(profile_detail_view), name="profile_detail"),
+        path(
+            "profiles/<str:profile_id>/download/",
+            admin.site.admin_view(profile_download_view),
+            name="profile_download",
+        ),
+        path("memory/", admin.site.admin_view(memory_view), name="memory"),
+    ] + get_urls()
+
+
+admin.site.get_urls = get_admin_urls
+
+
+@admin.register(Job)
+class JobAdmin(ModelAdmin):
+    """Admin configuration for background jobs (see apps.core.jobs)."""
+
+    list_display = ["name", "key", "status", "priority", "run_at", "attempts", "locked_by", "finished_at"]
+    list_filter = ["status", "name"]
+    search_fields = ["name", "key", "last_error"]
+    readonly_fields = ["locked_by", "locked_at", "created_at", "finished_at", "last_error"]
+    actions = ["retry"]
+
+    @admin.action(description="Retry selected failed jobs now")
+    def retry(self, request, queryset):
+        updated = 0
+        for job in queryset.filter(status=Job.FAILED):
+            try:
+                with transaction.atomic():
+                    Job.objects.filter(pk=job.pk).update(
+                        status=Job.QUEUED, run_at=timezone.now(), attempts=0, finished_at=None
+                    )
+            except IntegrityError:  # a job with the same key is already queued
+                continue
+            updated += 1
+        self.message_user(request, f"Requeued {updated} jobs.")
@@ -6,3 +6,11 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
     verbose_name = "Core (Tags & Regions)"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .diagnostics import start_tracing
+        from .querycache import connect_signals
+
+        start_tracing()
+        connect_signals()
@@ -0,0 +1,151 @@
+"""
+In-memory columnar catalogue engine.
+
+Keeps a per-process, read-only snapshot of the published catalogue as
+NumPy columns (one array per attribute, rows in the default listing order)
+plus bitsets for many-to-many tags. Listing views evaluate filters, sorts,
+facets and pagination against the snapshot and only go to the database
+for the rows on the requested page.
+
+Snapshots are rebuilt when the content version changes (see
+apps.core.versioning) or after MAX_AGE seconds, whichever comes first.
+The age limit bounds staleness when the cache is per-process (LocMemCache)
+and a write happened in another worker.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .versioning import get_content_version
+
+MAX_AGE = 300  # 5 minutes
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def get_catalogue(catalogue_class):
+    """
+    Return an up-to-date snapshot of catalogue_class for this process.
+
+    Returns None when CATALOGUE_ENGINE_ENABLED is off, so callers can fall
+    back to the ORM.
+    """
+    if not getattr(settings, "CATALOGUE_ENGINE_ENABLED", False):
+        return None
+
+    version = get_content_version()
+    snapshot = _snapshots.get(catalogue_class)
+    if snapshot is None or snapshot.is_stale(version):
+        with _lock:
+            snapshot = _snapshots.get(catalogue_class)
+            if snapshot is None or snapshot.is_stale(version):
+                snapshot = catalogue_class(version)
+                _snapshots[catalogue_class] = snapshot
+    return snapshot
+
+
+def encode(values, choices):
+    """Encode string values as int8 codes of their position in choices (-1 if unknown)."""
+    codes = {value: i for i, (value, _label) in enumerate(choices)}
+    return np.array([codes.get(value, -1) for value in values], dtype=np.int8), codes
+
+
+def build_bitsets(ids, pairs, member_ids):
+    """
+    Build an (len(ids), words) uint64 matrix with one bit per member.
+
+    pairs is an iterable of (row id, member id), e.g. rows of an M2M
+    through table. Returns the matrix and a {member id: bit} map.
+    """
+    bit_for = {member_id: i for i, member_id in enumerate(member_ids)}
+    row_for = {row_id: i for i, row_id in enumerate(ids.tolist())}
+    rows, bits = [], []
+    for row_id, member_id in pairs:
+        if row_id in row_for and member_id in bit_for:
+            rows.append(row_for[row_id])
+            bits.append(bit_for[member_id])
+
+    matrix = np.zeros((len(ids), max(1, (len(member_ids) + 63) // 64)), dtype=np.uint64)
+    if rows:
+        bits = np.array(bits, dtype=np.uint64)
+        words = (bits >> np.uint64(6)).astype(np.intp)
+        np.bitwise_or.at(matrix, (np.array(rows), words), np.uint64(1) << (bits & np.uint64(63)))
+    return matrix, bit_for
+
+
+def has_bit(matrix, bit):
+    """Boolean mask of rows whose bitset contains bit."""
+    return (matrix[:, bit >> 6] & np.uint64(1 << (bit & 63))) != 0
+
+
+class Catalogue:
+    """
+    Base class for columnar snapshots.
+
+    Subclasses implement build() to load their columns; instances are
+    immutable afterwards and shared between threads.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.build()
+
+    def build(self):
+        raise NotImplementedError
+
+    def is_stale(self, version):
+        return version != self.version or time.monotonic() - self.built_at > MAX_AGE
+
+    def all_rows(self):
+        return np.ones(len(self.ids), dtype=bool)
+
+    def code_mask(self, column, codes, value):
+        """Rows where an encoded column equals value (no rows if value is unknown)."""
+        if value not in codes:
+            return np.zeros(len(self.ids), dtype=bool)
+        return column == codes[value]
+
+    def bit_mask(self, matrix, bit_for, member_id):
+        """Rows whose bitset contains member_id (no rows if it is unknown)."""
+        if member_id not in bit_for:
+            return np.zeros(len(self.ids), dtype=bool)
+        return has_bit(matrix, bit_for[member_id])
+
+    def ordered_ids(self, mask, ordering=None):
+        """Ids of matching rows, in default order or by a precomputed permutation."""
+        if ordering is None:
+            return self.ids[mask]
+        return self.ids[ordering[mask[ordering]]]
+
+
+class CatalogueRows:
+    """
+    Lazy sequence of model instances for an ordered array of ids.
+
+    Paginator slices it, so only the requested page is fetched, by primary
+    key, in a single query. Pass the published queryset: a snapshot can be
+    up to MAX_AGE old in other processes, and ids it no longer matches
+    (unpublished or deleted since) are skipped, or None for a single index.
+    """
+
+    def __init__(self, queryset, ids):
+        self.queryset = queryset
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, key):
+        ids = self.ids[key].tolist() if isinstance(key, slice) else [int(self.ids[key])]
+        objects = self.queryset.in_bulk(ids)
+        rows = [objects[pk] for pk in ids if pk in objects]
+        if isinstance(key, slice):
+            return rows
+        return rows[0] if rows else None
+
+    def __iter__(self):
+        return iter(self[:])
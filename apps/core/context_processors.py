@@ -3,6 +3,14 @@ Context processors for the core app.
 
 Provides site configuration to all templates.
 """
+from types import MappingProxyType
+
+from django.conf import settings
+
+from . import theme
+
+# (site pk, site config pk) -> (config updated_at, frozen context)
+_contexts = {}
 
 
 def site_config(request):
@@ -12,12 +20,26 @@ def site_config(request):
     Makes site_config available in all templates:
     - {{ site_config.brand_name }}
     - {{ site_config.logo.url }}
-    - {{ site_config.primary_color }}
+    - {{ theme_css_url }}
     etc.
+
+    The context is built once per site and configuration version and
+    shared (read-only) by every request until the configuration is saved.
     """
     config = getattr(request, "site_config", None)
     site = getattr(request, "site", None)
+    key = (getattr(site, "pk", None), getattr(config, "pk", None))
+    version = getattr(config, "updated_at", None)
 
+    cached = _contexts.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, MappingProxyType(build_site_context(config, site)))
+        _contexts[key] = cached
+    return cached[1]
+
+
+def build_site_context(config, site):
+    """Return the branding context for a site configuration (None for defaults)."""
     # Default values for whitelabeling
     defaults = {
         "site_config": config,
@@ -29,9 +51,9 @@ def site_config(request):
         "hero_subtitle": "Experience the majesty of the Himalayas with expert-led adventures.",
         "hero_cta_text": "Explore Trips",
         "footer_description": "Expert-led adventures through the world's most majestic mountain ranges.",
-        "primary_color": "#0d9488",
-        "secondary_color": "#0f766e",
-        "accent_color": "#f59e0b",
+        **theme.theme_colors(config),
+        "theme_css_url": theme.theme_css_url(config),
+        "assets_pipeline": settings.ASSETS_PIPELINE,
     }
 
     # If no config, return defaults
@@ -40,8 +62,7 @@ def site_config(request):
 
     # Override with config values
     return {
-        "site_config": config,
-        "current_site": site,
+        **defaults,
         "brand_name": config.brand_name,
         "tagline": config.tagline or defaults["tagline"],
         "title_suffix": config.title_suffix or f" | {config.brand_name}",
@@ -49,7 +70,4 @@ def site_config(request):
         "hero_subtitle": config.hero_subtitle or defaults["hero_subtitle"],
         "hero_cta_text": config.hero_cta_text or defaults["hero_cta_text"],
         "footer_description": config.footer_description or config.tagline or defaults["footer_description"],
-        "primary_color": config.primary_color or defaults["primary_color"],
-        "secondary_color": config.secondary_color or defaults["secondary_color"],
-        "accent_color": config.accent_color or defaults["accent_color"],
     }
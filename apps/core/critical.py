@@ -0,0 +1,258 @@
+"""
+Critical (above-the-fold) CSS per page template.
+
+build_assets extracts, for each template in PAGES, the rules of the built
+stylesheets (dist/fonts.css and dist/tailwind.css) that the top of the page
+can use, and writes them to static/dist/critical/ with a manifest:
+
+    dist/critical/manifest.json          {"stylesheet": <hash>, "pages": {template: file}}
+    dist/critical/home-<hash>.css
+
+The top of a page is the base template outside its content block, up to
+</main> (the navigation), plus the page's content block up to a
+{# fold #} comment (all of it without one), plus every partial that part
+includes or renders with {% cards %}. Like Tailwind's own purge, any token
+in that source counts as a class, so conditional classes are kept too.
+
+The {% critical_css %} tag (templatetags/critical_css.py) inlines the file
+for the template being rendered, with its url()s turned into static URLs,
+and loads the full stylesheet without blocking rendering. Files are named
+by the hash of the stylesheets they were extracted from; if the stylesheets change without a rebuild of the
+critical CSS, the manifest no longer matches and pages fall back to the
+render-blocking stylesheet.
+"""
+import hashlib
+import json
+import logging
+import posixpath
+import re
+from functools import cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template import engines
+from django.templatetags.static import static
+
+logger = logging.getLogger(__name__)
+
+CRITICAL_DIR = "dist/critical"
+MANIFEST = f"{CRITICAL_DIR}/manifest.json"
+STYLESHEETS = ["dist/fonts.css", "dist/tailwind.css"]
+
+# Page template -> file name prefix
+PAGES = {
+    "core/home.html": "home",
+    "trips/trip_detail.html": "trip-detail",
+    "content/post_detail.html": "post-detail",
+    "trips/trip_list.html": "trip-list",
+    "trips/heli_list.html": "heli-list",
+    "content/post_list.html": "post-list",
+    "glossary/term_list.html": "term-list",
+    "core/region_list.html": "region-list",
+    "core/tag_list.html": "tag-list",
+    "team/member_list.html": "member-list",
+}
+
+FOLD = "{# fold #}"
+
+EXTENDS_RE = re.compile(r"{%\s*extends\s+[\"']([^\"']+)[\"']\s*%}")
+CONTENT_BLOCK_RE = re.compile(r"{%\s*block\s+content\s*%}(.*?){%\s*endblock(?:\s+content)?\s*%}", re.S)
+PARTIAL_RE = re.compile(r"{%\s*(?:include|cards)\s+[\"']([^\"']+)[\"']")
+TOKEN_RE = re.compile(r"[^\s\"'`<>={}]+")
+CLASS_RE = re.compile(r"\.((?:\\[0-9a-fA-F]{1,6} ?|\\.|[\w-])+)")
+ESCAPE_RE = re.compile(r"\\(?:([0-9a-fA-F]{1,6}) ?|(.))")
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+URL_RE = re.compile(r"url\(\s*([\"']?)([^\"')]+)\1\s*\)")
+
+
+def stylesheet_hash(css):
+    return hashlib.md5(css.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def read_stylesheets():
+    """Return the concatenated built stylesheets, or None if they haven't been built."""
+    paths = [finders.find(name) for name in STYLESHEETS]
+    if not all(paths):
+        return None
+    return "\n".join(open(path, encoding="utf-8").read() for path in paths)
+
+
+# Extraction (build time)
+
+
+def template_source(name):
+    return engines["django"].get_template(name).template.source
+
+
+def above_the_fold(name):
+    """Return the template source that renders the top of the page."""
+    source = template_source(name)
+    match = CONTENT_BLOCK_RE.search(source)
+    content = match.group(1) if match else source
+    parts = [content.split(FOLD, 1)[0]]
+
+    parent = EXTENDS_RE.search(source)
+    while parent:
+        parent_source = template_source(parent.group(1))
+        parts.append(CONTENT_BLOCK_RE.sub("", parent_source).split("</main>", 1)[0])
+        parent = EXTENDS_RE.search(parent_source)
+
+    seen = set()
+    pending = [name for part in parts for name in PARTIAL_RE.findall(part)]
+    while pending:
+        partial = pending.pop()
+        if partial not in seen:
+            seen.add(partial)
+            parts.append(template_source(partial))
+            pending.extend(PARTIAL_RE.findall(parts[-1]))
+    return "\n".join(parts)
+
+
+def used_tokens(source):
+    """Every candidate class name in source (over-inclusive, like Tailwind's content scan)."""
+    tokens = set()
+    for token in TOKEN_RE.findall(source):
+        tokens.add(token)
+        tokens.add(token.rstrip(":,;"))
+    return tokens
+
+
+def unescape(identifier):
+    """Decode CSS escapes: .md\\:flex -> md:flex, .\\32xl\\:px-8 -> 2xl:px-8."""
+    return ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)) if m.group(1) else m.group(2), identifier)
+
+
+def split_selectors(prelude):
+    """Split a selector list on top-level commas."""
+    selectors, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return [selector.strip() for selector in selectors if selector.strip()]
+
+
+def parse_blocks(css):
+    """Yield (prelude, body) for each top-level block of css."""
+    i, length = 0, len(css)
+    while i < length:
+        open_brace = css.find("{", i)
+        if open_brace == -1:
+            return
+        depth, j, quote = 1, open_brace + 1, None
+        while j < length and depth:
+            char = css[j]
+            if quote:
+                if char == "\\":
+                    j += 1
+                elif char == quote:
+                    quote = None
+            elif char in "\"'":
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+            j += 1
+        yield css[i:open_brace].strip(), css[open_brace + 1 : j - 1]
+        i = j
+
+
+def is_absolute(url):
+    return url.startswith(("data:", "http:", "https:", "/", "#"))
+
+
+def rebase_url(match):
+    """Make a url() relative to dist/ (as in the stylesheets) relative to CRITICAL_DIR."""
+    url = match.group(2)
+    if is_absolute(url):
+        return match.group(0)
+    path = posixpath.normpath(posixpath.join(posixpath.dirname(STYLESHEETS[0]), url))
+    return f'url("{posixpath.relpath(path, CRITICAL_DIR)}")'
+
+
+def filter_css(css, tokens):
+    """Return the rules of css whose selectors only use classes in tokens."""
+    out = []
+    for prelude, body in parse_blocks(COMMENT_RE.sub("", css)):
+        if prelude.startswith("@"):
+            if prelude.startswith(("@media", "@supports", "@layer", "@container")):
+                inner = filter_css(body, tokens)
+                if inner:
+                    out.append(f"{prelude}{{{inner}}}")
+            else:  # @font-face, @keyframes, @property, @page
+                out.append(f"{prelude}{{{body}}}")
+            continue
+        selectors = [
+            selector
+            for selector in split_selectors(prelude)
+            if all(unescape(name) in tokens for name in CLASS_RE.findall(selector))
+        ]
+        if selectors:
+            out.append(f"{','.join(selectors)}{{{body}}}")
+    return "".join(out)
+
+
+def build(output_dir):
+    """Write the critical CSS of every page in PAGES and the manifest to output_dir; return {template: bytes}."""
+    css = read_stylesheets()
+    if css is None:
+        raise FileNotFoundError(f"Build {' and '.join(STYLESHEETS)} first")
+    digest = stylesheet_hash(css)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob("*.css"):
+        stale.unlink()
+
+    pages, sizes = {}, {}
+    for name, prefix in PAGES.items():
+        critical = URL_RE.sub(rebase_url, filter_css(css, used_tokens(above_the_fold(name))))
+        filename = f"{prefix}-{digest}.css"
+        (output_dir / filename).write_text(critical, encoding="utf-8")
+        pages[name] = f"{CRITICAL_DIR}/{filename}"
+        sizes[name] = len(critical.encode())
+    (output_dir / "manifest.json").write_text(json.dumps({"stylesheet": digest, "pages": pages}, indent=2) + "\n")
+    return sizes
+
+
+# Lookup (request time)
+
+
+@cache
+def load_manifest():
+    """Return {template: critical CSS} if the manifest matches the built stylesheets, else {}."""
+    path = finders.find(MANIFEST)
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    css = read_stylesheets()
+    if css is None or stylesheet_hash(css) != manifest["stylesheet"]:
+        logger.warning("Critical CSS is stale (stylesheets changed since build_assets); not inlining it")
+        return {}
+    pages = {}
+    for name, critical in manifest["pages"].items():
+        critical_path = finders.find(critical)
+        if critical_path:
+            with open(critical_path, encoding="utf-8") as f:
+                pages[name] = URL_RE.sub(static_url, f.read())
+    return pages
+
+
+def static_url(match):
+    """Point a url() that is relative to CRITICAL_DIR at its static URL, for inlining."""
+    url = match.group(2)
+    if is_absolute(url):
+        return match.group(0)
+    return f'url("{static(posixpath.normpath(posixpath.join(CRITICAL_DIR, url)))}")'
+
+
+def critical_css(template_name):
+    """Return the critical CSS for a page template, or None."""
+    if not getattr(settings, "CRITICAL_CSS_ENABLED", True):
+        return None
+    return load_manifest().get(template_name)
@@ -0,0 +1,251 @@
+"""
+Per-process memory diagnostics.
+
+take_snapshot() reports, for the current worker process: RSS, the
+tracemalloc top allocators (when tracing, see MEMORY_TRACEMALLOC), Django
+cache entry counts and sizes by key prefix (LocMemCache only, other
+backends are shared and not per-process), and the size of in-process
+caches: glossary terms, site configurations, catalogue snapshots and
+metrics series.
+
+Snapshots are plain dicts, saved as JSON to MEMORY_SNAPSHOT_DIR with
+save_snapshot() so every gunicorn worker's footprint can be compared, and
+diff_snapshots() compares two of them to find leaks. Staff view them at
+/admin/memory/; the memory_report command does the same from a shell.
+"""
+import json
+import os
+import re
+import sys
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+TOP_ALLOCATIONS = 25
+MAX_ALLOCATION_LINES = 2000  # kept per snapshot for diffing
+
+SNAPSHOT_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9]+-[0-9a-f]{8}$")
+
+
+def get_snapshot_dir():
+    return Path(getattr(settings, "MEMORY_SNAPSHOT_DIR", Path(settings.BASE_DIR) / "var" / "memory"))
+
+
+def start_tracing():
+    """Start tracemalloc if MEMORY_TRACEMALLOC frames are configured (called at startup)."""
+    frames = getattr(settings, "MEMORY_TRACEMALLOC", 0)
+    if frames and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def rss_bytes(pid=None):
+    """Resident set size of a process (default: this one), or None if unavailable."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is None:
+        import resource
+
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def deep_size(obj, seen=None):
+    """Approximate bytes held by obj and everything it references (NumPy arrays by nbytes)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = getattr(obj, "nbytes", None)
+    if isinstance(size, int):
+        return size + sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, list | tuple | set | frozenset):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def _key_prefix(key):
+    """Group cache keys by their first segment, e.g. ":1:site_config:host" -> "site_config"."""
+    parts = key.split(":")
+    name = parts[2] if len(parts) > 2 and parts[0] == "" else parts[0]
+    # Page cache keys embed a URL hash; keep only e.g. "views.decorators.cache.cache_page"
+    return ".".join(name.split(".")[:4]) if name.startswith("views.decorators.cache") else name
+
+
+def cache_stats():
+    """Return {alias: {"backend", "entries", "bytes", "prefixes": {prefix: [entries, bytes]}}}."""
+    from django.core.cache import caches
+    from django.core.cache.backends.locmem import LocMemCache
+
+    stats = {}
+    for alias in settings.CACHES:
+        backend = caches[alias]
+        entry = {"backend": type(backend).__name__, "entries": None, "bytes": None, "prefixes": {}}
+        if isinstance(backend, LocMemCache):
+            with backend._lock:
+                items = list(backend._cache.items())
+            entry["entries"] = len(items)
+            entry["bytes"] = sum(len(value) for _key, value in items)
+            for key, value in items:
+                prefix = entry["prefixes"].setdefault(_key_prefix(key), [0, 0])
+                prefix[0] += 1
+                prefix[1] += len(value)
+        stats[alias] = entry
+    return stats
+
+
+def in_process_caches():
+    """Return {name: {"entries", "bytes"}} for the app's in-process caches."""
+    from django.core.cache import caches
+    from django.core.cache.backends.locmem import LocMemCache
+
+    from apps.glossary.middleware import GlossaryAutoLinkerMiddleware
+
+    from . import catalogue, context_processors, metrics
+
+    cache = caches["default"]
+    terms = cache.get(GlossaryAutoLinkerMiddleware.CACHE_KEY) or []
+    site_configs = []
+    if isinstance(cache, LocMemCache):
+        # Cached per host by SiteConfigurationMiddleware
+        prefix = cache.make_key("site_config:")
+        with cache._lock:
+            site_configs = [value for key, value in cache._cache.items() if key.startswith(prefix)]
+    return {
+        "glossary_terms": {"entries": len(terms), "bytes": deep_size(terms)},
+        "site_configs": {"entries": len(site_configs), "bytes": sum(len(value) for value in site_configs)},
+        "catalogue_snapshots": {
+            "entries": len(catalogue._snapshots),
+            "bytes": sum(deep_size(snapshot) for snapshot in list(catalogue._snapshots.values())),
+        },
+        "metrics_series": {"entries": len(metrics._series), "bytes": deep_size(dict(metrics._series))},
+        "site_contexts": {
+            "entries": len(context_processors._contexts),
+            "bytes": deep_size([dict(context) for _version, context in list(context_processors._contexts.values())]),
+        },
+    }
+
+
+def allocations(limit=MAX_ALLOCATION_LINES):
+    """Return [[file:line, bytes, count]] largest first, or None when tracemalloc is off."""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+    return [
+        [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size, stat.count]
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def take_snapshot(label=""):
+    """Return a JSON-serialisable memory snapshot of this process."""
+    traced = allocations()
+    return {
+        "id": f"{timezone.now():%Y%m%dT%H%M%S%f}-{os.getpid()}-{uuid.uuid4().hex[:8]}",
+        "label": label,
+        "pid": os.getpid(),
+        "created": timezone.now().isoformat(),
+        "rss": rss_bytes(),
+        "traced_bytes": tracemalloc.get_traced_memory()[0] if traced is not None else None,
+        "caches": cache_stats(),
+        "in_process": in_process_caches(),
+        "allocations": traced,
+    }
+
+
+def save_snapshot(snapshot):
+    """Write a snapshot to MEMORY_SNAPSHOT_DIR/<id>.json; returns the id."""
+    directory = get_snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{snapshot['id']}.json").write_text(json.dumps(snapshot))
+    return snapshot["id"]
+
+
+def list_snapshots():
+    """Return saved snapshots (without allocations) newest first, with each worker's live RSS."""
+    snapshots = []
+    for path in sorted(get_snapshot_dir().glob("*.json"), reverse=True):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        snapshot.pop("allocations", None)
+        snapshot["live_rss"] = rss_bytes(snapshot["pid"])
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def load_snapshot(snapshot_id):
+    """Return a saved snapshot, or None if the id is unknown or malformed."""
+    if not SNAPSHOT_ID_RE.match(snapshot_id):
+        return None
+    path = get_snapshot_dir() / f"{snapshot_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def diff_snapshots(old, new, limit=TOP_ALLOCATIONS):
+    """
+    Compare two snapshots; returns {"rss", "traced_bytes", "caches",
+    "in_process", "allocations"} deltas, with allocations as
+    [[file:line, bytes delta, count delta]] sorted by growth.
+    """
+
+    def delta(a, b):
+        return None if a is None or b is None else b - a
+
+    caches = {}
+    for alias in new["caches"].keys() | old["caches"].keys():
+        before, after = old["caches"].get(alias, {}), new["caches"].get(alias, {})
+        caches[alias] = {
+            "entries": delta(before.get("entries"), after.get("entries")),
+            "bytes": delta(before.get("bytes"), after.get("bytes")),
+        }
+    in_process = {
+        name: {
+            "entries": delta(old["in_process"].get(name, {}).get("entries", 0), stats["entries"]),
+            "bytes": delta(old["in_process"].get(name, {}).get("bytes", 0), stats["bytes"]),
+        }
+        for name, stats in new["in_process"].items()
+    }
+
+    lines = None
+    if old.get("allocations") is not None and new.get("allocations") is not None:
+        before = {line: (size, count) for line, size, count in old["allocations"]}
+        after = {line: (size, count) for line, size, count in new["allocations"]}
+        lines = []
+        for line in before.keys() | after.keys():
+            (old_size, old_count), (new_size, new_count) = before.get(line, (0, 0)), after.get(line, (0, 0))
+            if new_size != old_size:
+                lines.append([line, new_size - old_size, new_count - old_count])
+        lines = sorted(lines, key=lambda line: line[1], reverse=True)[:limit]
+
+    return {
+        "rss": delta(old.get("rss"), new.get("rss")),
+        "traced_bytes": delta(old.get("traced_bytes"), new.get("traced_bytes")),
+        "caches": caches,
+        "in_process": in_process,
+        "allocations": lines,
+    }
@@ -0,0 +1,205 @@
+"""
+Responsive image derivatives for uploaded images.
+
+For every image in IMAGE_FIELDS, generate() writes width-stepped variants
+in AVIF (when Pillow supports it), WebP and a JPEG fallback (PNG for images
+with transparency) next to the original, plus a JSON sidecar describing
+them:
+
+    trips/featured/everest.png
+    trips/featured/everest.png.320w.avif   .320w.webp   .320w.jpg
+    ...
+    trips/featured/everest.png.1920w.avif  .1920w.webp  .1920w.jpg
+    trips/featured/everest.png.json        {"width": 2400, "height": 1350, "widths": [...], ...}
+
+Widths are the WIDTHS smaller than the original, plus the original width
+when it is below the largest step; images are never upscaled. Upload names
+are unique (the storage never overwrites), so variants are immutable.
+
+Saving a model in IMAGE_FIELDS queues a job that generates the variants
+of its new images (see signals.py and tasks.py); backfill_images does it
+for existing uploads. At render time the {% responsive_image %} tag
+(templatetags/images.py) reads the sidecar, cached per name, and emits a
+<picture> with srcset/sizes, the intrinsic width and height and
+loading="lazy". Images without variants are rendered as a plain <img>.
+Images embedded in rich-text fields get the same markup when the content
+is saved (see richcontent.py).
+"""
+import json
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.utils.html import format_html, format_html_join
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (320, 480, 640, 960, 1280, 1920)
+
+# Model label -> ImageFields with derivatives
+IMAGE_FIELDS = {
+    "trips.Trip": ["featured_image"],
+    "trips.TripGalleryImage": ["image"],
+    "content.BlogPost": ["featured_image"],
+    "core.Region": ["featured_image"],
+    "team.TeamMember": ["photo"],
+    "core.SiteConfiguration": ["logo", "hero_image"],
+}
+
+# Format -> (extension, MIME type, Pillow save options)
+FORMATS = {
+    "avif": ("avif", "image/avif", {"quality": 55, "speed": 6}),
+    "webp": ("webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+    "png": ("png", "image/png", {"optimize": True}),
+}
+
+CACHE_PREFIX = "image:"
+MISSING_TIMEOUT = 300  # seconds before an image without variants is looked up again
+
+
+def is_enabled():
+    return getattr(settings, "RESPONSIVE_IMAGES_ENABLED", True)
+
+
+def sidecar_name(name):
+    return f"{name}.json"
+
+
+def variant_name(name, width, fmt):
+    return f"{name}.{width}w.{FORMATS[fmt][0]}"
+
+
+def target_widths(width):
+    widths = [step for step in WIDTHS if step <= width]
+    if width < WIDTHS[-1] and width not in WIDTHS:
+        widths.append(width)
+    return widths or [width]
+
+
+def output_formats(has_alpha):
+    from PIL import features
+
+    formats = ["avif"] if features.check("avif") else []
+    return formats + ["webp", "png" if has_alpha else "jpeg"]
+
+
+def generate(storage, name, force=False):
+    """Write the variants and sidecar of the image `name` in storage; return its info dict."""
+    from PIL import Image, ImageOps
+
+    if not force and storage.exists(sidecar_name(name)):
+        return read_info(storage, name)
+
+    with storage.open(name, "rb") as f:
+        image = Image.open(f)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    info = {
+        "width": image.width,
+        "height": image.height,
+        "widths": target_widths(image.width),
+        "formats": output_formats(has_alpha),
+    }
+    for width in info["widths"]:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in info["formats"]:
+            buffer = BytesIO()
+            resized.save(buffer, format=fmt.upper(), **FORMATS[fmt][2])
+            variant = variant_name(name, width, fmt)
+            if storage.exists(variant):
+                storage.delete(variant)
+            storage.save(variant, ContentFile(buffer.getvalue()))
+
+    if storage.exists(sidecar_name(name)):
+        storage.delete(sidecar_name(name))
+    storage.save(sidecar_name(name), ContentFile(json.dumps(info).encode()))
+    cache.set(CACHE_PREFIX + name, info, None)
+    return info
+
+
+def generate_for_instance(instance, force=False):
+    """Generate the variants of every image of instance (a model in IMAGE_FIELDS)."""
+    for field_name in IMAGE_FIELDS.get(instance._meta.label, []):
+        image = getattr(instance, field_name)
+        if image:
+            try:
+                generate(image.storage, image.name, force=force)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not generate variants of %s: %s", image.name, e)
+
+
+def needs_variants(instance):
+    """True if an image of instance has no variants yet."""
+    for field_name in IMAGE_FIELDS.get(instance._meta.label, []):
+        image = getattr(instance, field_name)
+        if image and not image.storage.exists(sidecar_name(image.name)):
+            return True
+    return False
+
+
+def read_info(storage, name):
+    """Return the sidecar of `name`, or {} if it has no variants."""
+    try:
+        with storage.open(sidecar_name(name)) as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def image_info(image):
+    """Return the cached variant info of an ImageField file ({} if it has none)."""
+    return cached_info(image.storage, image.name)
+
+
+def cached_info(storage, name):
+    key = CACHE_PREFIX + name
+    info = cache.get(key)
+    if info is None:
+        info = read_info(storage, name)
+        cache.set(key, info, None if info else MISSING_TIMEOUT)
+    return info
+
+
+def srcset(storage, name, info, fmt):
+    return ", ".join(f"{storage.url(variant_name(name, width, fmt))} {width}w" for width in info["widths"])
+
+
+def render_picture(image, alt="", sizes="100vw", loading="lazy", **attrs):
+    """Return a <picture> for an ImageField file, or a plain <img> if it has no variants."""
+    info = image_info(image) if is_enabled() else {}
+    img_attrs = {"alt": alt, **attrs, "loading": loading, "decoding": "async"}
+    if not info:
+        return format_html('<img src="{}"{}>', image.url, attributes(img_attrs))
+    return picture(image.storage, image.name, info, sizes, img_attrs)
+
+
+def picture(storage, name, info, sizes, img_attrs):
+    """Return the <picture> for the image `name` with variant info, its <img> having img_attrs."""
+    *modern, fallback = info["formats"]
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[fmt][1], srcset(storage, name, info, fmt), sizes) for fmt in modern),
+    )
+    img_attrs = {
+        **img_attrs,
+        "srcset": srcset(storage, name, info, fallback),
+        "sizes": sizes,
+        "width": info["width"],
+        "height": info["height"],
+    }
+    src = storage.url(variant_name(name, info["widths"][-1], fallback))
+    return format_html('<picture>{}<img src="{}"{}></picture>', sources, src, attributes(img_attrs))
+
+
+def attributes(attrs):
+    return format_html_join(
+        "", ' {}="{}"', ((key.replace("_", "-"), value) for key, value in attrs.items() if value is not None)
+    )
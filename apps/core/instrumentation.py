@@ -0,0 +1,213 @@
+"""
+Per-request performance instrumentation.
+
+RequestMetrics collects SQL, cache, template, glossary-linker and
+site-resolution timings for the current request. PerformanceInstrumentation-
+Middleware (apps.core.middleware) creates one per request and reports it as
+a Server-Timing header and a structured log line; MetricsMiddleware feeds
+the same counters into apps.core.metrics.
+
+When PERFORMANCE_INSTRUMENTATION and METRICS_ENABLED are off both
+middleware remove themselves, no wrappers are installed, and timer() is a context-variable lookup that
+returns a shared no-op.
+"""
+import contextlib
+import contextvars
+import functools
+import time
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+_installed = False
+_MISSING = object()
+
+
+class RequestMetrics:
+    """Timings and counters for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.cache_gets = 0
+        self.cache_hits = 0
+        self.cache_sets = 0
+        self.cache_ms = 0.0
+        self.timers = {}  # name -> ms (template, glossary, site)
+        self.rendering = False  # inside a timed template render
+
+    def add(self, name, ms):
+        self.timers[name] = self.timers.get(name, 0.0) + ms
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def cache_hit_ratio(self):
+        return self.cache_hits / self.cache_gets if self.cache_gets else None
+
+    def server_timing(self):
+        """Return the Server-Timing header value."""
+        entries = [
+            f'sql;dur={self.sql_ms:.1f};desc="{self.sql_count} queries"',
+            f'cache;dur={self.cache_ms:.1f};desc="{self.cache_hits}/{self.cache_gets} hits, {self.cache_sets} sets"',
+        ]
+        entries += [f"{name};dur={ms:.1f}" for name, ms in self.timers.items()]
+        entries.append(f"total;dur={self.total_ms:.1f}")
+        return ", ".join(entries)
+
+    def as_dict(self):
+        ratio = self.cache_hit_ratio
+        return {
+            "total_ms": round(self.total_ms, 2),
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_ms, 2),
+            "cache_gets": self.cache_gets,
+            "cache_hits": self.cache_hits,
+            "cache_sets": self.cache_sets,
+            "cache_hit_ratio": None if ratio is None else round(ratio, 3),
+            **{f"{name}_ms": round(ms, 2) for name, ms in self.timers.items()},
+        }
+
+
+def current():
+    """Return the RequestMetrics for the running request, or None."""
+    return _current.get()
+
+
+def start():
+    """Start collecting for a new request; returns (metrics, reset token)."""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+@contextlib.contextmanager
+def _timed(metrics, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, (time.perf_counter() - started) * 1000)
+
+
+def timer(name):
+    """Context manager adding the block's duration to timer name (no-op when not collecting)."""
+    metrics = _current.get()
+    if metrics is None:
+        return contextlib.nullcontext()
+    return _timed(metrics, name)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook counting queries and time."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_count += 1
+        metrics.sql_ms += (time.perf_counter() - started) * 1000
+
+
+def sql_wrappers():
+    """Context manager installing sql_wrapper on every database connection."""
+    from django.db import connections
+
+    stack = contextlib.ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(sql_wrapper))
+    return stack
+
+
+def _wrap_cache_get(method):
+    @functools.wraps(method)
+    def get(self, key, default=None, version=None):
+        metrics = _current.get()
+        if metrics is None:
+            return method(self, key, default, version)
+        started = time.perf_counter()
+        value = method(self, key, _MISSING, version)
+        metrics.cache_ms += (time.perf_counter() - started) * 1000
+        metrics.cache_gets += 1
+        if value is _MISSING:
+            return default
+        metrics.cache_hits += 1
+        return value
+
+    get.instrumented = True
+    return get
+
+
+def _wrap_cache_set(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.cache_ms += (time.perf_counter() - started) * 1000
+            metrics.cache_sets += 1
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def _wrap_template_render(method):
+    @functools.wraps(method)
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics.rendering:
+            # Nested renders ({% cards %}) are already inside the outer timer
+            return method(self, context, request)
+        metrics.rendering = True
+        try:
+            with _timed(metrics, "template"):
+                return method(self, context, request)
+        finally:
+            metrics.rendering = False
+
+    render.instrumented = True
+    return render
+
+
+def install():
+    """
+    Install the cache and template wrappers (once per process).
+
+    Wraps get/set/add on every configured cache backend class and the
+    Django (and, when installed, Jinja2) template backend's render(). SQL
+    is hooked per request with sql_wrappers().
+    """
+    global _installed
+    if _installed:
+        return
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.template.backends.django import Template
+
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if not getattr(backend.get, "instrumented", False):
+            backend.get = _wrap_cache_get(backend.get)
+            backend.set = _wrap_cache_set(backend.set)
+            backend.add = _wrap_cache_set(backend.add)
+    templates = [Template]
+    try:
+        from django.template.backends.jinja2 import Template as Jinja2Template
+
+        templates.append(Jinja2Template)
+    except ImportError:
+        pass
+    for template in templates:
+        if not getattr(template.render, "instrumented", False):
+            template.render = _wrap_template_render(template.render)
+    _installed = True
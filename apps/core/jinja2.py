@@ -0,0 +1,29 @@
+"""
+Jinja2 environment for the optional Jinja2 template engine (JINJA2_ENABLED).
+
+Templates in jinja2/ shadow the Django templates of the same name. They get
+url(), static() and responsive_image() plus the Django filters the ported templates use.
+"""
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.text import Truncator
+
+from jinja2 import Environment
+
+from .images import render_picture
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def truncatewords(value, length):
+    return Truncator(value).words(length, truncate=" …")
+
+
+def environment(**options):
+    # Match the Django engine's output byte for byte
+    env = Environment(keep_trailing_newline=True, **options)
+    env.globals.update({"url": url, "static": static, "responsive_image": render_picture})
+    env.filters.update({"truncatewords": truncatewords})
+    return env
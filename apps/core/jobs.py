@@ -0,0 +1,274 @@
+"""
+Database-backed background jobs (no broker).
+
+Register a task with @task and enqueue it, typically from a signal once
+the surrounding transaction commits:
+
+    from apps.core import jobs
+
+    @jobs.task(priority=10, key=lambda label, pk: f"images:{label}:{pk}")
+    def generate_image_variants(label, pk): ...
+
+    jobs.enqueue_on_commit(generate_image_variants, args=("trips.Trip", trip.pk))
+    jobs.enqueue(send_digest, delay=3600, priority=-5)
+
+Arguments must be JSON-serialisable (pass pks, not instances). Tasks live
+in each app's tasks.py, which run_workers imports at startup.
+
+manage.py run_workers starts a pool of worker processes. Each claims the
+queued job with the highest priority whose run_at has passed, using a
+conditional UPDATE so two workers never run the same job (on SQLite and
+PostgreSQL alike), and runs it:
+
+- A job that raises is retried with exponential backoff (JOBS_RETRY_DELAY
+  seconds, doubled per attempt) until max_attempts, then marked failed.
+- Only one queued job may hold a given key: enqueueing it again returns
+  the queued job instead, raising its priority and moving its run_at
+  earlier if needed. A job with the same key that is already running does
+  not block a new one, so changes made while it runs are not lost.
+- Jobs still running after JOBS_TIMEOUT seconds (their worker died) are
+  requeued; finished jobs are deleted after JOBS_KEEP_DAYS.
+
+With JOBS_ENABLED = False (the default outside Docker) nothing is queued:
+enqueue() runs the task inline, so development needs no worker. Tasks
+registered with cache_only=True (they only read and write the cache) also
+run inline while the cache is per-process (LocMemCache), where a worker
+would only update its own copy.
+"""
+import functools
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger("apps.jobs")
+
+# Task name -> Task
+registry = {}
+
+
+class Task:
+    def __init__(self, func, priority=0, max_attempts=3, key=None, cache_only=False):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.key = key
+        self.cache_only = cache_only
+        functools.update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<Task {self.name}>"
+
+
+def task(func=None, *, priority=0, max_attempts=3, key=None, cache_only=False):
+    """
+    Register a function as a job task (use as @task or @task(...)).
+
+    priority and max_attempts are defaults for its jobs; key, if given, is
+    called with the job's arguments to build its default dedupe key.
+    cache_only marks tasks whose only effect is on the cache.
+    """
+
+    def decorator(func):
+        registered = Task(func, priority=priority, max_attempts=max_attempts, key=key, cache_only=cache_only)
+        registry[registered.name] = registered
+        return registered
+
+    return decorator(func) if callable(func) else decorator
+
+
+def is_enabled():
+    return getattr(settings, "JOBS_ENABLED", False)
+
+
+def cache_is_shared():
+    """False for per-process cache backends, whose entries other processes can't see."""
+    from django.core.cache import caches
+    from django.core.cache.backends.dummy import DummyCache
+    from django.core.cache.backends.locmem import LocMemCache
+
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def enqueue(task, args=(), kwargs=None, *, key=None, priority=None, run_at=None, delay=None, max_attempts=None):
+    """
+    Queue task(*args, **kwargs) and return its Job (None if it ran inline).
+
+    key deduplicates (default: the task's key function, if any), delay is
+    in seconds from now, and run_at an absolute time.
+    """
+    from .models import Job
+
+    args, kwargs = list(args), kwargs or {}
+    if not is_enabled() or (task.cache_only and not cache_is_shared()):
+        try:
+            task(*args, **kwargs)
+        except Exception:  # like a failed job, don't break the request that enqueued it
+            logger.exception("Inline task %s failed", task.name)
+        return None
+
+    if key is None:
+        key = task.key(*args, **kwargs) if task.key else ""
+    priority = task.priority if priority is None else priority
+    if run_at is None:
+        run_at = timezone.now() + timedelta(seconds=delay or 0)
+
+    if key:
+        existing = Job.objects.filter(key=key, status=Job.QUEUED).first()
+        if existing is not None:
+            return _merge(existing, priority, run_at)
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=task.name,
+                args=args,
+                kwargs=kwargs,
+                key=key,
+                priority=priority,
+                run_at=run_at,
+                max_attempts=task.max_attempts if max_attempts is None else max_attempts,
+            )
+    except IntegrityError:
+        # Another process queued the same key in the meantime
+        return _merge(Job.objects.get(key=key, status=Job.QUEUED), priority, run_at)
+
+
+def _merge(job, priority, run_at):
+    """Fold a duplicate enqueue into the queued job with the same key."""
+    if priority > job.priority or run_at < job.run_at:
+        job.priority = max(priority, job.priority)
+        job.run_at = min(run_at, job.run_at)
+        type(job).objects.filter(pk=job.pk, status=job.QUEUED).update(priority=job.priority, run_at=job.run_at)
+    return job
+
+
+def enqueue_on_commit(task, args=(), kwargs=None, **options):
+    """enqueue() once the current transaction commits (immediately outside one)."""
+    transaction.on_commit(lambda: enqueue(task, args, kwargs, **options))
+
+
+# Worker side
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker):
+    """Atomically take the next runnable job for worker; return it or None."""
+    from .models import Job
+
+    now = timezone.now()
+    candidates = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by("-priority", "run_at", "id")
+    for pk in candidates.values_list("pk", flat=True)[:5]:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F("attempts") + 1
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run(job):
+    """Run a claimed job and record the outcome; return True if it succeeded."""
+    from .models import Job
+
+    start = time.perf_counter()
+    try:
+        registered = registry.get(job.name)
+        if registered is None:
+            raise LookupError(f"Unknown task {job.name!r} (is its tasks.py module imported?)")
+        registered(*job.args, **job.kwargs)
+    except Exception:  # any task failure is recorded and retried
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            _requeue(job, timezone.now() + timedelta(seconds=delay))
+            logger.warning("Job %s %s failed (attempt %d), retrying in %ds", job.pk, job.name, job.attempts, delay)
+        else:
+            _finish(job, Job.FAILED)
+            logger.error("Job %s %s failed after %d attempts:\n%s", job.pk, job.name, job.attempts, job.last_error)
+        return False
+    _finish(job, Job.DONE)
+    logger.info("Job %s %s done in %.0fms", job.pk, job.name, (time.perf_counter() - start) * 1000)
+    return True
+
+
+def _finish(job, status):
+    job.status = status
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "last_error"])
+
+
+def _requeue(job, run_at):
+    job.status, job.run_at, job.locked_by, job.locked_at = job.QUEUED, run_at, "", None
+    try:
+        with transaction.atomic():
+            job.save(update_fields=["status", "run_at", "locked_by", "locked_at", "last_error"])
+    except IntegrityError:
+        # A newer job with the same key is queued and will do the work
+        job.last_error += "\nSuperseded by a queued job with the same key."
+        _finish(job, job.FAILED)
+
+
+def requeue_stale():
+    """Requeue jobs whose worker died while running them; return how many."""
+    from .models import Job
+
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_TIMEOUT)
+    stale = list(Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff))
+    for job in stale:
+        job.last_error = f"Worker {job.locked_by} did not finish within {settings.JOBS_TIMEOUT}s"
+        if job.attempts < job.max_attempts:
+            _requeue(job, timezone.now())
+        else:
+            _finish(job, Job.FAILED)
+    return len(stale)
+
+
+def prune():
+    """Delete finished jobs older than JOBS_KEEP_DAYS; return how many."""
+    from .models import Job
+
+    cutoff = timezone.now() - timedelta(days=settings.JOBS_KEEP_DAYS)
+    deleted, _ = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def work(stop, poll_interval=1.0, burst=False, housekeeping_interval=60):
+    """
+    Process jobs until stop() is true (or, with burst, the queue is empty).
+
+    Returns the number of jobs run.
+    """
+    autodiscover_modules("tasks")
+    worker = worker_id()
+    processed, last_housekeeping = 0, 0.0
+    while not stop():
+        close_old_connections()
+        if time.monotonic() - last_housekeeping > housekeeping_interval:
+            requeue_stale()
+            prune()
+            last_housekeeping = time.monotonic()
+        job = claim(worker)
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run(job)
+        processed += 1
+    close_old_connections()
+    return processed
@@ -0,0 +1,302 @@
+"""
+EXPLAIN-based query plan auditor for every public view.
+
+Renders every public route (see benchmark_http.discover_routes) and every
+trip list filter/sort combination, captures the SQL each view runs, and
+EXPLAINs it against the current database (EXPLAIN QUERY PLAN on SQLite,
+EXPLAIN (FORMAT JSON) on PostgreSQL, with --analyze for EXPLAIN ANALYZE).
+Each plan is checked for:
+
+    seq-scan        full scan of a table with at least --large-table rows
+                    (an index-ordered scan cut short by LIMIT is fine)
+    missing-index   a filtered table scanned without an index
+    text-sort       an explicit sort (not index-ordered) on a text column
+    wide-distinct   DISTINCT over many columns or over text/JSON columns
+
+Usage:
+    python manage.py audit_query_plans
+    python manage.py audit_query_plans --scale 0.2 --large-table 5000 --fail
+    python manage.py audit_query_plans --route trips --analyze -v 2
+
+Listing views are audited with CATALOGUE_ENGINE_ENABLED off so their ORM
+querysets are explained, and with the page cache off. With --scale, synthetic data is generated inside
+a transaction that is rolled back afterwards.
+"""
+import json
+import re
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+
+from .benchmark_http import discover_routes
+from .check_query_budgets import trip_list_cases
+
+TEXT_FIELDS = {"CharField", "TextField", "SlugField", "EmailField", "URLField", "FileField", "ImageField"}
+WIDE_FIELDS = {"TextField", "JSONField"}
+WIDE_DISTINCT_COLUMNS = 8
+
+_COLUMN_RE = re.compile(r'"(\w+)"\."(\w+)"')
+_ORDER_BY_RE = re.compile(r"\bORDER BY (.+?)(?:\bLIMIT\b|\bOFFSET\b|$)", re.S)
+_SELECT_DISTINCT_RE = re.compile(r"^SELECT DISTINCT (.+?) FROM ", re.S)
+_WHERE_RE = re.compile(r"\bWHERE (.+?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|$)", re.S)
+_SQLITE_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?(.*)$")
+
+
+def column_types():
+    """Return {table: {column: internal field type}} for every installed model."""
+    types = {}
+    for model in apps.get_models():
+        columns = types.setdefault(model._meta.db_table, {})
+        for field in model._meta.concrete_fields:
+            columns[field.column] = field.get_internal_type()
+    return types
+
+
+def table_sizes():
+    """Return {table: row count} for every table in the database."""
+    sizes = {}
+    with connection.cursor() as cursor:
+        for table in connection.introspection.table_names(cursor):
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            sizes[table] = cursor.fetchone()[0]
+    return sizes
+
+
+def _split_top_level(text):
+    """Split a SQL list on commas outside parentheses."""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+class QueryAudit:
+    """Finds plan problems in one query, given the schema and table sizes."""
+
+    def __init__(self, types, sizes, large_table):
+        self.types = types
+        self.sizes = sizes
+        self.large_table = large_table
+
+    def explain(self, sql, params, analyze=False):
+        """Return (plan text, findings) for one SELECT."""
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+                cursor.execute(f"EXPLAIN ({options}) {sql}", params)
+                plan = cursor.fetchone()[0]
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                return json.dumps(plan, indent=2), self._postgres_findings(sql, plan[0]["Plan"])
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                details = [row[-1] for row in cursor.fetchall()]
+                return "\n".join(details), self._sqlite_findings(sql, details)
+            cursor.execute(f"EXPLAIN {sql}", params)
+            return "\n".join(" ".join(map(str, row)) for row in cursor.fetchall()), self._sql_findings(sql)
+
+    def _filtered_tables(self, sql):
+        where = _WHERE_RE.search(sql)
+        return {table for table, _column in _COLUMN_RE.findall(where.group(1))} if where else set()
+
+    def _text_sort_columns(self, sql):
+        order_by = _ORDER_BY_RE.search(sql)
+        if not order_by:
+            return []
+        return [
+            f"{table}.{column}"
+            for table, column in _COLUMN_RE.findall(order_by.group(1))
+            if self.types.get(table, {}).get(column) in TEXT_FIELDS
+        ]
+
+    def _scan_findings(self, table, indexed, filtered, uses_index=False):
+        rows = self.sizes.get(table, 0)
+        if indexed or rows < self.large_table:
+            return []
+        findings = [("seq-scan", f"full scan of {table} ({rows} rows)")]
+        if table in filtered and not uses_index:
+            findings.append(("missing-index", f"filter on {table} does not use an index"))
+        return findings
+
+    def _sql_findings(self, sql):
+        """Findings that only need the SQL text."""
+        match = _SELECT_DISTINCT_RE.match(sql)
+        if not match:
+            return []
+        columns = _split_top_level(match.group(1))
+        wide = [
+            f"{table}.{column}"
+            for table, column in _COLUMN_RE.findall(match.group(1))
+            if self.types.get(table, {}).get(column) in WIDE_FIELDS
+        ]
+        if len(columns) > WIDE_DISTINCT_COLUMNS or wide:
+            detail = f"DISTINCT over {len(columns)} columns" + (f" including {', '.join(wide)}" if wide else "")
+            return [("wide-distinct", detail)]
+        return []
+
+    def _sqlite_findings(self, sql, details):
+        findings = self._sql_findings(sql)
+        filtered = self._filtered_tables(sql)
+        for detail in details:
+            scan = _SQLITE_SCAN_RE.match(detail)
+            if scan:
+                # An index-ordered scan stopped by LIMIT reads only a few rows
+                table, using = scan.group(1), scan.group(3)
+                indexed = "USING" in using and " LIMIT " in sql
+                findings += self._scan_findings(table, indexed, filtered, "INDEX" in using)
+            elif detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail:
+                columns = self._text_sort_columns(sql)
+                if columns:
+                    findings.append(("text-sort", f"sort on text column(s) {', '.join(columns)}"))
+        return findings
+
+    def _postgres_findings(self, sql, plan):
+        findings = self._sql_findings(sql)
+        filtered = self._filtered_tables(sql)
+        nodes = [plan]
+        while nodes:
+            node = nodes.pop()
+            nodes += node.get("Plans", [])
+            if node["Node Type"] == "Seq Scan":
+                findings += self._scan_findings(node["Relation Name"], False, filtered)
+            elif node["Node Type"] in ("Sort", "Incremental Sort"):
+                columns = [
+                    f"{table}.{column}"
+                    for key in node.get("Sort Key", [])
+                    for table, column in re.findall(r"(\w+)\.(\w+)", key)
+                    if self.types.get(table, {}).get(column) in TEXT_FIELDS
+                ]
+                if columns:
+                    findings.append(("text-sort", f"sort on text column(s) {', '.join(columns)}"))
+        return findings
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN every query run by the public views and flag scans, text sorts and wide DISTINCTs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="localhost", help="Host header (selects the site)")
+        parser.add_argument("--route", action="append", help="Only audit routes whose name contains this")
+        parser.add_argument(
+            "--large-table",
+            type=int,
+            default=1000,
+            help="Tables with at least this many rows count as large (default: 1000)",
+        )
+        parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE (PostgreSQL only)")
+        parser.add_argument("--scale", type=float, default=0, help="Audit against synthetic data at this scale")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for --scale")
+        parser.add_argument("--json", dest="json_path", help="Write the report as JSON to this file")
+        parser.add_argument("--fail", action="store_true", help="Exit with an error if anything is flagged")
+
+    def handle(self, *args, **options):
+        if options["analyze"] and connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING("--analyze is PostgreSQL only; using EXPLAIN QUERY PLAN"))
+
+        with transaction.atomic():
+            if options["scale"]:
+                from apps.core.synthetic import SCALE_COUNTS, SyntheticDataGenerator
+
+                counts = {name: round(count * options["scale"]) for name, count in SCALE_COUNTS.items()}
+                SyntheticDataGenerator(seed=options["seed"], stdout=self.stdout).generate(counts)
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+            audit = QueryAudit(column_types(), table_sizes(), options["large_table"])
+            report = {}
+            for label, path, queries in self._capture(options):
+                entries = report.setdefault(label, {})
+                for sql, params in queries:
+                    if sql in entries or not sql.lstrip().upper().startswith("SELECT"):
+                        continue
+                    plan, findings = audit.explain(sql, params, options["analyze"])
+                    entries[sql] = {"path": path, "plan": plan, "findings": findings}
+            transaction.set_rollback(True)
+        cache.clear()
+
+        flagged = self._write_report(report, options["verbosity"])
+        if options["json_path"]:
+            with open(options["json_path"], "w") as f:
+                json.dump(
+                    {
+                        "database": connection.vendor,
+                        "large_table": options["large_table"],
+                        "views": {
+                            label: [{"sql": sql, **entry} for sql, entry in entries.items()]
+                            for label, entries in report.items()
+                        },
+                    },
+                    f,
+                    indent=2,
+                )
+            self.stdout.write(f"\nReport written to {options['json_path']}")
+        if options["fail"] and flagged:
+            raise CommandError(f"{flagged} query plan finding(s)")
+
+    def _capture(self, options):
+        """Yield (label, path, [(sql, params)]) for each audited request."""
+        cases = discover_routes(options["host"]) + list(trip_list_cases())
+        if options["route"]:
+            cases = [(label, path) for label, path in cases if any(r in label for r in options["route"])]
+        if not cases:
+            raise CommandError("No routes to audit")
+
+        client = Client(HTTP_HOST=options["host"], raise_request_exception=False)
+        with override_settings(CATALOGUE_ENGINE_ENABLED=False, PAGE_CACHE_ENABLED=False, FRAGMENT_CACHE_ENABLED=False):
+            for label, path in cases:
+                queries = []
+
+                def capture(execute, sql, params, many, context, queries=queries):
+                    if not many:
+                        queries.append((sql, params))
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(capture):
+                    client.get(path)
+                yield label, path, queries
+
+    def _write_report(self, report, verbosity):
+        """
+        Print findings per view, each with how many queries it affects and
+        one example (every query and plan with -v 2); returns the number of
+        flagged queries.
+        """
+        from collections import Counter
+
+        self.stdout.write(f"Database: {connection.vendor}\n")
+        flagged = 0
+        for label, entries in report.items():
+            findings = [(sql, entry) for sql, entry in entries.items() if entry["findings"]]
+            flagged += len(findings)
+            status = self.style.WARNING(f"{len(findings)} flagged") if findings else self.style.SUCCESS("ok")
+            self.stdout.write(f"{label:<32} {len(entries):>4} queries  {status}")
+
+            counts = Counter(finding for _sql, entry in findings for finding in set(entry["findings"]))
+            examples = {}
+            for sql, entry in findings:
+                for finding in entry["findings"]:
+                    examples.setdefault(finding, (sql, entry))
+            for (kind, detail), count in counts.most_common():
+                self.stdout.write(f"  [{kind}] {detail} ({count} quer{'y' if count == 1 else 'ies'})")
+                if verbosity < 2:
+                    sql, entry = examples[(kind, detail)]
+                    self._write_query(sql, entry)
+            if verbosity > 1:
+                for sql, entry in entries.items():
+                    self._write_query(sql, entry)
+        return flagged
+
+    def _write_query(self, sql, entry):
+        self.stdout.write(f"    {entry['path']}: {sql[:300]}")
+        self.stdout.write("    " + entry["plan"].replace("\n", "\n    "))
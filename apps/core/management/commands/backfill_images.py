@@ -0,0 +1,85 @@
+"""
+Generate responsive image variants for existing uploads (see apps.core.images).
+
+New uploads get their variants on save; run this after deploying the
+pipeline, after loading sample data (which sets images with update()), or
+with --force after changing WIDTHS, FORMATS or the encoder settings.
+It then generates the variants of images uploaded into rich-text fields
+and stores those fields' responsive HTML (see apps.core.richcontent).
+Cards and pages that are already cached pick the variants up when they
+expire (FRAGMENT_CACHE_TIMEOUT, page cache).
+
+Usage:
+    python manage.py backfill_images
+    python manage.py backfill_images --model trips.Trip --force
+    python manage.py backfill_images --model content.BlogPost   # featured images and post content
+"""
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from apps.core import images, richcontent
+
+
+class Command(BaseCommand):
+    help = "Generate width-stepped AVIF/WebP/JPEG variants of every uploaded image that lacks them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", help="Only this model (app_label.Model); repeatable")
+        parser.add_argument("--force", action="store_true", help="Regenerate images that already have variants")
+
+    def handle(self, *args, **options):
+        known = list(dict.fromkeys([*images.IMAGE_FIELDS, *richcontent.RICH_CONTENT_FIELDS]))
+        labels = options["model"] or known
+        unknown = set(labels) - set(known)
+        if unknown:
+            raise CommandError(f"No image fields for {', '.join(sorted(unknown))}; choose from {', '.join(known)}")
+
+        seen = set()
+        generated = skipped = failed = 0
+        start = time.perf_counter()
+        for label in labels:
+            model = apps.get_model(label)
+            for field_name in images.IMAGE_FIELDS.get(label, []):
+                field = model._meta.get_field(field_name)
+                names = (
+                    model.objects.exclude(Q(**{f"{field_name}__isnull": True}) | Q(**{field_name: ""}))
+                    .values_list(field_name, flat=True)
+                    .distinct()
+                )
+                for name in names.iterator():
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    if not options["force"] and field.storage.exists(images.sidecar_name(name)):
+                        skipped += 1
+                        continue
+                    try:
+                        info = images.generate(field.storage, name, force=True)
+                    except (OSError, ValueError) as e:
+                        failed += 1
+                        self.stderr.write(f"  {name}: {e}")
+                        continue
+                    generated += 1
+                    self.stdout.write(
+                        f"  {name}: {info['width']}x{info['height']} -> "
+                        f"{', '.join(map(str, info['widths']))}w as {', '.join(info['formats'])}"
+                    )
+
+        rendered = 0
+        for label in labels:
+            if label not in richcontent.RICH_CONTENT_FIELDS:
+                continue
+            for instance in apps.get_model(label)._default_manager.iterator():
+                generated += richcontent.generate_missing(instance, force=options["force"])
+                richcontent.store(instance)
+                rendered += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated variants for {generated} images in {time.perf_counter() - start:.1f}s "
+                f"({skipped} already had them, {failed} failed); stored the HTML of {rendered} rich-text objects"
+            )
+        )
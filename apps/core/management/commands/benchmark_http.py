@@ -0,0 +1,273 @@
+"""
+End-to-end HTTP benchmark of every public route.
+
+Discovers one concrete URL per pattern in config/urls.py (detail routes use
+the first object their view would serve), then requests each under
+concurrent load and reports latency percentiles, throughput, SQL queries
+and response size per route.
+
+Usage:
+    python manage.py benchmark_http
+    python manage.py benchmark_http --requests 200 --concurrency 8 --output bench.json
+    python manage.py benchmark_http --baseline bench.json --fail-threshold 20
+    python manage.py benchmark_http --server http://127.0.0.1:8000
+
+By default requests go through an in-process WSGI client, which also
+counts queries. With --server they are sent over HTTP to a running
+gunicorn/uvicorn instance instead (no query counts). Use --scale to seed a
+synthetic dataset first (see load_sample_data --scale); it writes to the
+configured database.
+"""
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+
+# Route prefixes that are not part of the public site
+EXCLUDED_PREFIXES = ("admin/", "media/", "static/", "metrics")
+
+
+def iter_patterns(patterns, prefix="", namespace=None):
+    """Yield (name, route, pattern) for every URLPattern, flattening includes (name may be None)."""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            ns = pattern.namespace or namespace
+            yield from iter_patterns(pattern.url_patterns, route, ns)
+        elif isinstance(pattern, URLPattern):
+            name = f"{namespace}:{pattern.name}" if namespace and pattern.name else pattern.name
+            yield name, route, pattern
+
+
+def sample_kwargs(pattern, host):
+    """
+    Return URL kwargs for a pattern with converters, or None if no object exists.
+
+    Uses the view's own get_queryset() so the sampled object is one the
+    public view would actually serve (published, active, ...).
+    """
+    view_class = getattr(pattern.callback, "view_class", None)
+    converters = pattern.pattern.converters
+    if view_class is None or set(converters) != {"slug"}:
+        return None
+
+    view = view_class()
+    view.setup(RequestFactory().get("/", HTTP_HOST=host))
+    view.kwargs = {}
+    queryset = view.get_queryset() if hasattr(view, "get_queryset") else None
+    if queryset is None:
+        return None
+    slug = queryset.order_by("pk").values_list("slug", flat=True).first()
+    return {"slug": slug} if slug else None
+
+
+def discover_routes(host):
+    """
+    Return [(label, path)] for every public route in the root URLconf.
+
+    Labels are namespaced URL names (e.g. "trips:trip_list"), or the route
+    itself for un-namespaced patterns such as sitemap.xml.
+    """
+    from django.urls import reverse
+
+    routes = []
+    for name, route, pattern in iter_patterns(get_resolver().url_patterns):
+        if route.startswith(EXCLUDED_PREFIXES) or "<path:" in route or name is None:
+            continue
+        label = name if ":" in name else route
+        if pattern.pattern.converters:
+            kwargs = sample_kwargs(pattern, host)
+            if kwargs is not None:
+                routes.append((label, reverse(name, kwargs=kwargs)))
+        else:
+            routes.append((label, reverse(name)))
+    return routes
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = "Benchmark every public route under concurrent load and compare against a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Measured requests per route")
+        parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client threads")
+        parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per route first")
+        parser.add_argument("--host", default="localhost", help="Host header (selects the site)")
+        parser.add_argument("--server", help="Base URL of a running server; default is an in-process client")
+        parser.add_argument("--route", action="append", help="Only benchmark routes whose name contains this")
+        parser.add_argument("--scale", type=float, default=0, help="Seed synthetic data at this scale first")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for --scale")
+        parser.add_argument("--output", help="Write JSON results to this file")
+        parser.add_argument("--baseline", help="Compare against JSON results from an earlier run")
+        parser.add_argument(
+            "--fail-threshold",
+            type=float,
+            default=0,
+            help="Exit with an error if any route's p95 or query count regresses by more than this percent",
+        )
+
+    def handle(self, *args, **options):
+        if options["scale"]:
+            call_command("load_sample_data", scale=options["scale"], seed=options["seed"], stdout=self.stdout)
+
+        routes = discover_routes(options["host"])
+        if options["route"]:
+            routes = [(name, path) for name, path in routes if any(r in name for r in options["route"])]
+        if not routes:
+            raise CommandError("No routes to benchmark")
+
+        results = {
+            "meta": {
+                "mode": "server" if options["server"] else "in-process",
+                "database": connection.vendor,
+                "host": options["host"],
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+            },
+            "routes": {},
+        }
+        for name, path in routes:
+            results["routes"][name] = self._benchmark(path, options)
+            self._write_row(name, results["routes"][name])
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"\nResults written to {options['output']}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            regressions = self._compare(results, baseline, options["fail_threshold"])
+            if regressions:
+                raise CommandError(f"{len(regressions)} route(s) regressed: {', '.join(regressions)}")
+
+    def _benchmark(self, path, options):
+        """Request path concurrently; return latency, throughput, query and size stats."""
+        fetch = self._server_fetch(options) if options["server"] else self._client_fetch(options)
+        for _ in range(options["warmup"]):
+            fetch(path)
+
+        samples = []
+        remaining = iter(range(options["requests"]))
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    sample = fetch(path)
+                    with lock:
+                        samples.append(sample)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options["concurrency"])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(ms for ms, _status, _queries, _size in samples)
+        queries = [q for _ms, _status, q, _size in samples if q is not None]
+        return {
+            "path": path,
+            "status": sorted({status for _ms, status, _queries, _size in samples}),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "rps": round(len(samples) / elapsed, 1) if elapsed else 0,
+            "queries": round(statistics.fmean(queries), 1) if queries else None,
+            "bytes": samples[-1][3],
+        }
+
+    def _client_fetch(self, options):
+        local = threading.local()
+
+        def fetch(path):
+            if not hasattr(local, "client"):
+                local.client = Client(HTTP_HOST=options["host"], raise_request_exception=False)
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = local.client.get(path)
+                content = b"".join(response) if response.streaming else response.content
+                ms = (time.perf_counter() - start) * 1000
+            return ms, response.status_code, len(ctx.captured_queries), len(content)
+
+        return fetch
+
+    def _server_fetch(self, options):
+        base = options["server"].rstrip("/")
+
+        def fetch(path):
+            request = urllib.request.Request(base + path, headers={"Host": options["host"]})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    status, content = response.status, response.read()
+            except urllib.error.HTTPError as e:
+                status, content = e.code, e.read()
+            return (time.perf_counter() - start) * 1000, status, None, len(content)
+
+        return fetch
+
+    def _write_row(self, name, stats):
+        if not hasattr(self, "_header_written"):
+            self.stdout.write(
+                f"\n{'Route':<26} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'bytes':>9}"
+            )
+            self.stdout.write("-" * 82)
+            self._header_written = True
+        queries = "-" if stats["queries"] is None else f"{stats['queries']:g}"
+        line = (
+            f"{name:<26} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+            f"{stats['rps']:>8.1f} {queries:>8} {stats['bytes']:>9}"
+        )
+        if stats["status"] != [200]:
+            line = self.style.ERROR(f"{line}  status {stats['status']}")
+        self.stdout.write(line)
+
+    def _compare(self, results, baseline, threshold):
+        """Print per-route changes against baseline; return names that regressed past threshold."""
+        self.stdout.write(f"\n{'Route':<26} {'p95 change':>11} {'queries':>15}")
+        self.stdout.write("-" * 54)
+        regressions = []
+        for name, stats in results["routes"].items():
+            old = baseline.get("routes", {}).get(name)
+            if old is None:
+                self.stdout.write(f"{name:<26} {'(new)':>11}")
+                continue
+            change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0
+            queries = f"{old['queries']} -> {stats['queries']}"
+            line = f"{name:<26} {change:>+10.1f}% {queries:>15}"
+            query_regressed = (
+                stats["queries"] is not None
+                and old["queries"] is not None
+                and stats["queries"] > old["queries"] * (1 + threshold / 100)
+            )
+            if threshold and (change > threshold or query_regressed):
+                regressions.append(name)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        return regressions
@@ -0,0 +1,157 @@
+"""
+Benchmark the public-query indexes.
+
+Runs the hot public querysets (listing pages, home page, sitemaps, glossary
+auto-linker) with and without the indexes declared in the models' Meta, and
+prints query plans and median timings side by side.
+
+Usage:
+    python manage.py benchmark_indexes
+    python manage.py benchmark_indexes --rows 20000 --repeat 50
+
+With --rows, synthetic trips and posts are inserted first. All changes
+(synthetic rows and dropped indexes) run inside a transaction that is rolled
+back, so the database is left untouched. Works on SQLite and PostgreSQL.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+def get_indexed_models():
+    """Return models whose Meta.indexes are benchmarked."""
+    from apps.content.models import BlogPost
+    from apps.core.models import Region, UniversalTag
+    from apps.glossary.models import Term
+    from apps.team.models import TeamMember
+    from apps.trips.models import Trip
+
+    return [Trip, BlogPost, UniversalTag, Region, Term, TeamMember]
+
+
+def get_hot_querysets():
+    """
+    Return (label, queryset) pairs mirroring the public views and sitemaps.
+
+    Querysets are built lazily so they pick up the current data.
+    """
+    from apps.content.models import BlogPost
+    from apps.core.models import Region, UniversalTag
+    from apps.glossary.models import Term
+    from apps.team.models import TeamMember
+    from apps.trips.models import Trip
+
+    trips = Trip.objects.filter(is_published=True).select_related("region")
+    posts = BlogPost.objects.filter(status="published").select_related("author", "region")
+    region_id = Region.objects.values_list("id", flat=True).first()
+
+    return [
+        ("home: featured trips", trips.filter(is_featured=True)[:6]),
+        ("home: featured regions", Region.objects.filter(is_featured=True)[:4]),
+        ("home: featured tags", UniversalTag.objects.filter(is_featured=True)[:8]),
+        ("trips: default sort", trips.order_by("-is_featured", "-created_at")[:12]),
+        ("trips: price_low", trips.order_by("effective_price", "-is_featured", "-created_at")[:12]),
+        ("trips: price_high", trips.order_by("-effective_price", "-is_featured", "-created_at")[:12]),
+        ("trips: duration", trips.order_by("duration_days", "-is_featured", "-created_at")[:12]),
+        ("trips: difficulty", trips.filter(difficulty="moderate").order_by("-is_featured", "-created_at")[:12]),
+        ("trips: region", trips.filter(region_id=region_id).order_by("-is_featured", "-created_at")[:12]),
+        ("trips: season", trips.in_season("winter").order_by("-is_featured", "-created_at")[:12]),
+        ("heli: list", trips.filter(trip_type="helicopter").order_by("-is_featured", "-created_at")[:12]),
+        ("trips: top regions", Region.objects.filter(parent__isnull=True)[:10]),
+        ("blog: default sort", posts.order_by("-is_featured", "-published_at")[:12]),
+        ("blog: type", posts.filter(content_type="guide").order_by("-is_featured", "-published_at")[:12]),
+        ("blog: region", posts.filter(region_id=region_id)[:5]),
+        ("sitemap: trips", Trip.objects.filter(is_published=True).only("slug", "updated_at")[:1000]),
+        ("sitemap: posts", BlogPost.objects.filter(status="published").only("slug", "updated_at")[:1000]),
+        ("glossary: list", Term.objects.order_by("name")),
+        (
+            "glossary: auto-link terms",
+            Term.objects.filter(auto_link=True)
+            .values("name", "abbreviation", "slug", "max_links_per_page", "link_priority")
+            .order_by("-link_priority", "-id"),
+        ),
+        ("team: list", TeamMember.objects.filter(is_active=True).order_by("display_order", "name")),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compare query plans and timings of hot public queries with and without indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=0,
+            help="Insert this many synthetic trips and posts (rolled back afterwards)",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Executions per query (median is reported)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic rows")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["rows"]:
+                self._insert_synthetic_rows(options["rows"], options["seed"])
+            self._analyze()
+
+            with_indexes = self._run(options["repeat"])
+            self._drop_indexes()
+            self._analyze()
+            without_indexes = self._run(options["repeat"])
+
+            transaction.set_rollback(True)
+
+        self._report(with_indexes, without_indexes, options["verbosity"])
+
+    def _run(self, repeat):
+        """Return {label: (plan, median_ms)} for every hot queryset."""
+        results = {}
+        for label, queryset in get_hot_querysets():
+            plan = queryset.explain()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset._chain())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = (plan, statistics.median(timings))
+        return results
+
+    def _drop_indexes(self):
+        """Drop every Meta-declared index (the enclosing transaction restores them)."""
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in get_indexed_models():
+                for index in model._meta.indexes:
+                    cursor.execute(
+                        schema_editor.sql_delete_index
+                        % {
+                            "name": schema_editor.quote_name(index.name),
+                            "table": schema_editor.quote_name(model._meta.db_table),
+                        }
+                    )
+
+    def _analyze(self):
+        """Refresh planner statistics so plans reflect the current data."""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _insert_synthetic_rows(self, rows, seed):
+        """Bulk insert synthetic trips and posts spread over existing regions and tags."""
+        from apps.core.synthetic import SyntheticDataGenerator
+
+        SyntheticDataGenerator(seed=seed, stdout=self.stdout).generate({"trips": rows, "posts": rows})
+
+    def _report(self, with_indexes, without_indexes, verbosity):
+        self.stdout.write(f"\nDatabase: {connection.vendor}\n")
+        self.stdout.write(f"{'Query':<28} {'indexed ms':>12} {'no index ms':>12} {'speedup':>9}")
+        self.stdout.write("-" * 64)
+        for label, (plan, ms) in with_indexes.items():
+            old_plan, old_ms = without_indexes[label]
+            speedup = old_ms / ms if ms else 0
+            self.stdout.write(f"{label:<28} {ms:>12.3f} {old_ms:>12.3f} {speedup:>8.1f}x")
+            if verbosity > 1 or plan != old_plan:
+                self.stdout.write(self.style.NOTICE("  with indexes:"))
+                self.stdout.write("    " + plan.replace("\n", "\n    "))
+                self.stdout.write(self.style.NOTICE("  without indexes:"))
+                self.stdout.write("    " + old_plan.replace("\n", "\n    "))
@@ -0,0 +1,213 @@
+"""
+Microbenchmarks for the request-path middleware helpers.
+
+Sweeps GlossaryAutoLinkerMiddleware._inject_glossary_links over glossary
+size, article size and abbreviation density, and
+SiteConfigurationMiddleware._get_site_config over host/cache states.
+Reports median time per call and peak allocations (tracemalloc) as a
+Markdown table.
+
+Usage:
+    python manage.py benchmark_middleware
+    python manage.py benchmark_middleware --terms 10 1000 --sizes 1 100 --output middleware.md
+    python manage.py benchmark_middleware --only site
+    python manage.py benchmark_middleware --max-cost 1000000   # skip the slowest linker cells
+
+The linker is fed synthetic terms directly (no database writes). Site
+resolution uses the sites already in the database.
+"""
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from apps.core.synthetic import WORDS
+
+DEFAULT_TERMS = [10, 100, 1_000, 10_000]
+DEFAULT_SIZES = [1, 10, 100, 500]  # KB
+DEFAULT_DENSITIES = [0.0, 0.25, 1.0]
+
+# Share of article paragraphs (~60 words) that mention a glossary term
+MENTION_RATE = 0.5
+
+
+def make_terms(count, abbreviation_density, rng):
+    """Return auto-link term dicts shaped like GlossaryAutoLinkerMiddleware._get_terms()."""
+    terms = []
+    for i in range(count):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}"
+        terms.append(
+            {
+                "name": name,
+                "abbreviation": f"{name[:2].upper()}{i}" if rng.random() < abbreviation_density else "",
+                "slug": f"term-{i}",
+                "max_links_per_page": rng.randint(1, 3),
+                "link_priority": rng.randint(1, 10),
+            }
+        )
+    terms.sort(key=lambda term: -term["link_priority"])
+    return terms
+
+
+def make_page(size_kb, terms, rng):
+    """Return a full HTML page whose <article> body is about size_kb kilobytes."""
+    paragraphs, size = [], 0
+    while size < size_kb * 1024:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(40, 80))]
+        if terms and rng.random() < MENTION_RATE:
+            term = rng.choice(terms)
+            words.insert(rng.randrange(len(words)), term["abbreviation"] or term["name"])
+        paragraph = f"<p>{' '.join(words)}.</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    header = '<header><nav><a href="/">Home</a><a href="/glossary/">Glossary</a></nav></header>'
+    return f"<html><body>{header}<article><h1>Title</h1>{''.join(paragraphs)}</article><footer></footer></body></html>"
+
+
+def measure(func, budget):
+    """Return (median ms per call, calls, peak KiB allocated in one call)."""
+    tracemalloc.start()
+    func()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < 5 or (time.perf_counter() < deadline and len(timings) < 1000):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+        if timings[-1] / 1000 > budget:
+            break
+    return statistics.median(timings), len(timings), peak / 1024
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the glossary auto-linker and site-resolution middleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--terms", type=int, nargs="+", default=DEFAULT_TERMS, help="Glossary sizes")
+        parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Article sizes in KB")
+        parser.add_argument(
+            "--densities",
+            type=float,
+            nargs="+",
+            default=DEFAULT_DENSITIES,
+            help="Share of terms with an abbreviation",
+        )
+        parser.add_argument("--only", choices=["glossary", "site"], help="Run one suite only")
+        parser.add_argument("--budget", type=float, default=1.0, help="Seconds spent timing each cell")
+        parser.add_argument(
+            "--max-cost",
+            type=int,
+            help="Skip linker cells where terms x article KB exceeds this (default: run the full sweep)",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic terms and articles")
+        parser.add_argument("--output", help="Also write the tables to this file (.md or .json)")
+
+    def handle(self, *args, **options):
+        tables = {}
+        self.skipped = []
+        if options["only"] in (None, "glossary"):
+            tables["glossary"] = self._glossary_suite(options)
+        if options["only"] in (None, "site"):
+            tables["site"] = self._site_suite(options)
+
+        markdown = "\n\n".join(self._markdown(rows) for rows in tables.values())
+        if self.skipped:
+            cells = ", ".join(dict.fromkeys(f"{count} terms x {size} KB" for count, size, _density in self.skipped))
+            markdown += f"\n\nSkipped by --max-cost {options['max_cost']}: {cells}"
+            tables["glossary skipped"] = [
+                {"terms": count, "article KB": size, "abbrev density": density} for count, size, density in self.skipped
+            ]
+        self.stdout.write("\n" + markdown)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(json.dumps(tables, indent=2) if options["output"].endswith(".json") else markdown + "\n")
+            self.stdout.write(f"\nResults written to {options['output']}")
+
+    def _glossary_suite(self, options):
+        from apps.glossary.middleware import GlossaryAutoLinkerMiddleware
+
+        rng = random.Random(options["seed"])
+        middleware = GlossaryAutoLinkerMiddleware(lambda request: None)
+        rows = []
+        for density in options["densities"]:
+            for count in options["terms"]:
+                terms = make_terms(count, density, rng)
+                # Bypass the cache/database lookup so only the linker itself is timed
+                middleware._get_terms = lambda terms=terms: terms
+                for size in options["sizes"]:
+                    if options["max_cost"] is not None and count * size > options["max_cost"]:
+                        self.stderr.write(f"  glossary: {count} terms, {size} KB skipped (see --max-cost)")
+                        self.skipped.append((count, size, density))
+                        continue
+                    page = make_page(size, terms, rng)
+                    ms, calls, peak = measure(
+                        lambda page=page: middleware._inject_glossary_links(page), options["budget"]
+                    )
+                    rows.append(
+                        {
+                            "terms": count,
+                            "article KB": size,
+                            "abbrev density": density,
+                            "ms/call": round(ms, 3),
+                            "KB/s": round(len(page) / 1024 / (ms / 1000), 1) if ms else 0,
+                            "peak KiB": round(peak, 1),
+                            "calls": calls,
+                        }
+                    )
+                    self.stderr.write(f"  glossary: {count} terms, {size} KB, density {density:g}: {ms:.3f} ms")
+        return rows
+
+    def _site_suite(self, options):
+        from django.contrib.sites.models import Site
+
+        from apps.core.middleware import SiteConfigurationMiddleware
+
+        middleware = SiteConfigurationMiddleware(lambda request: None)
+        factory = RequestFactory()
+        domain = Site.objects.values_list("domain", flat=True).first() or "localhost"
+        hosts = {
+            "exact domain": domain,
+            "www. prefix": f"www.{domain}",
+            "unknown host": "unknown.invalid",
+        }
+
+        rows = []
+        for label, host in hosts.items():
+            request = factory.get("/", HTTP_HOST=host)
+            key = f"site_config:{host}"
+            for state in ("warm", "cold"):
+
+                def call(request=request, key=key, state=state):
+                    if state == "cold":
+                        cache.delete(key)
+                    return middleware._get_site_config(request)
+
+                # www./unknown hosts are not in ALLOWED_HOSTS; they would be rejected before the middleware
+                with override_settings(ALLOWED_HOSTS=["*"]):
+                    call()  # populate the cache for the warm state
+                    ms, calls, peak = measure(call, options["budget"])
+                rows.append(
+                    {"host": label, "cache": state, "ms/call": round(ms, 4), "peak KiB": round(peak, 1), "calls": calls}
+                )
+        return rows
+
+    def _markdown(self, rows):
+        if not rows:
+            return ""
+        headers = list(rows[0])
+        lines = [
+            "| " + " | ".join(headers) + " |",
+            "|" + "|".join("---:" for _ in headers) + "|",
+        ]
+        for row in rows:
+            cells = [f"{row[h]:g}" if isinstance(row[h], float) else str(row[h]) for h in headers]
+            lines.append("| " + " | ".join(cells) + " |")
+        return "\n".join(lines)
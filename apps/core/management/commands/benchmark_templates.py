@@ -0,0 +1,126 @@
+"""
+Template render time per public page under each template configuration.
+
+Requests every public route (see benchmark_http.discover_routes) and
+reports the median time spent rendering templates (the "template" timer
+of apps.core.instrumentation), with the page and fragment caches off so
+every card and fragment is rendered:
+
+    uncached  filesystem/app-directories loaders without the cached loader,
+              so every request re-reads and re-parses its templates
+    cold      the first request after the engines are rebuilt, as the first
+              visitor of a worker without warm-up sees it
+    cached    the cached loader after warm_templates()
+    jinja2    as cached, with the Jinja2 engine and the templates ported to
+              jinja2/ in front (needs the Jinja2 package)
+
+Usage:
+    python manage.py benchmark_templates
+    python manage.py benchmark_templates --iterations 50 --route trips --output templates.json
+"""
+import copy
+import json
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from apps.core import instrumentation
+from apps.core.templating import warm_templates
+
+from .benchmark_http import discover_routes
+
+DJANGO_BACKEND = "django.template.backends.django.DjangoTemplates"
+CACHED_LOADER = "django.template.loaders.cached.Loader"
+JINJA2_TEMPLATES = {
+    "BACKEND": "django.template.backends.jinja2.Jinja2",
+    "DIRS": [settings.BASE_DIR / "jinja2"],
+    "OPTIONS": {"environment": "apps.core.jinja2.environment"},
+}
+
+
+def template_configs():
+    """Return {name: TEMPLATES} for the uncached, cached and (if installed) jinja2 configurations."""
+    django = copy.deepcopy(next(engine for engine in settings.TEMPLATES if engine["BACKEND"] == DJANGO_BACKEND))
+    uncached = copy.deepcopy(django)
+    loaders = uncached["OPTIONS"].get("loaders") or []
+    uncached["OPTIONS"]["loaders"] = [
+        loader for entry in loaders for loader in (entry[1] if entry[0] == CACHED_LOADER else [entry])
+    ] or ["django.template.loaders.filesystem.Loader", "django.template.loaders.app_directories.Loader"]
+    uncached.pop("APP_DIRS", None)
+
+    configs = {"uncached": [uncached], "cached": [django]}
+    try:
+        import jinja2  # noqa: F401
+
+        configs["jinja2"] = [JINJA2_TEMPLATES, django]
+    except ImportError:
+        pass
+    return configs
+
+
+class Command(BaseCommand):
+    help = "Benchmark template render time per page: uncached, cold, cached loader and Jinja2"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Measured requests per route and config")
+        parser.add_argument("--host", default="localhost", help="Host header (selects the site)")
+        parser.add_argument("--route", action="append", help="Only benchmark routes whose name contains this")
+        parser.add_argument("--output", help="Write JSON results to this file")
+
+    def handle(self, *args, **options):
+        routes = discover_routes(options["host"])
+        if options["route"]:
+            routes = [(name, path) for name, path in routes if any(r in name for r in options["route"])]
+        if not routes:
+            raise CommandError("No routes to benchmark")
+
+        instrumentation.install()
+        configs = template_configs()
+        columns = ["uncached", "cold", "cached", *(["jinja2"] if "jinja2" in configs else [])]
+        results = {name: {"path": path} for name, path in routes}
+        quiet = {
+            "PAGE_CACHE_ENABLED": False,
+            "FRAGMENT_CACHE_ENABLED": False,
+            "PERFORMANCE_INSTRUMENTATION": False,
+        }
+
+        for config, templates in configs.items():
+            if config != "uncached":
+                # A fresh set of engines per route, so its first request is cold
+                for name, path in routes:
+                    with override_settings(TEMPLATES=copy.deepcopy(templates), **quiet):
+                        results[name].setdefault("cold", self._render_ms(Client(HTTP_HOST=options["host"]), path))
+            with override_settings(TEMPLATES=templates, **quiet):
+                warm_templates()  # logs its own count and duration
+                client = Client(HTTP_HOST=options["host"])
+                for name, path in routes:
+                    self._render_ms(client, path)  # data caches, and templates for uncached
+                    samples = [self._render_ms(client, path) for _ in range(options["iterations"])]
+                    results[name][config] = round(statistics.median(samples), 3)
+
+        self._write_table(results, columns)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({"columns": columns, "routes": results}, f, indent=2)
+            self.stdout.write(f"\nResults written to {options['output']}")
+
+    def _render_ms(self, client, path):
+        metrics, token = instrumentation.start()
+        try:
+            response = client.get(path)
+        finally:
+            instrumentation.stop(token)
+        if response.status_code != 200:
+            raise CommandError(f"{path}: status {response.status_code}")
+        return round(metrics.timers.get("template", 0.0), 3)
+
+    def _write_table(self, results, columns):
+        self.stdout.write(f"\nMedian template render ms\n{'Route':<26}" + "".join(f"{c:>10}" for c in columns))
+        self.stdout.write("-" * (26 + 10 * len(columns)))
+        for name, stats in results.items():
+            self.stdout.write(f"{name:<26}" + "".join(f"{stats[c]:>10.2f}" for c in columns))
+        totals = "".join(f"{sum(stats[c] for stats in results.values()):>10.2f}" for c in columns)
+        self.stdout.write("-" * (26 + 10 * len(columns)))
+        self.stdout.write(f"{'total':<26}{totals}")
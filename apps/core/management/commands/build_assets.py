@@ -0,0 +1,164 @@
+"""
+Build-time asset pipeline (run before collectstatic and compress).
+
+Replaces the runtime CDNs of base.html when ASSETS_PIPELINE is on:
+
+1. Vendors pinned third-party files (Alpine.js, htmx, the Inter font's
+   Latin subset) into static/vendor/. Each download must match its SHA-256
+   in the committed assets.lock.json, which also pins the Tailwind CLI
+   binary the Dockerfile installs. A URL missing from the lock is an
+   error; after changing a pin, run with --update-lock (with network
+   access) to record the new checksums, review them and commit the lock.
+2. Writes static/dist/fonts.css with the @font-face rules for the fonts.
+3. Compiles static/css/tailwind.input.css with the Tailwind CLI into a
+   minified static/dist/tailwind.css holding only the classes our
+   templates use (see tailwind.config.js).
+4. Extracts each page type's above-the-fold rules from those stylesheets
+   into static/dist/critical/ (see apps.core.critical), inlined by the
+   {% critical_css %} tag in base.html.
+
+Then, in the Dockerfile:
+
+    python manage.py build_assets
+    python manage.py collectstatic --noinput   # hashed names, .gz and .br (WhiteNoise)
+    python manage.py compress --force          # offline bundles, .gz and .br
+
+Usage:
+    python manage.py build_assets
+    python manage.py build_assets --offline          # use vendored files only, no downloads
+    python manage.py build_assets --tailwind ./tailwindcss
+    python manage.py build_assets --update-lock --skip-css   # record checksums after changing a pin
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import critical
+
+TAILWIND_VERSION = "3.4.17"  # keep in step with the Dockerfile's TAILWIND_VERSION
+TAILWIND_URL = (
+    f"https://github.com/tailwindlabs/tailwindcss/releases/download/v{TAILWIND_VERSION}/tailwindcss-linux-x64"
+)
+
+# Pinned third-party assets: static/vendor/<name> <- url
+VENDOR = {
+    "alpinejs.min.js": "https://cdn.jsdelivr.net/npm/alpinejs@3.14.1/dist/cdn.min.js",
+    "htmx.min.js": "https://cdn.jsdelivr.net/npm/htmx.org@1.9.10/dist/htmx.min.js",
+    "inter-latin-wght-normal.woff2": (
+        "https://cdn.jsdelivr.net/npm/@fontsource-variable/inter@5.0.18/files/inter-latin-wght-normal.woff2"
+    ),
+}
+
+FONT_FACES = """/* Self-hosted Inter (variable weight, Latin subset), vendored by build_assets */
+@font-face {
+    font-family: "Inter";
+    font-style: normal;
+    font-weight: 300 800;
+    font-display: swap;
+    src: url("../vendor/inter-latin-wght-normal.woff2") format("woff2");
+    unicode-range: U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, U+0329,
+        U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD;
+}
+"""
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class Command(BaseCommand):
+    help = "Vendor pinned JS/fonts and compile purged, minified Tailwind CSS for the offline asset pipeline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--offline", action="store_true", help="Don't download; fail if a vendored file is missing")
+        parser.add_argument(
+            "--tailwind",
+            default=os.environ.get("TAILWIND_CLI"),
+            help="Tailwind CLI executable (default: TAILWIND_CLI, tailwindcss on PATH, or npx)",
+        )
+        parser.add_argument("--skip-css", action="store_true", help="Only vendor files, don't build the CSS")
+        parser.add_argument(
+            "--update-lock",
+            action="store_true",
+            help="Download pinned URLs missing from assets.lock.json and record their checksums",
+        )
+
+    def handle(self, *args, **options):
+        base = Path(settings.BASE_DIR)
+        lock_path = base / "assets.lock.json"
+        lock = json.loads(lock_path.read_text()) if lock_path.exists() else {}
+        if options["update_lock"]:
+            self._update_lock(lock, lock_path)
+        self._vendor(base / "static" / "vendor", lock, options["offline"])
+        dist = base / "static" / "dist"
+        dist.mkdir(parents=True, exist_ok=True)
+        (dist / "fonts.css").write_text(FONT_FACES)
+        if not options["skip_css"]:
+            self._tailwind(base, options["tailwind"])
+            self._critical(base / "static" / critical.CRITICAL_DIR)
+
+    def _update_lock(self, lock, lock_path):
+        missing = [url for url in [*VENDOR.values(), TAILWIND_URL] if url not in lock]
+        for url in missing:
+            with urllib.request.urlopen(url, timeout=120) as response:
+                lock[url] = sha256(response.read())
+            self.stdout.write(f"  {url}: {lock[url]}")
+        if missing:
+            lock_path.write_text(json.dumps(lock, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(
+                self.style.WARNING(f"Recorded {len(missing)} checksums in {lock_path.name}; review and commit it")
+            )
+
+    def _vendor(self, directory, lock, offline):
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, url in VENDOR.items():
+            if url not in lock:
+                raise CommandError(f"{url} is not pinned in assets.lock.json (run with --update-lock and commit it)")
+            path = directory / name
+            if path.exists() and lock.get(url) == sha256(path.read_bytes()):
+                self.stdout.write(f"  {name}: up to date")
+                continue
+            if offline:
+                raise CommandError(f"{name} is missing or doesn't match assets.lock.json (run without --offline)")
+            with urllib.request.urlopen(url, timeout=60) as response:
+                data = response.read()
+            if sha256(data) != lock[url]:
+                raise CommandError(f"{url} doesn't match its SHA-256 in assets.lock.json")
+            path.write_bytes(data)
+            self.stdout.write(f"  {name}: {len(data):,} bytes from {url}")
+
+    def _tailwind(self, base, cli):
+        if cli:
+            command = [cli]
+        elif shutil.which("tailwindcss"):
+            command = ["tailwindcss"]
+        elif shutil.which("npx"):
+            command = ["npx", "--yes", f"tailwindcss@{TAILWIND_VERSION}"]
+        else:
+            raise CommandError("No Tailwind CLI: install the standalone tailwindcss binary or set TAILWIND_CLI")
+
+        output = base / "static" / "dist" / "tailwind.css"
+        command += [
+            "--config",
+            str(base / "tailwind.config.js"),
+            "--input",
+            str(base / "static" / "css" / "tailwind.input.css"),
+            "--output",
+            str(output),
+            "--minify",
+        ]
+        result = subprocess.run(command, cwd=base, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f"Tailwind failed:\n{result.stderr}")
+        self.stdout.write(f"  dist/tailwind.css: {output.stat().st_size:,} bytes")
+
+    def _critical(self, directory):
+        for name, size in critical.build(directory).items():
+            self.stdout.write(f"  critical CSS for {name}: {size:,} bytes")
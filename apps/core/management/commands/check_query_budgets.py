@@ -0,0 +1,176 @@
+"""
+Query-count budget regression check for every public view.
+
+Renders every public route (see benchmark_http.discover_routes), plus
+TripListView with every combination of filters and sorts, against a small
+and a larger synthetic fixture. It fails when a view exceeds its declared
+budget in QUERY_BUDGETS, when a route has no declared budget, or when a
+view's query count grows with the data size. N+1 patterns found by the
+template query detector are reported too.
+
+Usage:
+    python manage.py check_query_budgets
+    python manage.py check_query_budgets --sizes 0.002 0.01 --max-ms 500 --fail-on-n-plus-one
+
+Counts are for a warm request (site config cached, catalogue built) with
+the page and fragment caches off, so they measure the views themselves.
+Everything runs in a transaction that is rolled back, so the database is
+left untouched. Exits non-zero on failure, so it can gate CI.
+"""
+import itertools
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+
+from apps.core.template_queries import TemplateQueryDetector
+
+from .benchmark_http import discover_routes
+
+# Maximum queries per warm request, by route label
+QUERY_BUDGETS = {
+    "sitemap.xml": 12,
+    "core:home": 2,
+    "core:tag_list": 0,
+    "core:tag_detail": 8,
+    "core:region_list": 0,
+    "core:region_detail": 2,
+    "core:contact": 0,
+    "trips:trip_list": 1,
+    "trips:trip_list (orm)": 5,
+    "trips:trip_list (search)": 4,
+    "trips:heli_list": 1,
+    "trips:heli_list (orm)": 3,
+    "trips:trip_detail": 4,
+    "content:post_list": 1,
+    "content:post_list (orm)": 3,
+    "content:post_detail": 6,
+    "team:member_list": 0,
+    "team:member_detail": 2,
+    "glossary:term_list": 0,
+    "glossary:term_detail": 3,
+}
+
+TRIP_FILTERS = {
+    "tag": "everest",
+    "region": "everest-region",
+    "difficulty": "challenging",
+    "duration": "8-14",
+    "season": "autumn",
+    "price": "2000-5000",
+}
+TRIP_SORTS = ["", "price_low", "price_high", "duration"]
+
+
+def trip_list_cases():
+    """(label, path) for every combination of trip list filters and sorts, plus search."""
+    from urllib.parse import urlencode
+
+    from django.urls import reverse
+
+    base = reverse("trips:trip_list")
+    for size in range(len(TRIP_FILTERS) + 1):
+        for names in itertools.combinations(TRIP_FILTERS, size):
+            for sort in TRIP_SORTS:
+                params = {name: TRIP_FILTERS[name] for name in names}
+                if sort:
+                    params["sort"] = sort
+                yield "trips:trip_list", f"{base}?{urlencode(params)}" if params else base
+    # Search always goes through the ORM
+    for sort in TRIP_SORTS:
+        yield "trips:trip_list (search)", f"{base}?{urlencode({'q': 'trek', 'sort': sort})}"
+
+
+class Command(BaseCommand):
+    help = "Check per-view query budgets, and that query counts stay constant as data grows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=float,
+            nargs="+",
+            default=[0.002, 0.01],
+            help="Synthetic fixture scales to check, smallest first (see load_sample_data --scale)",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic fixture")
+        parser.add_argument("--host", default="localhost", help="Host header (selects the site)")
+        parser.add_argument("--max-ms", type=float, help="Also fail any warm request slower than this")
+        parser.add_argument("--fail-on-n-plus-one", action="store_true", help="Fail on template N+1 patterns")
+
+    def handle(self, *args, **options):
+        from apps.core.synthetic import SCALE_COUNTS, SyntheticDataGenerator
+
+        failures, warnings = [], []
+        counts_by_size = []
+        with transaction.atomic():
+            generated = dict.fromkeys(SCALE_COUNTS, 0)
+            for scale in options["sizes"]:
+                # Top up the fixture to this scale
+                target = {name: round(count * scale) for name, count in SCALE_COUNTS.items()}
+                SyntheticDataGenerator(seed=options["seed"]).generate(
+                    {name: target[name] - generated[name] for name in target}
+                )
+                generated = target
+                self.stdout.write(f"\nScale {scale:g}: {target['trips']} trips, {target['posts']} posts")
+                counts_by_size.append(self._check_size(options, failures, warnings))
+            transaction.set_rollback(True)
+        cache.clear()
+
+        # Query counts must not grow with the data
+        for path, count in counts_by_size[-1].items():
+            smallest = counts_by_size[0].get(path)
+            if smallest is not None and count[1] > smallest[1]:
+                failures.append(f"{path}: {smallest[1]} -> {count[1]} queries as data grew")
+
+        for warning in dict.fromkeys(warnings):
+            self.stdout.write(self.style.WARNING(warning))
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} query budget failure(s)")
+        self.stdout.write(self.style.SUCCESS("\n✓ All views within their query budgets"))
+
+    def _check_size(self, options, failures, warnings):
+        """Render every path at the current data size; return {path: (label, queries)}."""
+        cache.clear()
+        client = Client(HTTP_HOST=options["host"], raise_request_exception=False)
+        results = {}
+
+        cases = [(label, path, True) for label, path in discover_routes(options["host"])]
+        cases += [(label, path, True) for label, path in trip_list_cases()]
+        # The ORM fallback paths of the catalogue-backed listings
+        for label in ("trips:trip_list", "trips:heli_list", "content:post_list"):
+            cases += [(f"{label} (orm)", path, False) for name, path, _catalogue in cases if name == label]
+
+        for label, path, catalogue in cases:
+            with override_settings(CATALOGUE_ENGINE_ENABLED=catalogue, PAGE_CACHE_ENABLED=False, FRAGMENT_CACHE_ENABLED=False):
+                client.get(path)  # warm caches
+                with TemplateQueryDetector() as detector:
+                    started = time.perf_counter()
+                    response = client.get(path)
+                    ms = (time.perf_counter() - started) * 1000
+            queries = detector.total_queries
+            key = f"{path} (orm)" if not catalogue else path
+            results[key] = (label, queries)
+
+            budget = QUERY_BUDGETS.get(label)
+            if response.status_code != 200:
+                failures.append(f"{label} {path}: status {response.status_code}")
+            if budget is None:
+                failures.append(f"{label}: no query budget declared in QUERY_BUDGETS")
+            elif queries > budget:
+                failures.append(f"{label} {path}: {queries} queries (budget {budget})\n{detector.report()}")
+            if options["max_ms"] and ms > options["max_ms"]:
+                failures.append(f"{label} {path}: {ms:.0f} ms (max {options['max_ms']:g} ms)")
+            for (template, line, expr), _sql, count in detector.n_plus_one():
+                message = f"N+1 {label}: {template}:{line} {{{expr}}} ran {count}x"
+                (failures if options["fail_on_n_plus_one"] else warnings).append(message)
+
+        by_label = {}
+        for label, queries in results.values():
+            by_label[label] = max(by_label.get(label, 0), queries)
+        for label, queries in sorted(by_label.items()):
+            self.stdout.write(f"  {label:<28} {queries:>3} queries (budget {QUERY_BUDGETS.get(label, '-')})")
+        return results
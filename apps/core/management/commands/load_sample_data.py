@@ -1,7 +1,13 @@
 """
 Load sample data for Traverse The Himalayas.
 
-Usage: python manage.py load_sample_data
+Usage:
+    python manage.py load_sample_data
+    python manage.py load_sample_data --scale 1 --seed 42
+
+--scale adds deterministic synthetic rows on top of the sample data
+(at scale 1: 50k trips, 200k posts, 5k terms, 2k regions, 500 tags; see
+apps.core.synthetic) for load and performance testing.
 """
 import shutil
 from pathlib import Path
@@ -23,6 +29,14 @@ class Command(BaseCommand):
             action="store_true",
             help="Clear all existing data before loading fresh sample data",
         )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=0,
+            help="Also generate synthetic rows at this multiple of the production-sized dataset (e.g. 0.1, 1, 5)",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic rows")
+        parser.add_argument("--batch-size", type=int, default=2000, help="bulk_create batch size for synthetic rows")
 
     def handle(self, *args, **options):
         if options["clear"]:
@@ -39,6 +53,9 @@ class Command(BaseCommand):
         self._create_blog_posts()
         self._create_glossary_terms()
 
+        if options["scale"]:
+            self._create_synthetic_data(options["scale"], options["seed"], options["batch_size"])
+
         self.stdout.write(self.style.SUCCESS("✓ Sample data loaded successfully!"))
 
     def _clear_all_data(self):
@@ -65,6 +82,19 @@ class Command(BaseCommand):
 
         self.stdout.write("  ✓ Cleared all existing data")
 
+    def _create_synthetic_data(self, scale, seed, batch_size):
+        """Bulk insert a scaled synthetic dataset on top of the sample data."""
+        import time
+
+        from apps.core.synthetic import SCALE_COUNTS, SyntheticDataGenerator
+
+        counts = {name: round(count * scale) for name, count in SCALE_COUNTS.items()}
+        self.stdout.write(f"Generating synthetic data at scale {scale:g} (seed {seed})...")
+
+        start = time.perf_counter()
+        SyntheticDataGenerator(seed=seed, batch_size=batch_size, stdout=self.stdout).generate(counts)
+        self.stdout.write(f"  ✓ Synthetic data generated in {time.perf_counter() - start:.1f}s")
+
     def _copy_sample_images(self):
         """Copy sample images from static/sample to media folders."""
         static_sample = Path(settings.BASE_DIR) / "static" / "sample"
@@ -414,6 +444,7 @@ class Command(BaseCommand):
                 "duration_days": 14,
                 "max_altitude": 5545,
                 "difficulty": "challenging",
+                "best_seasons": ["spring", "autumn"],
                 "price": 2499,
                 "region_slug": "everest-region",
                 "tags": ["everest", "teahouse"],
@@ -429,6 +460,7 @@ class Command(BaseCommand):
                 "duration_days": 18,
                 "max_altitude": 5416,
                 "difficulty": "challenging",
+                "best_seasons": ["spring", "autumn"],
                 "price": 1899,
                 "region_slug": "annapurna-region",
                 "tags": ["annapurna", "teahouse", "cultural"],
@@ -444,6 +476,7 @@ class Command(BaseCommand):
                 "duration_days": 5,
                 "max_altitude": 3210,
                 "difficulty": "easy",
+                "best_seasons": ["spring", "autumn", "winter"],
                 "price": 699,
                 "discounted_price": 599,
                 "region_slug": "annapurna-region",
@@ -460,6 +493,7 @@ class Command(BaseCommand):
                 "duration_days": 10,
                 "max_altitude": 4984,
                 "difficulty": "moderate",
+                "best_seasons": ["spring", "autumn"],
                 "price": 1299,
                 "region_slug": "langtang-region",
                 "tags": ["teahouse", "cultural"],
@@ -475,6 +509,7 @@ class Command(BaseCommand):
                 "duration_days": 20,
                 "max_altitude": 6189,
                 "difficulty": "extreme",
+                "best_seasons": ["spring", "autumn"],
                 "price": 3999,
                 "region_slug": "everest-region",
                 "tags": ["everest", "peak-climbing", "camping"],
@@ -491,6 +526,7 @@ class Command(BaseCommand):
                 "duration_days": 1,
                 "max_altitude": 5545,
                 "difficulty": "easy",
+                "best_seasons": ["spring", "autumn", "winter"],
                 "price": 1299,
                 "trip_type": "helicopter",
                 "flight_duration_minutes": 180,
@@ -511,6 +547,7 @@ class Command(BaseCommand):
                 "duration_days": 1,
                 "max_altitude": 4130,
                 "difficulty": "easy",
+                "best_seasons": ["spring", "autumn", "winter"],
                 "price": 899,
                 "trip_type": "helicopter",
                 "flight_duration_minutes": 120,
@@ -531,6 +568,7 @@ class Command(BaseCommand):
                 "duration_days": 1,
                 "max_altitude": 3870,
                 "difficulty": "easy",
+                "best_seasons": ["spring", "summer", "autumn", "winter"],
                 "price": 799,
                 "trip_type": "helicopter",
                 "flight_duration_minutes": 90,
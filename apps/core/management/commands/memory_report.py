@@ -0,0 +1,151 @@
+"""
+Memory footprint report for a worker-like process.
+
+Prints RSS, Django cache and in-process cache sizes and (with tracemalloc)
+the top allocators, after optionally warming up by requesting every public
+route like a gunicorn worker would. Also lists the snapshots each worker
+saved from /admin/memory/ and diffs any two snapshots to find leaks.
+
+Usage:
+    python manage.py memory_report --warm 5
+    python manage.py memory_report --warm 50 --leak-check --tracemalloc 1
+    python manage.py memory_report --warm 5 --output before.json
+    python manage.py memory_report --diff before.json after.json
+    python manage.py memory_report --workers
+
+--diff accepts snapshot ids from MEMORY_SNAPSHOT_DIR or JSON file paths.
+"""
+import json
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from apps.core import diagnostics
+
+from .benchmark_http import discover_routes
+
+
+def format_bytes(value):
+    if value is None:
+        return "-"
+    return f"{value / 1024 / 1024:,.2f} MB" if abs(value) >= 1024 * 1024 else f"{value / 1024:,.1f} KB"
+
+
+class Command(BaseCommand):
+    help = "Report per-process memory (RSS, caches, top allocators) and diff snapshots to find leaks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--warm", type=int, default=0, help="Request every public route this many times first")
+        parser.add_argument("--host", default="localhost", help="Host header for --warm (selects the site)")
+        parser.add_argument(
+            "--tracemalloc", type=int, default=0, help="Trace allocations with this many frames (before warming)"
+        )
+        parser.add_argument(
+            "--leak-check",
+            action="store_true",
+            help="Diff a snapshot after the first warm-up pass against one after the last",
+        )
+        parser.add_argument("--top", type=int, default=diagnostics.TOP_ALLOCATIONS, help="Allocators to show")
+        parser.add_argument("--output", help="Write the snapshot as JSON to this file")
+        parser.add_argument("--save", metavar="LABEL", help="Save the snapshot to MEMORY_SNAPSHOT_DIR")
+        parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="Diff two snapshots (ids or files)")
+        parser.add_argument("--workers", action="store_true", help="List saved snapshots from every worker")
+
+    def handle(self, *args, **options):
+        if options["diff"]:
+            old, new = (self._load(ref) for ref in options["diff"])
+            self._write_diff(diagnostics.diff_snapshots(old, new, options["top"]))
+            return
+        if options["workers"]:
+            self._write_workers()
+            return
+
+        if options["tracemalloc"] and not tracemalloc.is_tracing():
+            tracemalloc.start(options["tracemalloc"])
+        if options["leak_check"] and options["warm"] < 2:
+            raise CommandError("--leak-check needs --warm 2 or more")
+
+        baseline = None
+        if options["warm"]:
+            routes = discover_routes(options["host"])
+            client = Client(HTTP_HOST=options["host"], raise_request_exception=False)
+            for i in range(options["warm"]):
+                for _label, path in routes:
+                    client.get(path)
+                if i == 0 and options["leak_check"]:
+                    baseline = diagnostics.take_snapshot(label="after first pass")
+            self.stdout.write(f"Warmed up: {options['warm']} pass(es) over {len(routes)} routes\n")
+
+        snapshot = diagnostics.take_snapshot(label=options["save"] or "")
+        self._write_snapshot(snapshot, options["top"])
+
+        if baseline is not None:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\nGrowth over the last {options['warm'] - 1} pass(es)"))
+            self._write_diff(diagnostics.diff_snapshots(baseline, snapshot, options["top"]))
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(snapshot, indent=2))
+            self.stdout.write(f"\nSnapshot written to {options['output']}")
+        if options["save"] is not None:
+            self.stdout.write(f"\nSaved snapshot {diagnostics.save_snapshot(snapshot)}")
+
+    def _load(self, ref):
+        snapshot = diagnostics.load_snapshot(ref)
+        if snapshot is None:
+            path = Path(ref)
+            if not path.exists():
+                raise CommandError(f"No snapshot id or file {ref!r}")
+            snapshot = json.loads(path.read_text())
+        return snapshot
+
+    def _write_snapshot(self, snapshot, top):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Process {snapshot['pid']}"))
+        self.stdout.write(f"  RSS                  {format_bytes(snapshot['rss'])}")
+        traced = snapshot["traced_bytes"]
+        self.stdout.write(f"  traced (tracemalloc) {format_bytes(traced) if traced is not None else 'off'}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nCaches"))
+        for alias, cache in snapshot["caches"].items():
+            if cache["entries"] is None:
+                self.stdout.write(f"  {alias} ({cache['backend']}): shared, not per-process")
+                continue
+            self.stdout.write(
+                f"  {alias} ({cache['backend']}): {cache['entries']} entries, {format_bytes(cache['bytes'])}"
+            )
+            for prefix, (entries, size) in sorted(cache["prefixes"].items(), key=lambda item: -item[1][1]):
+                self.stdout.write(f"    {prefix:<40} {entries:>6} {format_bytes(size):>12}")
+        for name, stats in snapshot["in_process"].items():
+            self.stdout.write(f"  {name:<42} {stats['entries']:>6} {format_bytes(stats['bytes']):>12}")
+
+        if snapshot["allocations"]:
+            self.stdout.write(self.style.MIGRATE_HEADING("\nTop allocators"))
+            for line, size, count in snapshot["allocations"][:top]:
+                self.stdout.write(f"  {format_bytes(size):>12} {count:>8}  {line}")
+
+    def _write_diff(self, diff):
+        self.stdout.write(f"  RSS     {format_bytes(diff['rss'])}")
+        self.stdout.write(f"  traced  {format_bytes(diff['traced_bytes'])}")
+        for alias, stats in diff["caches"].items():
+            self.stdout.write(f"  cache {alias}: {stats['entries']} entries, {format_bytes(stats['bytes'])}")
+        for name, stats in diff["in_process"].items():
+            if stats["entries"] or stats["bytes"]:
+                self.stdout.write(f"  {name}: {stats['entries']} entries, {format_bytes(stats['bytes'])}")
+        if diff["allocations"] is None:
+            self.stdout.write("  (allocation growth needs both snapshots taken with tracemalloc on)")
+            return
+        for line, size, count in diff["allocations"]:
+            self.stdout.write(f"  {format_bytes(size):>12} {count:>+8}  {line}")
+
+    def _write_workers(self):
+        snapshots = diagnostics.list_snapshots()
+        if not snapshots:
+            self.stdout.write("No saved snapshots. Save them per worker at /admin/memory/ or with --save.")
+            return
+        self.stdout.write(f"{'Snapshot':<42} {'PID':>7} {'RSS then':>12} {'RSS now':>12}  Label")
+        for snapshot in snapshots:
+            live = format_bytes(snapshot["live_rss"]) if snapshot["live_rss"] is not None else "exited"
+            self.stdout.write(
+                f"{snapshot['id']:<42} {snapshot['pid']:>7} {format_bytes(snapshot['rss']):>12} {live:>12}"
+                f"  {snapshot['label']}"
+            )
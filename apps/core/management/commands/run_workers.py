@@ -0,0 +1,76 @@
+"""
+Run background job workers (see apps.core.jobs).
+
+Starts --processes worker processes that claim and run queued jobs, and
+restarts any that exit unexpectedly. SIGTERM or SIGINT (docker stop,
+Ctrl-C) lets each worker finish its current job and exit.
+
+Usage:
+    python manage.py run_workers
+    python manage.py run_workers --processes 4 --poll 0.5
+    python manage.py run_workers --burst     # run the queued jobs once, then exit
+"""
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core import jobs
+
+
+def worker(stop, poll_interval, burst):
+    import django
+
+    django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent sets stop
+    jobs.work(stop=stop.is_set, poll_interval=poll_interval, burst=burst)
+
+
+class Command(BaseCommand):
+    help = "Run worker processes for the database job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2, help="Number of worker processes (default 2)")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        if not jobs.is_enabled():
+            self.stderr.write(self.style.WARNING("JOBS_ENABLED is off: jobs run inline and nothing is queued"))
+        if options["burst"]:
+            processed = jobs.work(stop=lambda: False, poll_interval=options["poll"], burst=True)
+            self.stdout.write(self.style.SUCCESS(f"Ran {processed} jobs"))
+            return
+
+        context = multiprocessing.get_context("spawn")
+        stop = context.Event()
+        stopping = []  # set from the signal handler; stop.set() there can deadlock with the main loop
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stopping.append(True))
+
+        def start():
+            process = context.Process(target=worker, args=(stop, options["poll"], False), daemon=True)
+            process.start()
+            return process
+
+        connections.close_all()  # don't share the parent's connections
+        processes = [start() for _ in range(options["processes"])]
+        self.stdout.write(
+            f"Started {len(processes)} workers (timeout {settings.JOBS_TIMEOUT}s); stop with SIGTERM or Ctrl-C"
+        )
+        while not stopping:
+            for i, process in enumerate(processes):
+                if not process.is_alive():
+                    self.stderr.write(f"Worker {process.pid} exited with code {process.exitcode}, restarting")
+                    processes[i] = start()
+            time.sleep(1)
+
+        stop.set()
+        for process in processes:
+            process.join(timeout=settings.JOBS_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        self.stdout.write("Workers stopped")
@@ -0,0 +1,114 @@
+"""
+Single-flight memoization for expensive model methods and properties.
+
+    class Trip(models.Model):
+        @memoize(timeout=600)
+        def get_similar_trips(self, limit=4): ...
+
+        @memoized_property
+        def related_guides(self): ...
+
+Results are cached per model instance (label and pk), method and
+arguments, and tagged with the content version (see apps.core.versioning)
+so content changes invalidate them. Misses go through pagecache.swr(), so
+when a result expires only one caller recomputes it while concurrent
+callers get the previous value for up to `stale` more seconds.
+
+Within a request (RequestMemoMiddleware, or the request_memo() context
+manager elsewhere) results are also kept in a plain dict, so repeated
+calls during one page render return the same object without touching the
+cache. Returned querysets are evaluated when cached; results must be
+picklable. Unsaved instances and MEMOIZE_ENABLED = False skip the cache.
+"""
+import contextlib
+import contextvars
+import functools
+import hashlib
+import inspect
+
+from django.conf import settings
+
+from .pagecache import swr
+from .versioning import get_content_version
+
+_request_memo = contextvars.ContextVar("request_memo", default=None)
+
+
+@contextlib.contextmanager
+def request_memo():
+    """Share memoized results between calls made inside this block."""
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+def memo_key(instance, method, args, kwargs):
+    arguments = hashlib.md5(repr((args, sorted(kwargs.items()))).encode(), usedforsecurity=False).hexdigest()
+    return f"memo:{instance._meta.label_lower}:{instance.pk}:{method.__qualname__}:{arguments}"
+
+
+def memoize(method=None, *, timeout=300, stale=60, lock_timeout=10, wait=1):
+    """
+    Memoize a model method (use as @memoize or @memoize(timeout=...)).
+
+    timeout is how long a result is fresh, stale how much longer it may be
+    served while one caller recomputes it, lock_timeout how long that
+    recomputation may take, and wait how long a caller with nothing cached
+    waits for another caller's result before computing its own.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.pk is None or not getattr(settings, "MEMOIZE_ENABLED", True):
+                return method(self, *args, **kwargs)
+
+            key = memo_key(self, method, args, kwargs)
+            memo = _request_memo.get()
+            if memo is not None and key in memo:
+                return memo[key]
+            value, _state = swr(
+                key,
+                lambda: method(self, *args, **kwargs),
+                soft=timeout,
+                hard=timeout + stale,
+                lock_timeout=lock_timeout,
+                version=get_content_version(),
+                wait=wait,
+            )
+            if memo is not None:
+                memo[key] = value
+            return value
+
+        wrapper.uncached = method
+        return wrapper
+
+    return decorator(method) if callable(method) else decorator
+
+
+def memoized_property(method=None, **options):
+    """A read-only property memoized like memoize()."""
+    if callable(method):
+        return property(memoize(method))
+    return lambda method: property(memoize(method, **options))
+
+
+def warm(instance):
+    """Recompute instance's memoized properties and argument-less methods (e.g. after it changed)."""
+    seen = set()
+    for klass in type(instance).__mro__:
+        for name, attr in vars(klass).items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if isinstance(attr, property) and hasattr(attr.fget, "uncached"):
+                getattr(instance, name)
+            elif hasattr(attr, "uncached") and not _needs_arguments(attr.uncached):
+                getattr(instance, name)()
+
+
+def _needs_arguments(method):
+    parameters = list(inspect.signature(method).parameters.values())[1:]
+    return any(p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters)
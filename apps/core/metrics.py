@@ -0,0 +1,185 @@
+"""
+Request metrics aggregated across worker processes.
+
+MetricsMiddleware (apps.core.middleware) records, per view and site, a
+latency histogram, a DB-queries-per-request histogram, status-code counts
+and cache gets/hits. Each worker keeps cumulative counters in memory and
+periodically writes them to its own file in METRICS_DIR; the /metrics
+endpoint merges every worker's file into Prometheus text format. No
+external services are involved, and files from workers that have exited
+keep their totals so counters stay monotonic.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+FLUSH_INTERVAL = 5  # seconds
+
+_series = {}
+_lock = threading.Lock()
+_last_flush = 0.0
+_process_id = ""
+
+
+def _new_process_id():
+    """Name this process's file; a PID alone is reused by a restarted worker, which would overwrite its totals."""
+    global _process_id
+    _process_id = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+
+
+_new_process_id()
+# Workers forked from a preloaded master get their own id
+os.register_at_fork(after_in_child=_new_process_id)
+
+
+def get_metrics_dir():
+    return Path(getattr(settings, "METRICS_DIR", Path(settings.BASE_DIR) / "var" / "metrics"))
+
+
+def _new_series():
+    return {
+        "latency": [0] * (len(LATENCY_BUCKETS) + 1),
+        "latency_sum": 0.0,
+        "queries": [0] * (len(QUERY_BUCKETS) + 1),
+        "queries_sum": 0,
+        "status": {},
+        "cache_gets": 0,
+        "cache_hits": 0,
+    }
+
+
+def _bucket(buckets, value):
+    """Index of the first bucket whose upper bound is >= value (last index is +Inf)."""
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+def record(view, site, status, seconds, queries, cache_gets, cache_hits):
+    """Add one request to this worker's counters, flushing to disk every FLUSH_INTERVAL."""
+    key = f"{view}|{site}"
+    with _lock:
+        series = _series.get(key)
+        if series is None:
+            series = _series[key] = _new_series()
+        series["latency"][_bucket(LATENCY_BUCKETS, seconds)] += 1
+        series["latency_sum"] += seconds
+        series["queries"][_bucket(QUERY_BUCKETS, queries)] += 1
+        series["queries_sum"] += queries
+        series["status"][str(status)] = series["status"].get(str(status), 0) + 1
+        series["cache_gets"] += cache_gets
+        series["cache_hits"] += cache_hits
+    if time.monotonic() - _last_flush > FLUSH_INTERVAL:
+        flush()
+
+
+def flush():
+    """Write this worker's cumulative counters to METRICS_DIR/<pid>-<uuid>.json (atomically)."""
+    global _last_flush
+    with _lock:
+        data = json.dumps(_series)
+        _last_flush = time.monotonic()
+    directory = get_metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{_process_id}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(data)
+    os.replace(tmp, path)
+
+
+def collect():
+    """Merge every worker's file into one {key: series} dict."""
+    flush()
+    merged = {}
+    for path in get_metrics_dir().glob("*.json"):
+        try:
+            worker = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for key, series in worker.items():
+            total = merged.setdefault(key, _new_series())
+            total["latency"] = [a + b for a, b in zip(total["latency"], series["latency"], strict=True)]
+            total["latency_sum"] += series["latency_sum"]
+            total["queries"] = [a + b for a, b in zip(total["queries"], series["queries"], strict=True)]
+            total["queries_sum"] += series["queries_sum"]
+            for status, count in series["status"].items():
+                total["status"][status] = total["status"].get(status, 0) + count
+            total["cache_gets"] += series["cache_gets"]
+            total["cache_hits"] += series["cache_hits"]
+    return merged
+
+
+def _labels(**labels):
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped, strict=True)) + "}"
+
+
+def _histogram(lines, name, buckets, counts, total, labels):
+    cumulative = 0
+    for bound, count in zip((*buckets, "+Inf"), counts, strict=True):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {total}")
+    lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+
+
+def render_prometheus(merged):
+    """Render merged series in the Prometheus text exposition format."""
+    lines = [
+        "# HELP traverse_request_duration_seconds Request latency by view and site.",
+        "# TYPE traverse_request_duration_seconds histogram",
+    ]
+    for key, series in sorted(merged.items()):
+        view, site = key.split("|", 1)
+        _histogram(
+            lines,
+            "traverse_request_duration_seconds",
+            LATENCY_BUCKETS,
+            series["latency"],
+            round(series["latency_sum"], 6),
+            {"view": view, "site": site},
+        )
+
+    lines += [
+        "# HELP traverse_db_queries_per_request Database queries per request by view and site.",
+        "# TYPE traverse_db_queries_per_request histogram",
+    ]
+    for key, series in sorted(merged.items()):
+        view, site = key.split("|", 1)
+        _histogram(
+            lines,
+            "traverse_db_queries_per_request",
+            QUERY_BUCKETS,
+            series["queries"],
+            series["queries_sum"],
+            {"view": view, "site": site},
+        )
+
+    lines += [
+        "# HELP traverse_requests_total Responses by view, site and status code.",
+        "# TYPE traverse_requests_total counter",
+    ]
+    for key, series in sorted(merged.items()):
+        view, site = key.split("|", 1)
+        for status, count in sorted(series["status"].items()):
+            lines.append(f"traverse_requests_total{_labels(view=view, site=site, status=status)} {count}")
+
+    # Hit ratio is rate(hits) / rate(gets) in PromQL
+    for metric, field, help_text in (
+        ("traverse_cache_gets_total", "cache_gets", "Cache reads by view and site."),
+        ("traverse_cache_hits_total", "cache_hits", "Cache reads that hit, by view and site."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for key, series in sorted(merged.items()):
+            view, site = key.split("|", 1)
+            lines.append(f"{metric}{_labels(view=view, site=site)} {series[field]}")
+
+    return "\n".join(lines) + "\n"
@@ -4,8 +4,27 @@ Site configuration middleware for multi-portal support.
 Detects the current site from the request domain and attaches
 the SiteConfiguration to the request object.
 """
+import contextlib
+import cProfile
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils import timezone
+
+from . import instrumentation, memo, metrics, profiling
+
+logger = logging.getLogger("apps.performance")
+
+# Only one cProfile profiler may be active per process (Python 3.12+ raises
+# ValueError otherwise), so concurrent sampled requests take turns.
+_cprofile_lock = threading.Lock()
 
 
 class SiteConfigurationMiddleware:
@@ -25,7 +44,8 @@ class SiteConfigurationMiddleware:
         from django.http import HttpResponse
 
         # Get site configuration for this request
-        request.site, request.site_config = self._get_site_config(request)
+        with instrumentation.timer("site"):
+            request.site, request.site_config = self._get_site_config(request)
 
         # Check if site is disabled (but allow admin access)
         if (
@@ -107,3 +127,248 @@ class SiteConfigurationMiddleware:
         result = (site, config)
         cache.set(cache_key, result, self.CACHE_TIMEOUT)
         return result
+
+
+class PerformanceInstrumentationMiddleware:
+    """
+    Records per-request SQL, cache, template, glossary and site timings.
+
+    Adds a Server-Timing header (for staff, or everyone when
+    PERFORMANCE_SERVER_TIMING is "all") and logs one structured line per
+    request to the "apps.performance" logger. Place it first so it wraps
+    every other middleware.
+
+    Disabled unless PERFORMANCE_INSTRUMENTATION is True, in which case it
+    removes itself from the middleware chain at startup.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERFORMANCE_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "PERFORMANCE_SERVER_TIMING", "staff")
+        instrumentation.install()
+
+    def __call__(self, request):
+        metrics, token = instrumentation.start()
+        try:
+            with instrumentation.sql_wrappers():
+                response = self.get_response(request)
+        finally:
+            instrumentation.stop(token)
+
+        if self._show_server_timing(request):
+            response["Server-Timing"] = metrics.server_timing()
+
+        site = getattr(request, "site", None)
+        match = getattr(request, "resolver_match", None)
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "view": match.view_name if match else None,
+            "site": site.domain if site else None,
+            **metrics.as_dict(),
+        }
+        logger.info(" ".join(f"{key}={value}" for key, value in fields.items()), extra={"metrics": fields})
+        return response
+
+    def _show_server_timing(self, request):
+        if self.server_timing == "all":
+            return True
+        user = getattr(request, "user", None)
+        return self.server_timing == "staff" and user is not None and user.is_staff
+
+
+class MetricsMiddleware:
+    """
+    Records per-view, per-site latency, query, status and cache metrics.
+
+    Place it right after SiteConfigurationMiddleware so request.site is
+    set. Counters are aggregated across workers by apps.core.metrics and
+    exposed at /metrics. Disabled unless METRICS_ENABLED is True.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrumentation.install()
+
+    def __call__(self, request):
+        # Share the counters of PerformanceInstrumentationMiddleware when it runs
+        request_metrics = instrumentation.current()
+        if request_metrics is not None:
+            response = self.get_response(request)
+        else:
+            request_metrics, token = instrumentation.start()
+            try:
+                with instrumentation.sql_wrappers():
+                    response = self.get_response(request)
+            finally:
+                instrumentation.stop(token)
+
+        site = getattr(request, "site", None)
+        match = getattr(request, "resolver_match", None)
+        metrics.record(
+            # Unresolved paths share one label to bound cardinality
+            view=match.view_name if match else "unmatched",
+            site=site.domain if site else "",
+            status=response.status_code,
+            seconds=request_metrics.total_ms / 1000,
+            queries=request_metrics.sql_count,
+            cache_gets=request_metrics.cache_gets,
+            cache_hits=request_metrics.cache_hits,
+        )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles sampled and slow requests (see apps.core.profiling).
+
+    A PROFILING_SAMPLE_RATE fraction of requests runs under cProfile and is
+    always kept. With PROFILING_SLOW_MS set, the remaining requests run
+    under a stack sampler and are kept only when slower than that. cProfile
+    profiles one request at a time per process; a sampled request that finds
+    it busy is treated as unsampled. Place it
+    after SiteConfigurationMiddleware. Disabled unless PROFILING_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.slow_ms = getattr(settings, "PROFILING_SLOW_MS", None)
+        self.interval = getattr(settings, "PROFILING_INTERVAL_MS", 5) / 1000
+        instrumentation.install()
+
+    def __call__(self, request):
+        profiler = None
+        if random.random() < self.sample_rate and _cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiling tool (a debugger, coverage) is active
+                _cprofile_lock.release()
+                profiler = None
+        if profiler is None and not self.slow_ms:
+            return self.get_response(request)
+        try:
+            return self._profile(request, profiler)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _cprofile_lock.release()
+
+    def _profile(self, request, profiler):
+        """Run the request under profiler (enabled cProfile) or, if None, a stack sampler."""
+        sampled = profiler is not None
+        if not sampled:
+            profiler = profiling.StackSampler(threading.get_ident(), self.interval)
+        query_log = profiling.QueryLog()
+
+        # Share the counters of the instrumentation/metrics middleware when one runs
+        request_metrics, token = instrumentation.current(), None
+        if request_metrics is None:
+            request_metrics, token = instrumentation.start()
+
+        started = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                if token is not None:
+                    stack.enter_context(instrumentation.sql_wrappers())
+                stack.enter_context(connection.execute_wrapper(query_log))
+                if sampled:
+                    try:
+                        response = self.get_response(request)
+                    finally:
+                        profiler.disable()
+                else:
+                    profiler.start()
+                    try:
+                        response = self.get_response(request)
+                    finally:
+                        profiler.stop()
+        finally:
+            if token is not None:
+                instrumentation.stop(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if sampled or duration_ms >= self.slow_ms:
+            self._save(request, response, duration_ms, request_metrics, query_log, profiler, sampled)
+        return response
+
+    def _save(self, request, response, duration_ms, request_metrics, query_log, profiler, sampled):
+        site = getattr(request, "site", None)
+        match = getattr(request, "resolver_match", None)
+        meta = {
+            "created": timezone.now().isoformat(),
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "view": match.view_name if match else None,
+            "site": site.domain if site else None,
+            "duration_ms": round(duration_ms, 2),
+            "trigger": "sampled" if sampled else "slow",
+            "engine": "cprofile" if sampled else "stack sampler",
+            "timings": request_metrics.as_dict(),
+            "sql_count": query_log.count,
+            "sql": query_log.entries,
+        }
+        try:
+            if sampled:
+                report = profiling.cprofile_report(profiler)
+                profiling.save_profile(meta, report, profiling.dump_cprofile(profiler), ".prof")
+            else:
+                profiling.save_profile(meta, profiler.report(), profiler.folded(), ".folded")
+        except OSError:
+            logger.exception("Could not save request profile")
+
+
+class TemplateQueryDetectorMiddleware:
+    """
+    Reports queries triggered from templates (see apps.core.template_queries).
+
+    TEMPLATE_QUERY_DETECTOR = "log" logs a per-request report when templates
+    run queries; "raise" raises TemplateQueryBudgetExceeded over
+    TEMPLATE_QUERY_BUDGET or on any N+1 pattern, which fails tests that use
+    the test client. Debug/test only; disabled by default.
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, "TEMPLATE_QUERY_DETECTOR", "off")
+        if self.mode not in ("log", "raise"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budget = getattr(settings, "TEMPLATE_QUERY_BUDGET", None)
+
+    def __call__(self, request):
+        from .template_queries import TemplateQueryDetector
+
+        with TemplateQueryDetector() as detector:
+            response = self.get_response(request)
+
+        if self.mode == "raise":
+            detector.check_budget(max_queries=self.budget)
+        elif detector.queries:
+            logger.warning("Template queries for %s\n%s", request.path, detector.report())
+        return response
+
+
+class RequestMemoMiddleware:
+    """
+    Per-request memo layer for apps.core.memo: memoized model methods called
+    more than once while handling a request return the same result without
+    another cache lookup. Disabled when MEMOIZE_ENABLED is False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "MEMOIZE_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with memo.request_memo():
+            return self.get_response(request)
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_siteconfiguration_is_active"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="region",
+            index=models.Index(
+                fields=["parent", "display_order", "name"],
+                name="region_parent_order_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="region",
+            index=models.Index(
+                fields=["is_featured", "display_order", "name"],
+                name="region_featured_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="universaltag",
+            index=models.Index(fields=["display_order", "name"], name="tag_order_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="universaltag",
+            index=models.Index(
+                fields=["is_featured", "display_order", "name"], name="tag_featured_idx"
+            ),
+        ),
+    ]
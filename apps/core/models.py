@@ -4,6 +4,10 @@ Contains UniversalTag and Region models that bind content together.
 """
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
+
+from .memo import memoize
+from .querycache import CachedQuerySet
 
 
 class UniversalTag(models.Model):
@@ -32,10 +36,16 @@ class UniversalTag(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CachedQuerySet.as_manager()
+
     class Meta:
         ordering = ["display_order", "name"]
         verbose_name = "Universal Tag"
         verbose_name_plural = "Universal Tags"
+        indexes = [
+            models.Index(fields=["display_order", "name"], name="tag_order_idx"),
+            models.Index(fields=["is_featured", "display_order", "name"], name="tag_featured_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -50,6 +60,9 @@ class UniversalTag(models.Model):
         Returns a dict with:
         - 'trips': QuerySet of published Trip objects
         - 'blogs': QuerySet of published BlogPost objects
+
+        Not memoized: the querysets are lazy and unbounded, so a memo would pickle every
+        published trip and post of the tag; TagDetailView is page-cached instead.
         """
         return {
             "trips": self.trips.filter(is_published=True).select_related("region"),
@@ -95,10 +108,16 @@ class Region(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CachedQuerySet.as_manager()
+
     class Meta:
         ordering = ["display_order", "name"]
         verbose_name = "Region"
         verbose_name_plural = "Regions"
+        indexes = [
+            models.Index(fields=["parent", "display_order", "name"], name="region_parent_order_idx"),
+            models.Index(fields=["is_featured", "display_order", "name"], name="region_featured_idx"),
+        ]
 
     def __str__(self):
         if self.parent:
@@ -124,11 +143,24 @@ class Region(models.Model):
             descendants.extend(child.get_descendants())
         return descendants
 
+    @memoize
+    def get_descendant_ids(self):
+        """Return ids of all descendant regions, from one query over the region tree."""
+        children = {}
+        for region_id, parent_id in Region.objects.filter(parent__isnull=False).values_list("id", "parent_id"):
+            children.setdefault(parent_id, []).append(region_id)
+        ids, pending = [], list(children.get(self.id, []))
+        while pending:
+            region_id = pending.pop()
+            ids.append(region_id)
+            pending.extend(children.get(region_id, []))
+        return ids
+
     def get_all_trips(self):
         """Get trips from this region and all sub-regions."""
         from apps.trips.models import Trip
 
-        region_ids = [self.id] + [r.id for r in self.get_descendants()]
+        region_ids = [self.id, *self.get_descendant_ids()]
         return Trip.objects.filter(region_id__in=region_ids, is_published=True)
 
 
@@ -224,10 +256,13 @@ class SiteConfiguration(models.Model):
         return f"{self.brand_name} ({self.site.domain})"
 
     def save(self, *args, **kwargs):
-        """Clear cache when site configuration is saved."""
+        """Clear cache and compile the theme stylesheet when site configuration is saved."""
         from django.core.cache import cache
 
+        from .theme import build_theme
+
         super().save(*args, **kwargs)
+        build_theme(self)
 
         # Clear cache for this site's domain
         if self.site:
@@ -247,3 +282,57 @@ class SiteConfiguration(models.Model):
             return cls.objects.select_related("site").get(site=current_site)
         except cls.DoesNotExist:
             return None
+
+
+class Job(models.Model):
+    """
+    A background job in the database-backed queue (see apps.core.jobs).
+
+    Workers (manage.py run_workers) claim queued jobs whose run_at has
+    passed, highest priority first. Only one queued job may hold a given
+    dedupe key, so enqueueing the same work twice before it runs is a no-op.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=200, help_text="Registered task (module.function)")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    key = models.CharField(max_length=200, blank=True, help_text="Dedupe key: one queued job per key")
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now, help_text="Not run before this time")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker running the job")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-priority", "run_at", "id"]
+        verbose_name = "Background Job"
+        verbose_name_plural = "Background Jobs"
+        indexes = [
+            models.Index(fields=["status", "-priority", "run_at"], name="job_claim_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(status="queued") & ~models.Q(key=""),
+                name="job_unique_queued_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,130 @@
+"""
+Stale-while-revalidate page cache with request coalescing.
+
+swr() keeps each value with a soft expiry (after which it is stale) and a
+hard expiry (the cache timeout). When a value goes stale, the first
+request to take a lock in the shared cache regenerates it; every other
+request gets the stale copy straight away instead of piling onto the
+database. On a cold miss there is nothing stale to serve, so other
+requests poll briefly for the lock holder's result before giving up and
+rendering themselves. Values built from an older content version (see
+apps.core.versioning) are treated as stale.
+
+PageCacheMixin applies this to anonymous GET requests of a class-based
+view, keyed by host and full path. Per view:
+
+    class HomeView(PageCacheMixin, TemplateView):
+        page_cache_soft = 60    # seconds until stale
+        page_cache_hard = 3600  # seconds until evicted
+        page_cache_lock = 30    # seconds a regeneration may hold the lock
+        page_cache_wait = 2     # seconds a cold miss waits for the lock holder
+
+Responses carry X-Page-Cache: hit, stale, refresh, miss or coalesced.
+The lock uses cache.add(), which is atomic on Redis and Memcached; with
+LocMemCache it only coalesces within one worker.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .versioning import get_content_version
+
+POLL_INTERVAL = 0.05  # seconds
+
+
+def swr(key, regenerate, soft, hard, lock_timeout, version=None, wait=0, cacheable=None):
+    """
+    Return (value, state) for key, calling regenerate() when missing or stale.
+
+    state is "hit", "stale" (served while another request regenerates),
+    "refresh" (this request regenerated a stale value), "miss" or
+    "coalesced" (a cold miss served from another request's regeneration).
+    Values for which cacheable(value) is false are returned but not stored.
+    """
+    entry = cache.get(key)
+    if entry is not None and entry["fresh_until"] > time.time() and entry["version"] == version:
+        return entry["value"], "hit"
+
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, lock_timeout):
+        try:
+            value = regenerate()
+            if cacheable is None or cacheable(value):
+                cache.set(key, {"value": value, "fresh_until": time.time() + soft, "version": version}, hard)
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        return value, "miss" if entry is None else "refresh"
+
+    if entry is not None:
+        return entry["value"], "stale"
+
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"], "coalesced"
+    return regenerate(), "miss"
+
+
+def page_key(host, full_path):
+    path = hashlib.md5(full_path.encode(), usedforsecurity=False).hexdigest()
+    return f"pagecache:{host}:{path}"
+
+
+def page_cache_key(request):
+    return page_key(request.get_host(), request.get_full_path())
+
+
+def purge_page(full_path, hosts):
+    """Drop the cached page at full_path on each host, so its next visitor gets a fresh render."""
+    cache.delete_many([page_key(host, full_path) for host in hosts])
+
+
+def is_page_cacheable(request):
+    """Only anonymous GETs are cached (when PAGE_CACHE_ENABLED)."""
+    if not getattr(settings, "PAGE_CACHE_ENABLED", False) or request.method != "GET":
+        return False
+    user = getattr(request, "user", None)
+    return user is None or not user.is_authenticated
+
+
+def is_response_cacheable(response):
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+class PageCacheMixin:
+    """Serve a class-based view's anonymous GETs through swr()."""
+
+    page_cache_soft = 60
+    page_cache_hard = 3600
+    page_cache_lock = 30
+    page_cache_wait = 2
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        def regenerate():
+            response = super(PageCacheMixin, self).dispatch(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()
+            return response
+
+        response, state = swr(
+            page_cache_key(request),
+            regenerate,
+            soft=self.page_cache_soft,
+            hard=self.page_cache_hard,
+            lock_timeout=self.page_cache_lock,
+            version=get_content_version(),
+            wait=self.page_cache_wait,
+            cacheable=is_response_cacheable,
+        )
+        response["X-Page-Cache"] = state
+        return response
@@ -0,0 +1,164 @@
+"""
+Sampling profiler for slow or randomly sampled requests.
+
+ProfilingMiddleware (apps.core.middleware) profiles a PROFILING_SAMPLE_RATE
+fraction of requests with cProfile. With PROFILING_SLOW_MS set, every other
+request runs under a lightweight stack sampler instead (a thread reading
+the request thread's frame every PROFILING_INTERVAL_MS) so a profile exists
+when a request turns out to be slow.
+
+Each kept profile is written to PROFILING_DIR as <id>.json (view, site,
+timings, SQL log and report) plus <id>.prof (cProfile, for snakeviz or
+pstats) or <id>.folded (collapsed stacks, for flamegraph tools). Only the
+newest PROFILING_MAX_FILES profiles are kept. Staff browse them at
+/admin/profiles/.
+"""
+import io
+import json
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+MAX_SQL_ENTRIES = 200
+REPORT_LINES = 60
+
+PROFILE_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+
+
+def get_profile_dir():
+    return Path(getattr(settings, "PROFILING_DIR", Path(settings.BASE_DIR) / "var" / "profiles"))
+
+
+class StackSampler:
+    """Collects collapsed stacks of one thread by periodic sampling."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        """Stacks in the collapsed format used by flamegraph.pl / speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def report(self):
+        """Top frames by inclusive samples (on the stack), with self samples (leaf)."""
+        total = sum(self.stacks.values())
+        inclusive, own = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        lines = [f"{total} samples every {self.interval * 1000:g} ms", "", f"{'total':>7} {'self':>7}  frame"]
+        for frame, count in inclusive.most_common(REPORT_LINES):
+            lines.append(f"{count / total:>7.1%} {own[frame] / total:>7.1%}  {frame}")
+        return "\n".join(lines)
+
+
+class QueryLog:
+    """connection.execute_wrapper() hook keeping the first MAX_SQL_ENTRIES queries."""
+
+    def __init__(self):
+        self.entries = []
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            if len(self.entries) < MAX_SQL_ENTRIES:
+                self.entries.append({"sql": sql, "ms": round((time.perf_counter() - started) * 1000, 3)})
+
+
+def cprofile_report(profiler):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(REPORT_LINES)
+    return stream.getvalue()
+
+
+def save_profile(meta, report, raw, suffix):
+    """Write <id>.json and the raw profile file, then rotate old profiles; returns the id."""
+    directory = get_profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+    raw_path = directory / f"{profile_id}{suffix}"
+    if isinstance(raw, bytes):
+        raw_path.write_bytes(raw)
+    else:
+        raw_path.write_text(raw)
+    meta = {**meta, "id": profile_id, "report": report, "raw_file": raw_path.name}
+    (directory / f"{profile_id}.json").write_text(json.dumps(meta, indent=2))
+
+    rotate(directory, getattr(settings, "PROFILING_MAX_FILES", 100))
+    return profile_id
+
+
+def rotate(directory, keep):
+    """Delete all but the newest keep profiles (ids sort by time)."""
+    for path in sorted(directory.glob("*.json"), reverse=True)[keep:]:
+        for related in directory.glob(f"{path.stem}.*"):
+            related.unlink(missing_ok=True)
+
+
+def list_profiles():
+    """Return profile metadata (without the report), newest first."""
+    profiles = []
+    for path in sorted(get_profile_dir().glob("*.json"), reverse=True):
+        try:
+            meta = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        meta.pop("report", None)
+        meta.pop("sql", None)
+        profiles.append(meta)
+    return profiles
+
+
+def load_profile(profile_id):
+    """Return a profile's metadata, or None if the id is unknown or malformed."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = get_profile_dir() / f"{profile_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def dump_cprofile(profiler):
+    """Return a cProfile in pstats marshal format."""
+    import marshal
+
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
@@ -0,0 +1,230 @@
+"""
+Cache-aside queryset cache with table-level invalidation.
+
+Opt in per queryset with .cached() on models whose manager is built from
+CachedQuerySet:
+
+    UniversalTag.objects.filter(is_featured=True).cached()[:8]
+
+Evaluated results (and count()) are stored in the default cache under a
+key made from the compiled SQL and parameters plus a version number for
+every table the SQL reads. Any write to one of those tables bumps its
+version, so stale entries are simply never read again and expire:
+
+- post_save, post_delete and m2m_changed for every model (signals.py-style
+  receivers, connected in CoreConfig.ready())
+- CachedQuerySet's update(), bulk_create(), bulk_update() and delete(),
+  which bypass those signals
+
+Inside a transaction, versions are bumped only on commit, so nothing is
+cached under a version that might be rolled back; until then, reads of the
+tables it wrote are cached under keys private to the transaction. With a per-process
+cache (LocMemCache) a write only invalidates the worker that made it;
+QUERY_CACHE_TIMEOUT bounds staleness elsewhere, as MAX_AGE does for the
+catalogue engine. Querysets with prefetch_related() or select_for_update()
+are never cached.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+TABLE_VERSION_PREFIX = "querycache:table:"
+RESULT_PREFIX = "querycache:result:"
+
+_known_tables = None
+
+
+def known_tables():
+    """Every table managed by an installed model, including M2M through tables."""
+    global _known_tables
+    if _known_tables is None:
+        from django.apps import apps
+
+        _known_tables = frozenset(model._meta.db_table for model in apps.get_models(include_auto_created=True))
+    return _known_tables
+
+
+def tables_in(sql):
+    """Return the known tables an SQL statement reads, joins or sub-selects."""
+    return sorted(table for table in known_tables() if f'"{table}"' in sql or f"`{table}`" in sql)
+
+
+def table_versions(tables):
+    """Return {table: version}, initialising missing versions from the clock."""
+    keys = {TABLE_VERSION_PREFIX + table: table for table in tables}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        # Seed from the clock so an evicted counter never repeats an old version
+        cache.add(key, time.time_ns(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def _bump(tables):
+    for table in tables:
+        key = TABLE_VERSION_PREFIX + table
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+class _PendingBump:
+    """on_commit callback bumping the tables written in the current transaction."""
+
+    def __init__(self):
+        self.tables = set()
+        self.token = uuid.uuid4().hex
+
+    def __call__(self):
+        _bump(self.tables)
+
+
+def _pending_bump(connection):
+    """Return the current transaction's _PendingBump (dropped by Django on rollback), or None."""
+    for _sids, func, _robust in connection.run_on_commit:
+        if isinstance(func, _PendingBump):
+            return func
+    return None
+
+
+def invalidate_tables(*tables, using="default"):
+    """Mark cached results that read any of these tables as stale (on commit, inside a transaction)."""
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        _bump(tables)
+        return
+    pending = _pending_bump(connection)
+    if pending is None:
+        pending = _PendingBump()
+        transaction.on_commit(pending, using=using)
+    pending.tables.update(tables)
+
+
+def invalidate_model(model, using="default"):
+    invalidate_tables(model._meta.db_table, using=using)
+
+
+class CachedQuerySet(models.QuerySet):
+    """QuerySet whose .cached() clones are served from the query cache."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_timeout = None
+
+    def cached(self, timeout=None):
+        """Return a clone whose results are cached (timeout defaults to QUERY_CACHE_TIMEOUT)."""
+        clone = self._chain()
+        clone._cache_timeout = timeout or getattr(settings, "QUERY_CACHE_TIMEOUT", 300)
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._cache_timeout = self._cache_timeout
+        return clone
+
+    def _cache_key(self, kind):
+        """Return the cache key for this query, or None if it can't be cached."""
+        if (
+            not self._cache_timeout
+            or not getattr(settings, "QUERY_CACHE_ENABLED", True)
+            or self._prefetch_related_lookups
+            or self.query.select_for_update
+        ):
+            return None
+        try:
+            sql, params = self.query.get_compiler(using=self.db).as_sql()
+        except EmptyResultSet:
+            return None
+        tables = tables_in(sql)
+        versions = table_versions(tables)
+        connection = connections[self.db]
+        pending = _pending_bump(connection) if connection.in_atomic_block else None
+        if pending is not None and pending.tables.intersection(tables):
+            # Rows this transaction wrote stay private to it until the commit bumps the versions
+            versions["transaction"] = pending.token
+        raw = repr((kind, self.db, self._iterable_class.__name__, self._fields, sql, params, sorted(versions.items())))
+        return RESULT_PREFIX + hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            key = self._cache_key("rows")
+            if key is not None:
+                rows = cache.get(key)
+                if rows is None:
+                    super()._fetch_all()
+                    cache.set(key, self._result_cache, self._cache_timeout)
+                else:
+                    self._result_cache = rows
+                return
+        super()._fetch_all()
+
+    def count(self):
+        if self._result_cache is None:
+            key = self._cache_key("count")
+            if key is not None:
+                count = cache.get(key)
+                if count is None:
+                    count = super().count()
+                    cache.set(key, count, self._cache_timeout)
+                return count
+        return super().count()
+
+    # Bulk writes bypass post_save/post_delete, so invalidate here
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate_model(self.model, using=self.db)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        invalidate_model(self.model, using=self.db)
+        return created
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        invalidate_model(self.model, using=self.db)
+        return rows
+
+    bulk_update.alters_data = True
+
+    def delete(self):
+        from django.apps import apps
+
+        deleted, per_model = super().delete()
+        invalidate_tables(
+            self.model._meta.db_table,
+            *(apps.get_model(label)._meta.db_table for label in per_model),
+            using=self.db,
+        )
+        return deleted, per_model
+
+    delete.alters_data = True
+
+
+def model_changed(sender, using="default", **kwargs):
+    """Invalidate the written model's table after any save or delete."""
+    invalidate_model(sender, using=using)
+
+
+def m2m_relation_changed(sender, action, using="default", **kwargs):
+    """Invalidate an M2M through table after add/remove/clear."""
+    if action.startswith("post_"):
+        invalidate_model(sender, using=using)
+
+
+def connect_signals():
+    post_save.connect(model_changed, dispatch_uid="querycache_save")
+    post_delete.connect(model_changed, dispatch_uid="querycache_delete")
+    m2m_changed.connect(m2m_relation_changed, dispatch_uid="querycache_m2m")
@@ -0,0 +1,167 @@
+"""
+Responsive images in rich-text (CKEditor) fields.
+
+Images uploaded through the editor land in CKEDITOR_5_UPLOAD_PATH and are
+embedded as a bare <img src> at full resolution. When a model in
+RICH_CONTENT_FIELDS is saved, render() rewrites each field into its
+derived <field>_html column: every <img> of an upload with variants (see
+images.py) becomes the same <picture> as {% responsive_image %} renders,
+with srcset/sizes, its intrinsic width and height, loading="lazy" and
+decoding="async"; other images keep their src and get the last two.
+Templates output the stored column, so rendering does no work:
+
+    {{ post.content_html|default:post.content|safe }}
+
+Uploads without variants yet are queued by signals.py: the job generates
+them and renders the fields again. backfill_images does both for existing
+content. Bulk writes keep the columns in sync through
+RichContentQuerySetMixin (TripQuerySet calls update_kwargs() itself); an
+update() that sets a rich-text field to an expression blanks its column,
+so templates fall back to the raw field.
+"""
+import html
+import logging
+import re
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from . import images
+
+logger = logging.getLogger(__name__)
+
+# Model label -> {rich-text field: the sizes attribute of its images}
+RICH_CONTENT_FIELDS = {
+    "content.BlogPost": {"content": "(min-width: 896px) 832px, 100vw"},
+    "trips.Trip": {"detailed_itinerary": "(min-width: 1280px) 680px, (min-width: 1024px) 55vw, 100vw"},
+    "glossary.Term": {"detailed_explanation": "(min-width: 896px) 832px, 100vw"},
+}
+
+IMG_RE = re.compile(r"<img\b([^>]*?)\s*/?>", re.I)
+ATTR_RE = re.compile(r"""([^\s"'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+
+# Attributes the rewrite sets itself on images with variants
+REPLACED = {"src", "srcset", "sizes", "width", "height", "loading", "decoding"}
+
+
+def html_field(field_name):
+    return f"{field_name}_html"
+
+
+def parse_attributes(source):
+    """Return the attributes of a tag as an ordered {name: unescaped value} dict."""
+    return {
+        match.group(1).lower(): html.unescape(next((v for v in match.groups()[1:] if v is not None), ""))
+        for match in ATTR_RE.finditer(source)
+    }
+
+
+def upload_name(src):
+    """Return the storage name of an editor upload's URL, or None for any other image."""
+    url = urlsplit(src)
+    prefix = settings.MEDIA_URL + settings.CKEDITOR_5_UPLOAD_PATH
+    if url.scheme or url.netloc or not url.path.startswith(prefix):
+        return None
+    return unquote(url.path[len(settings.MEDIA_URL) :])
+
+
+def uploads(content):
+    """Return the storage names of the editor uploads embedded in content."""
+    names = (upload_name(parse_attributes(match.group(1)).get("src", "")) for match in IMG_RE.finditer(content))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def rewrite(content, sizes):
+    """Return content with each <img> made responsive (uploads with variants) and lazy."""
+
+    def replace(match):
+        attrs = parse_attributes(match.group(1))
+        name = upload_name(attrs.get("src", ""))
+        info = images.cached_info(default_storage, name) if name and images.is_enabled() else {}
+        if not info:
+            return str(format_html("<img{}>", images.attributes({"loading": "lazy", **attrs, "decoding": "async"})))
+        img_attrs = {key: value for key, value in attrs.items() if key not in REPLACED}
+        img_attrs.update(loading=attrs.get("loading", "lazy"), decoding="async")
+        return str(images.picture(default_storage, name, info, sizes, img_attrs))
+
+    return IMG_RE.sub(replace, content)
+
+
+def render(instance):
+    """Set the <field>_html columns of instance from its rich-text fields."""
+    for field_name, sizes in RICH_CONTENT_FIELDS.get(instance._meta.label, {}).items():
+        setattr(instance, html_field(field_name), rewrite(getattr(instance, field_name), sizes))
+
+
+def with_html_fields(label, fields):
+    """Extend an update_fields list with the <field>_html columns derived from it."""
+    fields = list(fields)
+    fields += [html_field(name) for name in RICH_CONTENT_FIELDS.get(label, {}) if name in fields]
+    return fields
+
+
+def update_kwargs(label, kwargs):
+    """Add the <field>_html columns to the kwargs of a QuerySet.update() that sets rich-text fields."""
+    for field_name, sizes in RICH_CONTENT_FIELDS.get(label, {}).items():
+        if field_name in kwargs and html_field(field_name) not in kwargs:
+            value = kwargs[field_name]
+            kwargs[html_field(field_name)] = rewrite(value, sizes) if isinstance(value, str) else ""
+    return kwargs
+
+
+class RichContentQuerySetMixin:
+    """Keeps the <field>_html columns in sync on the bulk paths that bypass save()."""
+
+    def update(self, **kwargs):
+        return super().update(**update_kwargs(self.model._meta.label, kwargs))
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            render(obj)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            render(obj)
+        return super().bulk_update(objs, with_html_fields(self.model._meta.label, fields), *args, **kwargs)
+
+    bulk_update.alters_data = True
+
+
+def instance_uploads(instance):
+    """Return the editor uploads embedded in instance's rich-text fields."""
+    fields = RICH_CONTENT_FIELDS.get(instance._meta.label, {})
+    return list(dict.fromkeys(name for field_name in fields for name in uploads(getattr(instance, field_name))))
+
+
+def missing_variants(instance):
+    """Return the editor uploads in instance's rich-text fields that have no variants yet."""
+    return [name for name in instance_uploads(instance) if not images.cached_info(default_storage, name)]
+
+
+def generate_missing(instance, force=False):
+    """Generate the missing (with force, all) variants of instance's editor uploads; return how many."""
+    generated = 0
+    for name in instance_uploads(instance) if force else missing_variants(instance):
+        try:
+            images.generate(default_storage, name, force=force)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not generate variants of %s: %s", name, e)
+            continue
+        generated += 1
+    return generated
+
+
+def store(instance):
+    """Render instance's rich-text fields and write just the <field>_html columns (no save signals)."""
+    render(instance)
+    fields = [html_field(name) for name in RICH_CONTENT_FIELDS[instance._meta.label]]
+    type(instance)._default_manager.filter(pk=instance.pk).update(**{field: getattr(instance, field) for field in fields})
@@ -0,0 +1,81 @@
+"""
+Signal handlers for the core app.
+
+Bumps the content version whenever catalogue content changes so that
+per-process caches rebuild, and queues the follow-up work of a change
+(image variants, page purges, cache warming; see tasks.py) for the job
+workers once it commits.
+"""
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from apps.content.models import BlogPost
+from apps.core.models import Region, UniversalTag
+from apps.glossary import tasks as glossary_tasks
+from apps.glossary.models import Term
+from apps.team.models import TeamMember
+from apps.trips.models import Trip
+
+from . import images, jobs, richcontent, tasks
+from .versioning import bump_content_version
+
+CONTENT_MODELS = [Trip, BlogPost, UniversalTag, Region, TeamMember]
+CONTENT_M2M_MODELS = [Trip.tags.through, BlogPost.related_tags.through, BlogPost.linked_trips.through]
+
+
+def content_changed(sender, action="post_save", **kwargs):
+    """Bump the content version after any content write."""
+    if action.startswith("post_"):
+        bump_content_version()
+
+
+for model in CONTENT_MODELS:
+    post_save.connect(content_changed, sender=model, dispatch_uid=f"content_version_save_{model._meta.label}")
+    post_delete.connect(content_changed, sender=model, dispatch_uid=f"content_version_delete_{model._meta.label}")
+
+for through in CONTENT_M2M_MODELS:
+    m2m_changed.connect(content_changed, sender=through, dispatch_uid=f"content_version_m2m_{through._meta.label}")
+
+
+def content_saved(sender, instance, raw=False, **kwargs):
+    """Purge the cached pages of saved content and, with workers, recompute its memoized results."""
+    if raw:
+        return
+    args = (instance._meta.label, instance.pk)
+    jobs.enqueue_on_commit(tasks.purge_pages, args=args)
+    if jobs.is_enabled() and jobs.cache_is_shared():  # inline, warming would only slow down the save
+        jobs.enqueue_on_commit(tasks.refresh_memoized, args=args)
+
+
+for model in CONTENT_MODELS:
+    post_save.connect(content_saved, sender=model, dispatch_uid=f"content_jobs_{model._meta.label}")
+
+
+def image_saved(sender, instance, raw=False, **kwargs):
+    """Queue the variants of a saved model's new images."""
+    if not raw and images.is_enabled() and images.needs_variants(instance):
+        jobs.enqueue_on_commit(tasks.generate_image_variants, args=(instance._meta.label, instance.pk))
+
+
+for label in images.IMAGE_FIELDS:
+    post_save.connect(image_saved, sender=apps.get_model(label), dispatch_uid=f"image_variants_{label}")
+
+
+def rich_content_saved(sender, instance, raw=False, **kwargs):
+    """Queue the variants of images uploaded into a saved object's rich text, and its re-render."""
+    if not raw and images.is_enabled() and richcontent.missing_variants(instance):
+        jobs.enqueue_on_commit(tasks.render_rich_content, args=(instance._meta.label, instance.pk))
+
+
+for label in richcontent.RICH_CONTENT_FIELDS:
+    post_save.connect(rich_content_saved, sender=apps.get_model(label), dispatch_uid=f"rich_content_{label}")
+
+
+def term_changed(sender, instance, raw=False, **kwargs):
+    """Reload the glossary auto-linker's terms after a term is saved or deleted."""
+    if not raw:
+        jobs.enqueue_on_commit(glossary_tasks.rebuild_term_index)
+
+
+post_save.connect(term_changed, sender=Term, dispatch_uid="glossary_term_index_save")
+post_delete.connect(term_changed, sender=Term, dispatch_uid="glossary_term_index_delete")
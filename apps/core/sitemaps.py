@@ -33,7 +33,8 @@ class TripSitemap(Sitemap):
     priority = 0.9
 
     def items(self):
-        return Trip.objects.filter(is_published=True)
+        # Only the columns used below (plus id), to keep the rows read for the sitemap narrow
+        return Trip.objects.filter(is_published=True).only("slug", "updated_at")
 
     def lastmod(self, obj):
         return obj.updated_at
@@ -49,7 +50,8 @@ class BlogPostSitemap(Sitemap):
     priority = 0.8
 
     def items(self):
-        return BlogPost.objects.filter(status="published")
+        # Only the columns used below (plus id), to keep the rows read for the sitemap narrow
+        return BlogPost.objects.filter(status="published").only("slug", "updated_at")
 
     def lastmod(self, obj):
         return obj.updated_at
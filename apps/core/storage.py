@@ -0,0 +1,12 @@
+"""
+Storage for django-compressor's offline bundles.
+
+Writes a .gz and a .br copy next to every bundle so WhiteNoise can serve
+them precompressed (WhiteNoise's own storage only compresses files that go
+through collectstatic, and `compress` runs after it).
+"""
+from compressor.storage import BrotliCompressorFileStorage, GzipCompressorFileStorage
+
+
+class PrecompressedCompressorFileStorage(BrotliCompressorFileStorage, GzipCompressorFileStorage):
+    pass
@@ -0,0 +1,365 @@
+"""
+Deterministic synthetic catalogue data for load and performance testing.
+
+Generates production-scale regions, tags, team members, trips, blog posts
+and glossary terms with realistic HTML bodies and dense many-to-many
+relations. Rows and through-table rows are written with bulk_create in
+batches, so a million-row dataset builds in minutes.
+
+Used by ``load_sample_data --scale`` and ``benchmark_indexes --rows``.
+"""
+import random
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .querycache import invalidate_tables, known_tables
+from .versioning import bump_content_version
+
+# Row counts at --scale 1
+SCALE_COUNTS = {
+    "tags": 500,
+    "regions": 2_000,
+    "members": 200,
+    "trips": 50_000,
+    "posts": 200_000,
+    "terms": 5_000,
+}
+
+# Share of regions on each level of the tree (country > area > valley > village)
+REGION_LEVELS = [0.01, 0.09, 0.3, 0.6]
+
+BATCH_SIZE = 2_000
+
+WORDS = (
+    "acclimatization altitude approach ascent base camp bridge cairn col contour crampon descent glacier "
+    "guide headlamp icefall itinerary lodge monastery moraine mountain pass permit porter prayer flag "
+    "ridge river route saddle sherpa summit suspension switchback teahouse terrace trail trek valley "
+    "village viewpoint weather yak rhododendron forest snowline sunrise sunset chorten stupa gompa "
+    "kitchen dining hut camp tent sleeping bag layer boots poles water purification snack dal bhat "
+    "helicopter flight landing airstrip runway pilot crew oxygen rope harness ice axe fixed line"
+).split()
+
+REGION_WORDS = (
+    "Khumbu Solu Rolwaling Langtang Helambu Gosainkunda Manaslu Tsum Annapurna Mustang Dolpo Mugu Humla "
+    "Kanchenjunga Makalu Ganesh Dhaulagiri Rara Api Saipal Jugal Lamjung Gorkha Sikkim Ladakh Zanskar "
+    "Spiti Garhwal Kumaon Paro Bumthang Lunana"
+).split()
+
+REGION_SUFFIXES = ["Region", "Valley", "Circuit", "Basin", "Ridge", "Highlands", "Gorge", "Plateau"]
+
+
+class SyntheticDataGenerator:
+    """
+    Bulk-insert synthetic rows, reproducibly for a given seed.
+
+    Relations draw from every existing row (sample data included), so the
+    generator can also top up an existing database. Slugs are prefixed
+    with "synthetic-" and numbered from the current row counts, so
+    repeated runs add rows instead of colliding.
+    """
+
+    def __init__(self, seed=42, batch_size=BATCH_SIZE, stdout=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.now = timezone.now()
+        self.sentences = [self._sentence() for _ in range(2_000)]
+        self.term_names = []
+
+    def generate(self, counts):
+        """Create rows for each model in counts (keys as in SCALE_COUNTS)."""
+        with transaction.atomic():
+            self.create_tags(counts.get("tags", 0))
+            self.create_regions(counts.get("regions", 0))
+            self.create_members(counts.get("members", 0))
+            terms = self.create_terms(counts.get("terms", 0))
+            self.create_trips(counts.get("trips", 0))
+            self.create_posts(counts.get("posts", 0))
+            self.relate_terms(terms)
+        # Through-table rows bypass m2m_changed, so bump once at the end
+        bump_content_version()
+        invalidate_tables(*known_tables())
+
+    def create_tags(self, count):
+        from .models import UniversalTag
+
+        offset = UniversalTag.objects.count()
+        tags = []
+        for i in range(offset, offset + count):
+            name = f"{self.rng.choice(WORDS).title()} {self.rng.choice(WORDS).title()} {i}"
+            tags.append(
+                UniversalTag(
+                    name=name,
+                    slug=f"synthetic-tag-{i}",
+                    description=self._paragraph(1, 2, html=False),
+                    display_order=i,
+                    is_featured=self.rng.random() < 0.02,
+                )
+            )
+        self._bulk_create(UniversalTag, tags)
+
+    def create_regions(self, count):
+        from .models import Region
+
+        offset = Region.objects.count()
+        parents = [None]
+        created = 0
+        for share in REGION_LEVELS:
+            size = max(1, round(count * share)) if count else 0
+            level = []
+            for _ in range(min(size, count - created)):
+                i = offset + created
+                name = f"{self.rng.choice(REGION_WORDS)} {self.rng.choice(REGION_SUFFIXES)} {i}"
+                level.append(
+                    Region(
+                        name=name,
+                        slug=f"synthetic-region-{i}",
+                        parent=self.rng.choice(parents),
+                        description=self._paragraph(1, 3, html=False),
+                        latitude=Decimal(f"{self.rng.uniform(26.5, 30.5):.6f}"),
+                        longitude=Decimal(f"{self.rng.uniform(80.0, 88.2):.6f}"),
+                        display_order=created,
+                        is_featured=self.rng.random() < 0.01,
+                    )
+                )
+                created += 1
+            if level:
+                parents = self._bulk_create(Region, level, report=False)
+        if created:
+            self._write(f"  Created {created} synthetic regions in {len(REGION_LEVELS)} levels")
+
+    def create_members(self, count):
+        from apps.team.models import TeamMember
+
+        offset = TeamMember.objects.count()
+        roles = [value for value, _label in TeamMember.ROLE_CHOICES]
+        members = []
+        for i in range(offset, offset + count):
+            members.append(
+                TeamMember(
+                    name=f"{self.rng.choice(REGION_WORDS)} {self.rng.choice(WORDS).title()} {i}",
+                    slug=f"synthetic-member-{i}",
+                    role=self.rng.choice(roles),
+                    title=self._sentence()[:100],
+                    bio=self._paragraph(3, 6, html=False),
+                    short_bio=self._sentence()[:200],
+                    certifications=self.rng.sample(["IFMGA Certified", "Wilderness First Responder", "NMA"], 2),
+                    years_experience=self.rng.randint(1, 30),
+                    trips_led=self.rng.randint(0, 300),
+                    summits=self.rng.randint(0, 50),
+                    is_verified_expert=self.rng.random() < 0.3,
+                    is_active=self.rng.random() < 0.9,
+                    display_order=i,
+                )
+            )
+        self._bulk_create(TeamMember, members)
+
+    def create_terms(self, count):
+        from apps.glossary.models import Term
+
+        offset = Term.objects.count()
+        terms = []
+        for i in range(offset, offset + count):
+            name = f"{self.rng.choice(WORDS).title()} {self.rng.choice(WORDS)} {i}"
+            definition = self._sentence()
+            terms.append(
+                Term(
+                    name=name,
+                    slug=f"synthetic-term-{i}",
+                    abbreviation=name[:3].upper() if self.rng.random() < 0.1 else "",
+                    definition=definition,
+                    detailed_explanation=self._body(1, 3),
+                    auto_link=self.rng.random() < 0.5,
+                    link_priority=self.rng.randint(1, 10),
+                    max_links_per_page=self.rng.randint(1, 3),
+                    meta_title=f"{name} - Trekking Glossary"[:70],
+                    meta_description=definition[:160],
+                )
+            )
+        terms = self._bulk_create(Term, terms)
+        self.term_names = [term.name for term in terms if term.auto_link][:500]
+        return terms
+
+    def relate_terms(self, terms):
+        """Link new terms to other terms, tags and trips (run after trips exist)."""
+        from apps.glossary.models import Term
+
+        term_ids = self._ids(Term)
+        tag_ids = self._ids("core.UniversalTag")
+        trip_ids = self._ids("trips.Trip")
+        related_terms, related_tags, related_trips = [], [], []
+        for term in terms:
+            # Symmetrical M2M: store both directions
+            for other in self._sample(term_ids, 0, 2):
+                if other != term.pk:
+                    related_terms.append(Term.related_terms.through(from_term_id=term.pk, to_term_id=other))
+                    related_terms.append(Term.related_terms.through(from_term_id=other, to_term_id=term.pk))
+            for tag_id in self._sample(tag_ids, 0, 3):
+                related_tags.append(Term.related_tags.through(term_id=term.pk, universaltag_id=tag_id))
+            for trip_id in self._sample(trip_ids, 0, 3):
+                related_trips.append(Term.related_trips.through(term_id=term.pk, trip_id=trip_id))
+        self._bulk_create(Term.related_terms.through, related_terms, ignore_conflicts=True)
+        self._bulk_create(Term.related_tags.through, related_tags)
+        self._bulk_create(Term.related_trips.through, related_trips)
+
+    def create_trips(self, count):
+        from apps.trips.models import SEASON_BITS, Trip
+
+        offset = Trip.objects.count()
+        region_ids = self._ids("core.Region") or [None]
+        tag_ids = self._ids("core.UniversalTag")
+        difficulties = [value for value, _label in Trip.DIFFICULTY_CHOICES]
+        trip_types = [value for value, _label in Trip.TRIP_TYPE_CHOICES]
+        seasons = list(SEASON_BITS)
+
+        for start in range(offset, offset + count, self.batch_size):
+            trips = []
+            for i in range(start, min(start + self.batch_size, offset + count)):
+                title = f"{self.rng.choice(REGION_WORDS)} {self.rng.choice(WORDS).title()} Trek {i}"
+                overview = self._paragraph(2, 4, html=False)
+                price = Decimal(self.rng.randrange(300, 15_000))
+                trip_type = self.rng.choice(trip_types)
+                trips.append(
+                    Trip(
+                        title=title,
+                        slug=f"synthetic-trip-{i}",
+                        tagline=self._sentence()[:200],
+                        overview=overview,
+                        detailed_itinerary=self._itinerary(),
+                        highlights=self._list(3, 6),
+                        includes=self._list(4, 8),
+                        excludes=self._list(2, 5),
+                        essential_info=self._body(1, 3),
+                        region_id=self.rng.choice(region_ids),
+                        trip_type=trip_type,
+                        duration_days=self.rng.randint(1, 30),
+                        max_altitude=self.rng.randint(1_500, 8_848),
+                        difficulty=self.rng.choice(difficulties),
+                        best_seasons=self.rng.sample(seasons, self.rng.randint(1, 4)),
+                        price=price,
+                        discounted_price=(price * Decimal("0.9")).quantize(Decimal("1"))
+                        if self.rng.random() < 0.2
+                        else None,
+                        flight_duration_minutes=self.rng.randint(45, 240) if trip_type == "helicopter" else None,
+                        meta_title=title[:70],
+                        meta_description=overview[:160],
+                        is_published=self.rng.random() < 0.8,
+                        is_featured=self.rng.random() < 0.05,
+                    )
+                )
+            trips = self._bulk_create(Trip, trips, report=False)
+            self._bulk_create(
+                Trip.tags.through,
+                [
+                    Trip.tags.through(trip_id=trip.pk, universaltag_id=tag_id)
+                    for trip in trips
+                    for tag_id in self._sample(tag_ids, 3, 8)
+                ],
+                report=False,
+            )
+        self._write(f"  Created {count} synthetic trips")
+
+    def create_posts(self, count):
+        from apps.content.models import BlogPost
+
+        offset = BlogPost.objects.count()
+        region_ids = self._ids("core.Region") + [None]
+        tag_ids = self._ids("core.UniversalTag")
+        trip_ids = self._ids("trips.Trip")
+        author_ids = self._ids("team.TeamMember") + [None]
+        content_types = [value for value, _label in BlogPost.CONTENT_TYPE_CHOICES]
+        statuses = [value for value, _label in BlogPost.STATUS_CHOICES]
+
+        for start in range(offset, offset + count, self.batch_size):
+            posts = []
+            for i in range(start, min(start + self.batch_size, offset + count)):
+                title = f"{self.rng.choice(WORDS).title()} {self.rng.choice(WORDS)} guide {i}"
+                excerpt = self._paragraph(1, 2, html=False)[:300]
+                status = self.rng.choices(statuses, weights=[1, 1, 8])[0]
+                posts.append(
+                    BlogPost(
+                        title=title,
+                        slug=f"synthetic-post-{i}",
+                        excerpt=excerpt,
+                        content=self._body(4, 9),
+                        content_type=self.rng.choice(content_types),
+                        region_id=self.rng.choice(region_ids),
+                        author_id=self.rng.choice(author_ids),
+                        meta_title=title[:70],
+                        meta_description=excerpt[:160],
+                        status=status,
+                        is_featured=self.rng.random() < 0.03,
+                        published_at=self.now - timezone.timedelta(minutes=i) if status == "published" else None,
+                        view_count=int(self.rng.paretovariate(1.2) * 10),
+                    )
+                )
+            posts = self._bulk_create(BlogPost, posts, report=False)
+            related_tags, linked_trips = [], []
+            for post in posts:
+                for tag_id in self._sample(tag_ids, 2, 6):
+                    related_tags.append(BlogPost.related_tags.through(blogpost_id=post.pk, universaltag_id=tag_id))
+                for trip_id in self._sample(trip_ids, 0, 3):
+                    linked_trips.append(BlogPost.linked_trips.through(blogpost_id=post.pk, trip_id=trip_id))
+            self._bulk_create(BlogPost.related_tags.through, related_tags, report=False)
+            self._bulk_create(BlogPost.linked_trips.through, linked_trips, report=False)
+        self._write(f"  Created {count} synthetic blog posts")
+
+    # Text
+
+    def _sentence(self):
+        words = [self.rng.choice(WORDS) for _ in range(self.rng.randint(8, 20))]
+        return " ".join(words).capitalize() + "."
+
+    def _paragraph(self, low, high, html=True):
+        sentences = self.rng.choices(self.sentences, k=self.rng.randint(low, high))
+        if self.term_names and html:
+            # Mention glossary terms so the auto-linker has realistic work
+            for _ in range(self.rng.randint(0, 3)):
+                index = self.rng.randrange(len(sentences))
+                sentences[index] = f"{sentences[index][:-1]} near the {self.rng.choice(self.term_names)}."
+        text = " ".join(sentences)
+        return f"<p>{text}</p>" if html else text
+
+    def _list(self, low, high):
+        items = "".join(f"<li>{self.rng.choice(self.sentences)}</li>" for _ in range(self.rng.randint(low, high)))
+        return f"<ul>{items}</ul>"
+
+    def _body(self, low, high):
+        parts = []
+        for _ in range(self.rng.randint(low, high)):
+            parts.append(f"<h2>{self.rng.choice(WORDS).title()} {self.rng.choice(WORDS)}</h2>")
+            parts.append(self._paragraph(2, 6))
+            if self.rng.random() < 0.3:
+                parts.append(self._list(3, 6))
+        return "".join(parts)
+
+    def _itinerary(self):
+        parts = []
+        for day in range(1, self.rng.randint(3, 12) + 1):
+            parts.append(f"<h2>Day {day}: {self.rng.choice(self.sentences)}</h2>")
+            parts.append(self._paragraph(1, 3))
+        return "".join(parts)
+
+    # Helpers
+
+    def _sample(self, ids, low, high):
+        return self.rng.sample(ids, min(len(ids), self.rng.randint(low, high)))
+
+    def _ids(self, model):
+        if isinstance(model, str):
+            from django.apps import apps
+
+            model = apps.get_model(model)
+        return list(model.objects.order_by("pk").values_list("pk", flat=True))
+
+    def _bulk_create(self, model, objs, report=True, **kwargs):
+        objs = model.objects.bulk_create(objs, batch_size=self.batch_size, **kwargs)
+        if report and objs:
+            self._write(f"  Created {len(objs)} synthetic {model._meta.verbose_name_plural}")
+        return objs
+
+    def _write(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
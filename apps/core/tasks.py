@@ -0,0 +1,51 @@
+"""
+Background tasks for content changes (see apps.core.jobs).
+
+Queued by signals.py after a save commits, deduplicated per object, so
+a burst of admin saves does the work once.
+"""
+from django.apps import apps
+from django.contrib.sites.models import Site
+
+from . import images, jobs, memo, richcontent
+from .pagecache import purge_page
+
+
+def get_instance(label, pk):
+    return apps.get_model(label)._default_manager.filter(pk=pk).first()
+
+
+@jobs.task(priority=10, key=lambda label, pk: f"purge_pages:{label}:{pk}", cache_only=True)
+def purge_pages(label, pk):
+    """Drop the cached pages of a changed object on every site, rather than serving them stale once."""
+    instance = get_instance(label, pk)
+    if instance is None or not hasattr(instance, "get_absolute_url"):
+        return
+    hosts = [host for domain in Site.objects.values_list("domain", flat=True) for host in (domain, f"www.{domain}")]
+    purge_page(instance.get_absolute_url(), hosts)
+
+
+@jobs.task(priority=5, key=lambda label, pk: f"image_variants:{label}:{pk}")
+def generate_image_variants(label, pk):
+    instance = get_instance(label, pk)
+    if instance is not None:
+        images.generate_for_instance(instance)
+
+
+@jobs.task(key=lambda label, pk: f"refresh_memoized:{label}:{pk}", cache_only=True)
+def refresh_memoized(label, pk):
+    """Recompute a changed object's related content, similar trips etc. before its next visitor needs them."""
+    instance = get_instance(label, pk)
+    if instance is not None:
+        memo.warm(instance)
+
+
+@jobs.task(priority=5, key=lambda label, pk: f"rich_content:{label}:{pk}")
+def render_rich_content(label, pk):
+    """Generate the variants of images uploaded into a saved object's rich text, then store its HTML again."""
+    instance = get_instance(label, pk)
+    if instance is None:
+        return
+    richcontent.generate_missing(instance)
+    richcontent.store(instance)
+    purge_pages(label, pk)
@@ -0,0 +1,141 @@
+"""
+Template lazy-query detector.
+
+Attributes every SQL query executed while a template renders to the
+innermost template node being rendered: template file, line and the tag or
+variable expression (e.g. "tag.get_trip_count" or "if trip.tags.exists").
+Queries repeated from the same line are flagged as N+1 patterns.
+
+Use it directly:
+
+    with TemplateQueryDetector() as detector:
+        response = client.get("/")
+    print(detector.report())
+    detector.check_budget(max_queries=5)  # raises TemplateQueryBudgetExceeded
+
+or enable TemplateQueryDetectorMiddleware with TEMPLATE_QUERY_DETECTOR =
+"log" (log a report per request) or "raise" (fail the request, e.g. in tests,
+over TEMPLATE_QUERY_BUDGET or on any N+1 pattern). Debug/test tool only.
+"""
+import contextvars
+import re
+from collections import Counter
+
+N_PLUS_ONE_THRESHOLD = 3
+
+_node_stack = contextvars.ContextVar("template_node_stack", default=())
+_installed = False
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_IN_LIST_RE = re.compile(r"\bIN \([^)]*\)")
+
+
+class TemplateQueryBudgetExceeded(AssertionError):
+    """Raised when template-triggered queries exceed the configured budget."""
+
+
+def normalize_sql(sql):
+    """Strip literals and IN lists so repeated lookups compare equal."""
+    return _IN_LIST_RE.sub("IN (...)", _LITERAL_RE.sub("?", sql))
+
+
+def _wrap_render_annotated(method):
+    def render_annotated(self, context):
+        token = _node_stack.set((*_node_stack.get(), self))
+        try:
+            return method(self, context)
+        finally:
+            _node_stack.reset(token)
+
+    render_annotated.detecting = True
+    return render_annotated
+
+
+def install():
+    """Track the template node being rendered (once per process)."""
+    global _installed
+    if _installed:
+        return
+    from django.template.base import Node
+
+    if not getattr(Node.render_annotated, "detecting", False):
+        Node.render_annotated = _wrap_render_annotated(Node.render_annotated)
+    _installed = True
+
+
+def _describe(node):
+    origin = getattr(node, "origin", None)
+    token = getattr(node, "token", None)
+    return (
+        getattr(origin, "template_name", None) or getattr(origin, "name", "?"),
+        getattr(token, "lineno", None),
+        getattr(token, "contents", type(node).__name__),
+    )
+
+
+class TemplateQueryDetector:
+    """Context manager recording queries made while templates render."""
+
+    def __init__(self, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.queries = []  # (template, line, expression, sql)
+        self.total_queries = 0
+
+    def __enter__(self):
+        from django.db import connections
+
+        install()
+        self._wrappers = []
+        for alias in connections:
+            wrapper = connections[alias].execute_wrapper(self._execute)
+            wrapper.__enter__()
+            self._wrappers.append(wrapper)
+        return self
+
+    def __exit__(self, *exc_info):
+        for wrapper in reversed(self._wrappers):
+            wrapper.__exit__(*exc_info)
+
+    def _execute(self, execute, sql, params, many, context):
+        self.total_queries += 1
+        stack = _node_stack.get()
+        if stack:
+            self.queries.append((*_describe(stack[-1]), sql))
+        return execute(sql, params, many, context)
+
+    def by_line(self):
+        """Return [((template, line, expression), count)] ordered by count."""
+        return Counter((template, line, expr) for template, line, expr, _sql in self.queries).most_common()
+
+    def n_plus_one(self):
+        """
+        Return [((template, line, expression), sql, count)] for queries with the
+        same shape repeated at least n_plus_one_threshold times from one line.
+        """
+        repeats = Counter(
+            (template, line, expr, normalize_sql(sql)) for template, line, expr, sql in self.queries
+        )
+        return [
+            ((template, line, expr), sql, count)
+            for (template, line, expr, sql), count in repeats.most_common()
+            if count >= self.n_plus_one_threshold
+        ]
+
+    def report(self):
+        """Human-readable summary of template-triggered queries."""
+        lines = [f"{len(self.queries)} of {self.total_queries} queries triggered from templates"]
+        for (template, line, expr), count in self.by_line():
+            lines.append(f"  {count:>4}  {template}:{line}  {{{expr}}}")
+        for (template, line, expr), sql, count in self.n_plus_one():
+            lines.append(f"N+1: {template}:{line} {{{expr}}} ran {count}x: {sql[:200]}")
+        return "\n".join(lines)
+
+    def check_budget(self, max_queries=None, allow_n_plus_one=False):
+        """Raise TemplateQueryBudgetExceeded if over max_queries or on an N+1 pattern."""
+        problems = []
+        if max_queries is not None and len(self.queries) > max_queries:
+            problems.append(f"{len(self.queries)} template queries (budget {max_queries})")
+        if not allow_n_plus_one and self.n_plus_one():
+            problems.append(f"{len(self.n_plus_one())} N+1 pattern(s)")
+        if problems:
+            raise TemplateQueryBudgetExceeded("; ".join(problems) + "\n" + self.report())
@@ -0,0 +1,62 @@
+"""
+Inline critical CSS and load the full stylesheet asynchronously.
+
+    {% load critical_css %}
+
+    {% critical_css %}
+        {% compress css %}<link rel="stylesheet" href="...">{% endcompress %}
+    {% endcritical_css %}
+
+If build_assets extracted critical CSS for the page template being
+rendered (see apps.core.critical), it is inlined in a <style> element and
+each stylesheet <link> inside the tag becomes a preload that applies
+itself once loaded, with the original link in <noscript>. Other pages get
+the links unchanged (render-blocking).
+"""
+import re
+
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from apps.core import critical
+
+register = template.Library()
+
+STYLESHEET_RE = re.compile(r"<link\b[^>]*\brel=[\"']stylesheet[\"'][^>]*>")
+HREF_RE = re.compile(r"\bhref=[\"']([^\"']+)[\"']")
+
+
+def async_stylesheets(html):
+    """Rewrite the stylesheet links in html to load without blocking rendering."""
+    links = STYLESHEET_RE.findall(html)
+    if not links:
+        return html
+    preloads = [
+        format_html(
+            '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">',
+            HREF_RE.search(link).group(1),
+        )
+        for link in links
+    ]
+    return STYLESHEET_RE.sub("", html).strip() + "".join(preloads) + f"<noscript>{''.join(links)}</noscript>"
+
+
+class CriticalCSSNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        html = self.nodelist.render(context)
+        origin = getattr(context.template, "origin", None)
+        css = critical.critical_css(origin.template_name) if origin else None
+        if not css:
+            return html
+        return mark_safe(f"<style>{css}</style>{async_stylesheets(html)}")
+
+
+@register.tag
+def critical_css(parser, token):
+    nodelist = parser.parse(("endcritical_css",))
+    parser.delete_first_token()
+    return CriticalCSSNode(nodelist)
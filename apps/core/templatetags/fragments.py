@@ -0,0 +1,124 @@
+"""
+Template fragment caching keyed on site configuration and object versions.
+
+    {% load fragments %}
+
+    {% fragment "header" %}...{% endfragment %}
+    {% fragment "letter_index" letters|join:"" %}...{% endfragment %}
+    {% cards "trips/_trip_card.html" trips name="trip" %}
+    {% cards "content/_post_card.html" posts name="post" vary="author" %}
+
+Every key includes the current site and its SiteConfiguration.updated_at,
+so saving a site's branding re-renders its header and footer. Model
+instances in the key (fragment arguments, each card's object and its
+`vary` relations) contribute their pk and updated_at. Other values are
+used as they are.
+
+cards renders one template per object and fetches all of them with one
+cache.get_many(); only missing cards are rendered, so a cached listing is
+mostly string concatenation. A card's context holds only its object, and
+it is rendered by the first engine that has the template (the Jinja2 port
+in jinja2/ when JINJA2_ENABLED). Card keys also include the content
+version, so bulk writes that skip updated_at (QuerySet.update() and
+bulk_update() of prices or seasons) re-render listings too. Relations not
+named in `vary` show up after FRAGMENT_CACHE_TIMEOUT.
+Fragments must not contain per-user or per-request output (CSRF tokens,
+messages, the current path).
+"""
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from apps.core.versioning import get_content_version
+
+register = template.Library()
+
+KEY_PREFIX = "fragment:"
+
+
+def is_enabled():
+    return getattr(settings, "FRAGMENT_CACHE_ENABLED", True)
+
+
+def version_of(value):
+    """Return the part of a fragment key that changes when value does."""
+    if isinstance(value, models.Model):
+        updated_at = getattr(value, "updated_at", None)
+        stamp = updated_at.timestamp() if updated_at else ""
+        return f"{value._meta.label_lower}:{value.pk}:{stamp}"
+    return repr(value)
+
+
+def site_version(context):
+    site = context.get("current_site")
+    config = context.get("site_config")
+    return f"{getattr(site, 'pk', '-')}:{version_of(config) if config is not None else '-'}"
+
+
+def fragment_key(context, name, vary_on):
+    parts = ":".join(version_of(value) for value in vary_on)
+    digest = hashlib.md5(f"{site_version(context)}|{parts}".encode(), usedforsecurity=False).hexdigest()
+    return f"{KEY_PREFIX}{name}:{digest}"
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not is_enabled():
+            return self.nodelist.render(context)
+        key = fragment_key(context, self.name.resolve(context), [var.resolve(context) for var in self.vary_on])
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+        return value
+
+
+@register.tag
+def fragment(parser, token):
+    """Cache the enclosed block: {% fragment "name" [vary_on ...] %}...{% endfragment %}."""
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name")
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    return FragmentNode(nodelist, parser.compile_filter(bits[1]), [parser.compile_filter(bit) for bit in bits[2:]])
+
+
+@register.simple_tag(takes_context=True)
+def cards(context, template_name, objects, name="object", vary=""):
+    """Render template_name once per object (as `name`), serving cached cards in bulk."""
+    card_template = get_template(template_name)
+    objects = list(objects)
+    if not is_enabled():
+        keys = [None] * len(objects)
+        cached = {}
+    else:
+        relations = [relation for relation in vary.split(",") if relation]
+        version = get_content_version()
+        keys = [
+            fragment_key(context, template_name, [version, obj, *(getattr(obj, relation) for relation in relations)])
+            for obj in objects
+        ]
+        cached = cache.get_many(keys)
+
+    rendered, missing = [], {}
+    for obj, key in zip(objects, keys, strict=True):
+        html = cached.get(key)
+        if html is None:
+            html = card_template.render({name: obj})
+            if key is not None:
+                missing[key] = html
+        rendered.append(html)
+    if missing:
+        cache.set_many(missing, settings.FRAGMENT_CACHE_TIMEOUT)
+    return mark_safe("".join(rendered))
@@ -0,0 +1,23 @@
+"""
+Responsive images for ImageField files (see apps.core.images).
+
+    {% load images %}
+
+    {% responsive_image trip.featured_image alt=trip.title sizes="(min-width: 1024px) 33vw, 100vw" class="w-full" %}
+    {% responsive_image trip.featured_image alt=trip.title sizes="100vw" loading="eager" fetchpriority="high" %}
+
+Emits a <picture> with AVIF/WebP sources and a JPEG/PNG <img> carrying
+srcset, sizes, width, height, loading="lazy" and decoding="async". Other
+arguments become attributes of the <img>. Use loading="eager" for images
+above the fold, and fetchpriority="high" for the largest of them.
+"""
+from django import template
+
+from apps.core.images import render_picture
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt="", sizes="100vw", loading="lazy", **attrs):
+    return render_picture(image, alt=alt, sizes=sizes, loading=loading, **attrs)
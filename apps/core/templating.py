@@ -0,0 +1,66 @@
+"""
+Template engine warm-up.
+
+warm_templates() compiles every template each configured engine can find,
+so the cached loader (and Jinja2's environment cache) is full before a
+worker takes its first request. config/wsgi.py calls it at startup when
+TEMPLATE_WARMUP is on; with gunicorn --preload it runs once in the master
+and the workers inherit the compiled templates.
+"""
+import logging
+import time
+from pathlib import Path
+
+logger = logging.getLogger("apps.performance")
+
+# Only files with these suffixes are compiled (skips README.txt, images, ...)
+TEMPLATE_SUFFIXES = (".html", ".txt", ".xml")
+
+
+def template_dirs(backend):
+    """Return every directory the backend loads templates from."""
+    from django.template.backends.django import DjangoTemplates
+
+    if isinstance(backend, DjangoTemplates):
+        dirs = []
+        for loader in backend.engine.template_loaders:
+            dirs += [Path(d) for d in loader.get_dirs()]
+        return dirs
+    return [Path(d) for d in backend.template_dirs]
+
+
+def template_names(backend):
+    """Yield the name of every template file in the backend's directories (first directory wins)."""
+    seen = set()
+    for directory in template_dirs(backend):
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.rglob("*")):
+            name = path.relative_to(directory).as_posix()
+            if path.is_file() and path.suffix in TEMPLATE_SUFFIXES and name not in seen:
+                seen.add(name)
+                yield name
+
+
+def warm_templates():
+    """Compile every template of every engine; return (compiled, failed) counts."""
+    from django.template import TemplateSyntaxError, engines
+
+    started = time.perf_counter()
+    compiled = failed = 0
+    for backend in engines.all():
+        for name in template_names(backend):
+            try:
+                backend.get_template(name)
+                compiled += 1
+            except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                # Templates for apps or tag libraries that aren't installed
+                failed += 1
+                logger.debug("template warm-up skipped %s (%s): %s", name, backend.name, str(e).splitlines()[0])
+    logger.info(
+        "template warm-up compiled %d templates (%d skipped) in %.0f ms",
+        compiled,
+        failed,
+        (time.perf_counter() - started) * 1000,
+    )
+    return compiled, failed
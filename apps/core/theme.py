@@ -0,0 +1,50 @@
+"""
+Per-site theme stylesheets.
+
+Each site's colors, and the styles shared by every site, are compiled from
+templates/core/theme.css into a stylesheet in the default storage
+(MEDIA_ROOT) named by a hash of its content:
+
+    themes/site-1-3f2a9c81d0b4.css
+
+A changed theme gets a new URL, so the files are immutable and served
+with a year-long cache lifetime (see nginx.conf). SiteConfiguration.save()
+builds the file; theme_css_url() rebuilds it if it is missing (a fresh
+deploy, or a change to theme.css), once per process and configuration
+version via the site_config context processor.
+"""
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+THEME_DIR = "themes"
+
+DEFAULT_COLORS = {
+    "primary_color": "#0d9488",
+    "secondary_color": "#0f766e",
+    "accent_color": "#f59e0b",
+}
+
+
+def theme_colors(config):
+    """Return the site's colors, falling back to DEFAULT_COLORS."""
+    if config is None:
+        return dict(DEFAULT_COLORS)
+    return {name: getattr(config, name) or default for name, default in DEFAULT_COLORS.items()}
+
+
+def build_theme(config):
+    """Write the theme stylesheet for config (None for the default theme) if needed; return its storage name."""
+    css = render_to_string("core/theme.css", theme_colors(config))
+    digest = hashlib.md5(css.encode(), usedforsecurity=False).hexdigest()[:12]
+    prefix = f"site-{config.site_id}" if config is not None else "default"
+    name = f"{THEME_DIR}/{prefix}-{digest}.css"
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(css.encode()))
+    return name
+
+
+def theme_css_url(config):
+    return default_storage.url(build_theme(config))
@@ -0,0 +1,32 @@
+"""
+Content version counter.
+
+A single integer in the shared cache that is bumped whenever published
+content changes. Per-process caches (such as the catalogue engine) compare
+it against the version they were built from to know when to rebuild.
+"""
+import time
+
+from django.core.cache import cache
+
+CONTENT_VERSION_KEY = "content_version"
+
+
+def get_content_version():
+    """Return the current content version, initialising it if missing."""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never repeats an old version
+        cache.add(CONTENT_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    """Mark all content-derived caches as stale."""
+    try:
+        return cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(CONTENT_VERSION_KEY, version, None)
+        return version
@@ -1,14 +1,21 @@
 """Views for Core app."""
-from django.db.models import Count
+import hmac
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.views.generic import DetailView, ListView, TemplateView
 
+from . import metrics
 from .models import Region, UniversalTag
+from .pagecache import PageCacheMixin
 
 
-class HomeView(TemplateView):
+class HomeView(PageCacheMixin, TemplateView):
     """Homepage view."""
 
     template_name = "core/home.html"
+    page_cache_soft = 60
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -26,10 +33,14 @@ class HomeView(TemplateView):
         context["latest_posts"] = BlogPost.objects.filter(status="published").select_related("author")[:3]
 
         # Featured regions
-        context["featured_regions"] = Region.objects.filter(is_featured=True)[:4]
+        context["featured_regions"] = Region.objects.filter(is_featured=True).cached()[:4]
 
         # Featured tags
-        context["featured_tags"] = UniversalTag.objects.filter(is_featured=True)[:8]
+        context["featured_tags"] = (
+            UniversalTag.objects.filter(is_featured=True)
+            .annotate(trip_count=Count("trips", filter=Q(trips__is_published=True)))
+            .cached()[:8]
+        )
 
         return context
 
@@ -42,17 +53,22 @@ class TagListView(ListView):
     context_object_name = "tags"
 
     def get_queryset(self):
-        return UniversalTag.objects.annotate(
-            trip_count=Count("trips", distinct=True), blog_count=Count("blogposts", distinct=True)
-        ).order_by("display_order", "name")
+        return (
+            UniversalTag.objects.annotate(
+                trip_count=Count("trips", distinct=True), blog_count=Count("blogposts", distinct=True)
+            )
+            .order_by("display_order", "name")
+            .cached()
+        )
 
 
-class TagDetailView(DetailView):
+class TagDetailView(PageCacheMixin, DetailView):
     """Tag detail page - Topic Hub."""
 
     model = UniversalTag
     template_name = "core/tag_detail.html"
     context_object_name = "tag"
+    page_cache_soft = 300
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -60,15 +76,14 @@ class TagDetailView(DetailView):
         # Get related content using the unified method
         context["content"] = self.object.get_related_content()
 
-        # Get related tags (tags that share trips or blogs)
-        related_tag_ids = set()
-        for trip in context["content"]["trips"][:5]:
-            related_tag_ids.update(trip.tags.values_list("id", flat=True))
-        for blog in context["content"]["blogs"][:5]:
-            related_tag_ids.update(blog.related_tags.values_list("id", flat=True))
-        related_tag_ids.discard(self.object.id)
-
-        context["related_tags"] = UniversalTag.objects.filter(id__in=list(related_tag_ids)[:8])
+        # Get related tags (tags that share one of the first trips or blogs), in one query
+        trip_ids = list(context["content"]["trips"].values_list("id", flat=True)[:5])
+        blog_ids = list(context["content"]["blogs"].values_list("id", flat=True)[:5])
+        context["related_tags"] = (
+            UniversalTag.objects.filter(Q(trips__in=trip_ids) | Q(blogposts__in=blog_ids))
+            .exclude(id=self.object.id)
+            .distinct()[:8]
+        )
 
         return context
 
@@ -81,16 +96,22 @@ class RegionListView(ListView):
     context_object_name = "regions"
 
     def get_queryset(self):
-        # Only top-level regions
-        return Region.objects.filter(parent__isnull=True).order_by("display_order", "name")
+        # Only top-level regions, with trip counts in the same query
+        return (
+            Region.objects.filter(parent__isnull=True)
+            .annotate(trip_count=Count("trips"))
+            .order_by("display_order", "name")
+            .cached()
+        )
 
 
-class RegionDetailView(DetailView):
+class RegionDetailView(PageCacheMixin, DetailView):
     """Region detail page."""
 
     model = Region
     template_name = "core/region_detail.html"
     context_object_name = "region"
+    page_cache_soft = 300
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -109,3 +130,21 @@ class ContactView(TemplateView):
     """Contact page."""
 
     template_name = "core/contact.html"
+
+
+def metrics_view(request):
+    """
+    Prometheus text-format metrics (see apps.core.metrics).
+
+    Requires METRICS_ENABLED, and either a staff session or the
+    METRICS_TOKEN as a bearer token.
+    """
+    if not getattr(settings, "METRICS_ENABLED", False):
+        raise Http404
+    token = getattr(settings, "METRICS_TOKEN", "")
+    bearer = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not (request.user.is_staff or (token and hmac.compare_digest(bearer.encode(), token.encode()))):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render_prometheus(metrics.collect()), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
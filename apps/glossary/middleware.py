@@ -8,6 +8,8 @@ import re
 
 from django.core.cache import cache
 
+from apps.core import instrumentation
+
 
 class GlossaryAutoLinkerMiddleware:
     """
@@ -40,7 +42,8 @@ class GlossaryAutoLinkerMiddleware:
 
         try:
             content = response.content.decode("utf-8")
-            modified_content = self._inject_glossary_links(content)
+            with instrumentation.timer("glossary"):
+                modified_content = self._inject_glossary_links(content)
             response.content = modified_content.encode("utf-8")
             response["Content-Length"] = len(response.content)
         except Exception:  # noqa: BLE001
@@ -54,15 +57,21 @@ class GlossaryAutoLinkerMiddleware:
         terms = cache.get(self.CACHE_KEY)
 
         if terms is None:
-            from apps.glossary.models import Term
+            terms = self.rebuild_terms()
 
-            terms = list(
-                Term.objects.filter(auto_link=True)
-                .values("name", "abbreviation", "slug", "max_links_per_page", "link_priority")
-                .order_by("-link_priority", "-id")
-            )
-            cache.set(self.CACHE_KEY, terms, self.CACHE_TIMEOUT)
+        return terms
 
+    @classmethod
+    def rebuild_terms(cls):
+        """Load the auto-linkable terms from the database into the cache."""
+        from apps.glossary.models import Term
+
+        terms = list(
+            Term.objects.filter(auto_link=True)
+            .values("name", "abbreviation", "slug", "max_links_per_page", "link_priority")
+            .order_by("-link_priority", "-id")
+        )
+        cache.set(cls.CACHE_KEY, terms, cls.CACHE_TIMEOUT)
         return terms
 
     def _make_replacer(self, slug, max_count, link_counts):
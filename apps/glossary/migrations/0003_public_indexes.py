@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_public_indexes"),
+        ("glossary", "0002_alter_term_abbreviation_alter_term_auto_link_and_more"),
+        ("trips", "0005_public_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="term",
+            index=models.Index(fields=["name"], name="term_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="term",
+            index=models.Index(
+                condition=models.Q(("auto_link", True)),
+                fields=["-link_priority", "-id"],
+                name="term_autolink_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("glossary", "0003_public_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="term",
+            name="detailed_explanation_html",
+            field=models.TextField(blank=True, editable=False, help_text="detailed_explanation with responsive images (see apps.core.richcontent)"),
+        ),
+    ]
@@ -5,6 +5,13 @@ Contains Term model for auto-linking within blog content.
 from django.db import models
 from django.urls import reverse
 
+from apps.core import richcontent
+from apps.core.querycache import CachedQuerySet
+
+
+class TermQuerySet(richcontent.RichContentQuerySetMixin, CachedQuerySet):
+    pass
+
 
 class Term(models.Model):
     """
@@ -24,6 +31,9 @@ class Term(models.Model):
     # Definitions
     definition = models.TextField(help_text="Brief definition (shown in tooltips and listings)")
     detailed_explanation = models.TextField(blank=True, help_text="Detailed explanation (HTML supported)")
+    detailed_explanation_html = models.TextField(
+        blank=True, editable=False, help_text="detailed_explanation with responsive images (see apps.core.richcontent)"
+    )
 
     # Related content
     related_terms = models.ManyToManyField("self", symmetrical=True, blank=True, help_text="Related glossary terms")
@@ -47,10 +57,19 @@ class Term(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TermQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
         verbose_name = "Glossary Term"
         verbose_name_plural = "Glossary Terms"
+        indexes = [
+            models.Index(fields=["name"], name="term_name_idx"),
+            # Auto-linker term list (GlossaryAutoLinkerMiddleware._get_terms)
+            models.Index(
+                fields=["-link_priority", "-id"], condition=models.Q(auto_link=True), name="term_autolink_idx"
+            ),
+        ]
 
     def __str__(self):
         if self.abbreviation:
@@ -62,6 +81,9 @@ class Term(models.Model):
             self.meta_title = f"{self.name} - Trekking Glossary"[:70]
         if not self.meta_description:
             self.meta_description = self.definition[:160]
+        richcontent.render(self)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = richcontent.with_html_fields("glossary.Term", kwargs["update_fields"])
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
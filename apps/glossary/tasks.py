@@ -0,0 +1,10 @@
+"""Background tasks for the glossary (see apps.core.jobs)."""
+from apps.core import jobs
+
+from .middleware import GlossaryAutoLinkerMiddleware
+
+
+@jobs.task(priority=5, key=lambda: "glossary_term_index", cache_only=True)
+def rebuild_term_index():
+    """Reload the auto-linker's term list after a term changes, instead of waiting for it to expire."""
+    GlossaryAutoLinkerMiddleware.rebuild_terms()
@@ -12,7 +12,7 @@ class TermListView(ListView):
     context_object_name = "terms"
 
     def get_queryset(self):
-        return Term.objects.all().order_by("name")
+        return Term.objects.order_by("name").cached()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
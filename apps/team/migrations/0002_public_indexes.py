@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("team", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="teammember",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["display_order", "name"],
+                name="member_active_order_idx",
+            ),
+        ),
+    ]
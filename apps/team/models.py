@@ -6,6 +6,9 @@ from django.conf import settings
 from django.db import models
 from django.urls import reverse
 
+from apps.core.memo import memoize
+from apps.core.querycache import CachedQuerySet
+
 
 class TeamMember(models.Model):
     """
@@ -73,10 +76,17 @@ class TeamMember(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CachedQuerySet.as_manager()
+
     class Meta:
         ordering = ["display_order", "name"]
         verbose_name = "Team Member"
         verbose_name_plural = "Team Members"
+        indexes = [
+            models.Index(
+                fields=["display_order", "name"], condition=models.Q(is_active=True), name="member_active_order_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_role_display()})"
@@ -86,12 +96,13 @@ class TeamMember(models.Model):
 
     def get_published_posts(self):
         """Return all published blog posts by this author."""
-        return self.authored_posts.filter(status="published")
+        return self.posts.filter(status="published")
 
     def get_post_count(self):
         """Return count of published posts."""
         return self.get_published_posts().count()
 
+    @memoize
     def get_expertise_tags(self):
         """Return unique tags from all authored posts."""
         from apps.core.models import UniversalTag
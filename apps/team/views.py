@@ -12,7 +12,7 @@ class MemberListView(ListView):
     context_object_name = "members"
 
     def get_queryset(self):
-        return TeamMember.objects.filter(is_active=True).order_by("display_order", "name")
+        return TeamMember.objects.filter(is_active=True).order_by("display_order", "name").cached()
 
 
 class MemberDetailView(DetailView):
@@ -167,7 +167,7 @@ class TripAdmin(ModelAdmin):
             )
         return "-"
 
-    @admin.display(description="Price")
+    @admin.display(description="Price", ordering="effective_price")
     def price_display(self, obj):
         if obj.discounted_price:
             return format_html(
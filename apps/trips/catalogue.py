@@ -0,0 +1,117 @@
+"""
+Columnar snapshot of published trips for TripListView and HeliTourListView.
+
+Mirrors the ORM filters in views.py; see apps.core.catalogue for the engine.
+"""
+import numpy as np
+
+from apps.core.catalogue import Catalogue, build_bitsets, encode
+
+from .models import PRICE_RANGES, SEASON_BITS, Trip
+from .views import parse_price
+
+DURATION_RANGES = {"1-7": (None, 7), "8-14": (8, 14), "15+": (15, None)}
+
+
+class TripCatalogue(Catalogue):
+    """Published trips as NumPy columns, in the default (-is_featured, -created_at) order."""
+
+    def build(self):
+        from apps.core.models import Region, UniversalTag
+
+        rows = list(
+            Trip.objects.filter(is_published=True)
+            .order_by("-is_featured", "-created_at")
+            .values_list(
+                "id", "effective_price", "duration_days", "difficulty", "trip_type", "region_id", "season_mask"
+            )
+        )
+        ids, prices, durations, difficulties, trip_types, regions, seasons = zip(*rows) if rows else ([],) * 7
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.price = np.array(prices, dtype=np.float64)
+        self.duration = np.array(durations, dtype=np.int32)
+        self.difficulty, self.difficulty_codes = encode(difficulties, Trip.DIFFICULTY_CHOICES)
+        self.trip_type, self.trip_type_codes = encode(trip_types, Trip.TRIP_TYPE_CHOICES)
+        self.region = np.array([region or 0 for region in regions], dtype=np.int64)
+        self.season = np.array(seasons, dtype=np.uint8)
+
+        self.region_ids = dict(Region.objects.values_list("slug", "id"))
+        self.tag_ids = dict(UniversalTag.objects.values_list("slug", "id"))
+        self.tags, self.tag_bits = build_bitsets(
+            self.ids,
+            Trip.tags.through.objects.filter(trip__is_published=True).values_list("trip_id", "universaltag_id"),
+            list(self.tag_ids.values()),
+        )
+
+        self.orderings = {
+            "price_low": np.argsort(self.price, kind="stable"),
+            "price_high": np.argsort(-self.price, kind="stable"),
+            "duration": np.argsort(self.duration, kind="stable"),
+        }
+
+    def query(self, params, trip_type=None):
+        """
+        Evaluate listing params (tag, region, difficulty, duration, season,
+        price, min_price, max_price, sort).
+
+        Returns (ordered ids, facets) where facets holds season and price
+        counts, each computed with every filter except its own.
+        """
+        mask = self.all_rows()
+        if trip_type:
+            mask &= self.code_mask(self.trip_type, self.trip_type_codes, trip_type)
+        if params.get("tag"):
+            mask &= self.bit_mask(self.tags, self.tag_bits, self.tag_ids.get(params["tag"]))
+        if params.get("region"):
+            mask &= self.region == self.region_ids.get(params["region"], -1)
+        if params.get("difficulty"):
+            mask &= self.code_mask(self.difficulty, self.difficulty_codes, params["difficulty"])
+        if params.get("duration") in DURATION_RANGES:
+            low, high = DURATION_RANGES[params["duration"]]
+            mask &= self.range_mask(self.duration, low, high, inclusive=True)
+
+        season = self.season_mask(params)
+        price = self.price_mask(params)
+        facets = {
+            "season": self.season_counts(mask & price),
+            "price": self.price_counts(mask & season),
+        }
+        return self.ordered_ids(mask & season & price, self.orderings.get(params.get("sort"))), facets
+
+    def range_mask(self, column, low, high, inclusive=False):
+        mask = self.all_rows()
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= (column <= high) if inclusive else (column < high)
+        return mask
+
+    def season_mask(self, params):
+        season = params.get("season")
+        if season in SEASON_BITS:
+            return (self.season & SEASON_BITS[season]) != 0
+        return self.all_rows()
+
+    def price_mask(self, params):
+        mask = self.all_rows()
+        for value, _label, low, high in PRICE_RANGES:
+            if params.get("price") == value:
+                mask &= self.range_mask(self.price, low, high)
+        min_price = parse_price(params.get("min_price"))
+        max_price = parse_price(params.get("max_price"))
+        return mask & self.range_mask(
+            self.price,
+            None if min_price is None else float(min_price),
+            None if max_price is None else float(max_price),
+            inclusive=True,
+        )
+
+    def season_counts(self, mask):
+        return {season: int(np.count_nonzero(mask & ((self.season & bit) != 0))) for season, bit in SEASON_BITS.items()}
+
+    def price_counts(self, mask):
+        return {
+            value: int(np.count_nonzero(mask & self.range_mask(self.price, low, high)))
+            for value, _label, low, high in PRICE_RANGES
+        }
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_public_indexes"),
+        ("trips", "0004_trip_departure_location_trip_flight_duration_minutes_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-is_featured", "-created_at", "slug", "updated_at"],
+                name="trip_pub_featured_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["trip_type", "-is_featured", "-created_at"],
+                name="trip_pub_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["region", "-is_featured", "-created_at"],
+                name="trip_pub_region_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["difficulty", "-is_featured", "-created_at"],
+                name="trip_pub_difficulty_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["price"],
+                name="trip_pub_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["duration_days"],
+                name="trip_pub_duration_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:23
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Coalesce, Floor
+
+
+def backfill_prices(apps, schema_editor):
+    """Populate effective_price/discount_percent for existing trips."""
+    Trip = apps.get_model("trips", "Trip")
+    discounted = models.Q(
+        discounted_price__isnull=False, discounted_price__lt=models.F("price")
+    )
+    Trip.objects.update(
+        effective_price=Coalesce("discounted_price", "price"),
+        discount_percent=models.Case(
+            models.When(
+                discounted,
+                then=Cast(
+                    Floor(
+                        (models.F("price") - models.F("discounted_price"))
+                        * 100
+                        / models.F("price")
+                    ),
+                    models.PositiveSmallIntegerField(),
+                ),
+            ),
+            default=0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_public_indexes"),
+        ("trips", "0005_public_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="trip",
+            name="trip_pub_price_idx",
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="discount_percent",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="effective_price",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                editable=False,
+                help_text="Discounted price if set, else base price",
+                max_digits=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["effective_price"],
+                name="trip_pub_eff_price_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:24
+
+from django.db import migrations, models
+
+SEASON_BITS = {"spring": 1, "summer": 2, "autumn": 4, "winter": 8}
+SEASON_ALIASES = {"monsoon": "summer", "fall": "autumn"}
+
+
+def backfill_season_mask(apps, schema_editor):
+    """Populate season_mask from best_seasons for existing trips."""
+    Trip = apps.get_model("trips", "Trip")
+    trips = []
+    for trip in Trip.objects.only("best_seasons").iterator():
+        seasons = trip.best_seasons if isinstance(trip.best_seasons, list) else []
+        trip.season_mask = 0
+        for season in seasons:
+            season = str(season).strip().lower()
+            trip.season_mask |= SEASON_BITS.get(SEASON_ALIASES.get(season, season), 0)
+        trips.append(trip)
+    Trip.objects.bulk_update(trips, ["season_mask"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_public_indexes"),
+        ("trips", "0006_trip_effective_price"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="season_mask",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["season_mask", "-is_featured", "-created_at"],
+                name="trip_pub_season_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_season_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0007_trip_season_mask"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="detailed_itinerary_html",
+            field=models.TextField(blank=True, editable=False, help_text="detailed_itinerary with responsive images (see apps.core.richcontent)"),
+        ),
+    ]
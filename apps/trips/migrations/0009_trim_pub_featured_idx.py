@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_job'),
+        ('trips', '0008_rich_content_html'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='trip',
+            name='trip_pub_featured_idx',
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-is_featured', '-created_at'], name='trip_pub_featured_idx'),
+        ),
+    ]
@@ -3,8 +3,170 @@ Trips app - Product layer.
 Contains Trip model representing trekking/expedition packages.
 """
 from django.db import models
+from django.db.models.functions import Cast, Coalesce, Floor
+from django.db.models.lookups import LessThan
 from django.urls import reverse
 
+from apps.core import richcontent
+from apps.core.memo import memoize, memoized_property
+from apps.core.querycache import CachedQuerySet
+from apps.core.versioning import bump_content_version
+
+PRICE_FIELDS = {"price", "discounted_price"}
+# Rows per UPDATE when an update() has to resync columns by pk (keeps under SQLite's variable limit)
+SYNC_BATCH_SIZE = 500
+
+# Price buckets for the ?price= filter and facet: (value, label, min, max)
+PRICE_RANGES = [
+    ("0-1000", "Under $1,000", None, 1000),
+    ("1000-2000", "$1,000 - $2,000", 1000, 2000),
+    ("2000-5000", "$2,000 - $5,000", 2000, 5000),
+    ("5000+", "$5,000+", 5000, None),
+]
+
+SEASON_CHOICES = [
+    ("spring", "Spring"),
+    ("summer", "Summer / Monsoon"),
+    ("autumn", "Autumn"),
+    ("winter", "Winter"),
+]
+SEASON_BITS = {value: 1 << i for i, (value, _label) in enumerate(SEASON_CHOICES)}
+SEASON_ALIASES = {"monsoon": "summer", "fall": "autumn"}
+
+
+def season_mask(seasons):
+    """Convert a best_seasons list (free-form JSON) into a season bitmask."""
+    if not isinstance(seasons, list):
+        return 0
+    mask = 0
+    for season in seasons:
+        season = str(season).strip().lower()
+        mask |= SEASON_BITS.get(SEASON_ALIASES.get(season, season), 0)
+    return mask
+
+
+def price_columns(price, discounted_price):
+    """Return the effective_price and discount_percent expressions for QuerySet.update()."""
+    # A NULL discounted_price makes the comparison NULL, so the When also covers "has a discount"
+    discounted = LessThan(discounted_price, price)
+    return {
+        "effective_price": Coalesce(discounted_price, price),
+        "discount_percent": models.Case(
+            models.When(
+                discounted,
+                then=Cast(Floor((price - discounted_price) * 100 / price), models.PositiveSmallIntegerField()),
+            ),
+            default=0,
+        ),
+    }
+
+
+def masks_with_season(season):
+    """
+    Return every bitmask value that includes the given season.
+
+    With four seasons there are only 16 masks, so an IN list keeps the
+    season filter a plain index lookup on both SQLite and PostgreSQL.
+    """
+    bit = SEASON_BITS[season]
+    return [mask for mask in range(1 << len(SEASON_BITS)) if mask & bit]
+
+
+class TripQuerySet(CachedQuerySet):
+    """
+    Keeps the denormalized price, season and rich-content columns in sync.
+
+    Trip.save() handles single rows; these overrides cover the bulk paths
+    that bypass save() (and its post_save signal, so they also bump the
+    content version themselves).
+    """
+
+    def update(self, **kwargs):
+        # bulk_update() routes through here with season_mask already computed (best_seasons is then a
+        # Case expression); other expressions are resolved by reading the stored values back
+        sync_seasons = False
+        if "best_seasons" in kwargs and "season_mask" not in kwargs:
+            if isinstance(kwargs["best_seasons"], (list, type(None))):
+                kwargs["season_mask"] = season_mask(kwargs["best_seasons"])
+            else:
+                sync_seasons = True
+        if PRICE_FIELDS.intersection(kwargs) and "effective_price" not in kwargs:
+            # Expressions in the same UPDATE see the old row, so substitute the new prices into them
+            prices = {
+                name: self._as_expression(name, kwargs[name]) if name in kwargs else models.F(name)
+                for name in PRICE_FIELDS
+            }
+            kwargs.update(price_columns(prices["price"], prices["discounted_price"]))
+        richcontent.update_kwargs("trips.Trip", kwargs)
+        # The update may move rows out of this queryset's filter, so resync seasons by pk, in batches
+        pks = list(self.values_list("pk", flat=True)) if sync_seasons else None
+        rows = super().update(**kwargs)
+        if pks:
+            for start in range(0, len(pks), SYNC_BATCH_SIZE):
+                self.model._default_manager.filter(pk__in=pks[start : start + SYNC_BATCH_SIZE]).sync_seasons()
+        if rows:
+            bump_content_version()
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_derived_fields()
+        created = super().bulk_create(objs, *args, **kwargs)
+        bump_content_version()
+        return created
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = Trip.with_derived_fields(fields)
+        for obj in objs:
+            obj.sync_derived_fields()
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows:
+            bump_content_version()
+        return rows
+
+    bulk_update.alters_data = True
+
+    def in_season(self, season):
+        """Filter to trips whose best_seasons include the given season."""
+        return self.filter(season_mask__in=masks_with_season(season))
+
+    def season_counts(self):
+        """Return {season: trip count} using one GROUP BY over season_mask."""
+        counts = dict.fromkeys(SEASON_BITS, 0)
+        rows = self.order_by().values("season_mask").annotate(count=models.Count("id", distinct=True))
+        for row in rows:
+            for season, bit in SEASON_BITS.items():
+                if row["season_mask"] & bit:
+                    counts[season] += row["count"]
+        return counts
+
+    def sync_prices(self):
+        """Recompute effective_price and discount_percent in SQL for every row."""
+        return super().update(**price_columns(models.F("price"), models.F("discounted_price")))
+
+    sync_prices.alters_data = True
+
+    def _as_expression(self, name, value):
+        if hasattr(value, "resolve_expression"):
+            return value
+        return models.Value(value, output_field=self.model._meta.get_field(name))
+
+    def sync_seasons(self):
+        """Recompute season_mask from the stored best_seasons, one UPDATE per distinct mask."""
+        pks_by_mask = {}
+        for pk, seasons in self.values_list("pk", "best_seasons"):
+            pks_by_mask.setdefault(season_mask(seasons), []).append(pk)
+        for mask, pks in pks_by_mask.items():
+            super(TripQuerySet, self.model._default_manager.filter(pk__in=pks)).update(season_mask=mask)
+
+    sync_seasons.alters_data = True
+
 
 class Trip(models.Model):
     """
@@ -21,6 +183,8 @@ class Trip(models.Model):
         ("extreme", "Extreme"),
     ]
 
+    SEASON_CHOICES = SEASON_CHOICES
+
     TRIP_TYPE_CHOICES = [
         ("trek", "Trekking"),
         ("expedition", "Expedition"),
@@ -39,6 +203,9 @@ class Trip(models.Model):
 
     # Rich content (Using standard TextField - Unfold provides editor widgets)
     detailed_itinerary = models.TextField(help_text="Day-by-day itinerary with rich formatting (HTML supported)")
+    detailed_itinerary_html = models.TextField(
+        blank=True, editable=False, help_text="detailed_itinerary with responsive images (see apps.core.richcontent)"
+    )
     highlights = models.TextField(blank=True, help_text="Key highlights and unique selling points")
     includes = models.TextField(blank=True, help_text="What's included in the package")
     excludes = models.TextField(blank=True, help_text="What's not included")
@@ -63,6 +230,8 @@ class Trip(models.Model):
     max_altitude = models.PositiveIntegerField(help_text="Maximum altitude in meters")
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES)
     best_seasons = models.JSONField(default=list, blank=True, help_text='e.g., ["spring", "autumn"]')
+    # Denormalized bitmask of best_seasons (see SEASON_BITS), kept in sync like effective_price
+    season_mask = models.PositiveSmallIntegerField(default=0, editable=False)
     group_size_min = models.PositiveIntegerField(default=1)
     group_size_max = models.PositiveIntegerField(default=15)
 
@@ -72,6 +241,12 @@ class Trip(models.Model):
         max_digits=10, decimal_places=2, null=True, blank=True, help_text="Sale price (leave blank if no discount)"
     )
 
+    # Denormalized selling price, kept in sync by save() and TripQuerySet
+    effective_price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False, help_text="Discounted price if set, else base price"
+    )
+    discount_percent = models.PositiveSmallIntegerField(default=0, editable=False)
+
     # Media
     featured_image = models.ImageField(
         upload_to="trips/featured/", blank=True, null=True, help_text="Main hero image (recommended: 1920x1080)"
@@ -106,10 +281,45 @@ class Trip(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TripQuerySet.as_manager()
+
     class Meta:
         ordering = ["-is_featured", "-created_at"]
         verbose_name = "Trip"
         verbose_name_plural = "Trips"
+        # Partial indexes over published trips, one per public filter/sort.
+        # The first index also serves the sitemap's order.
+        indexes = [
+            models.Index(
+                fields=["-is_featured", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="trip_pub_featured_idx",
+            ),
+            models.Index(
+                fields=["trip_type", "-is_featured", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="trip_pub_type_idx",
+            ),
+            models.Index(
+                fields=["region", "-is_featured", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="trip_pub_region_idx",
+            ),
+            models.Index(
+                fields=["difficulty", "-is_featured", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="trip_pub_difficulty_idx",
+            ),
+            models.Index(
+                fields=["effective_price"], condition=models.Q(is_published=True), name="trip_pub_eff_price_idx"
+            ),
+            models.Index(
+                fields=["season_mask", "-is_featured", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="trip_pub_season_idx",
+            ),
+            models.Index(fields=["duration_days"], condition=models.Q(is_published=True), name="trip_pub_duration_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -120,11 +330,31 @@ class Trip(models.Model):
             self.meta_title = self.title[:70]
         if not self.meta_description:
             self.meta_description = self.overview[:160]
+        self.sync_derived_fields()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = self.with_derived_fields(kwargs["update_fields"])
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("trips:trip_detail", kwargs={"slug": self.slug})
 
+    def sync_derived_fields(self):
+        """Recompute the denormalized price, season and rich-content columns from their sources."""
+        self.effective_price = self.current_price
+        self.discount_percent = self.discount_percentage
+        self.season_mask = season_mask(self.best_seasons)
+        richcontent.render(self)
+
+    @staticmethod
+    def with_derived_fields(fields):
+        """Extend a list of field names with the denormalized columns derived from them."""
+        fields = list(fields)
+        if PRICE_FIELDS.intersection(fields):
+            fields += ["effective_price", "discount_percent"]
+        if "best_seasons" in fields:
+            fields.append("season_mask")
+        return richcontent.with_html_fields("trips.Trip", fields)
+
     @property
     def current_price(self):
         """Return discounted price if available, else base price."""
@@ -137,7 +367,7 @@ class Trip(models.Model):
             return int(((self.price - self.discounted_price) / self.price) * 100)
         return 0
 
-    @property
+    @memoized_property
     def related_guides(self):
         """
         Get blog posts related to this trip.
@@ -161,6 +391,7 @@ class Trip(models.Model):
             .select_related("author")[:5]
         )
 
+    @memoize
     def get_similar_trips(self, limit=4):
         """Get similar trips based on shared tags and region."""
         similar = Trip.objects.filter(is_published=True).exclude(id=self.id)
@@ -1,8 +1,64 @@
 """Views for Trips app."""
-from django.db.models import Q
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Q
 from django.views.generic import DetailView, ListView
 
-from .models import Trip
+from apps.core.catalogue import CatalogueRows, get_catalogue
+from apps.core.pagecache import PageCacheMixin
+
+from .models import PRICE_RANGES, SEASON_BITS, Trip
+
+
+def price_range_q(low, high):
+    """Q object for effective_price in [low, high)."""
+    q = Q()
+    if low is not None:
+        q &= Q(effective_price__gte=low)
+    if high is not None:
+        q &= Q(effective_price__lt=high)
+    return q
+
+
+def parse_price(value):
+    """Parse a ?min_price=/?max_price= value, ignoring junk."""
+    try:
+        return Decimal(value) if value else None
+    except InvalidOperation:
+        return None
+
+
+def filter_by_price(queryset, params):
+    """Apply the ?price=, ?min_price= and ?max_price= filters (selling price)."""
+    price = params.get("price")
+    for value, _label, low, high in PRICE_RANGES:
+        if price == value:
+            queryset = queryset.filter(price_range_q(low, high))
+    min_price = parse_price(params.get("min_price"))
+    if min_price is not None:
+        queryset = queryset.filter(effective_price__gte=min_price)
+    max_price = parse_price(params.get("max_price"))
+    if max_price is not None:
+        queryset = queryset.filter(effective_price__lte=max_price)
+    return queryset
+
+
+def filter_by_season(queryset, params):
+    """Apply the ?season= filter using the indexed season bitmask."""
+    season = params.get("season")
+    if season in SEASON_BITS:
+        queryset = queryset.in_season(season)
+    return queryset
+
+
+def season_facets(counts):
+    """Return [(value, label, count)] for each season from {season: count}."""
+    return [(value, label, counts[value]) for value, label in Trip.SEASON_CHOICES]
+
+
+def price_facets(counts):
+    """Return [(value, label, count)] for each price bucket from {bucket: count}."""
+    return [(value, label, counts[value]) for value, label, _low, _high in PRICE_RANGES]
 
 
 class TripListView(ListView):
@@ -14,6 +70,16 @@ class TripListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
+        from .catalogue import TripCatalogue
+
+        # Serve filters, sorts and facets from the in-memory catalogue when
+        # enabled; only the current page is then loaded. Search uses the ORM.
+        catalogue = get_catalogue(TripCatalogue)
+        if catalogue is not None and not self.request.GET.get("q"):
+            ids, self.facets = catalogue.query(self.request.GET)
+            return CatalogueRows(Trip.objects.filter(is_published=True).select_related("region"), ids)
+        self.facets = None
+
         queryset = Trip.objects.filter(is_published=True).select_related("region")
 
         # Filter by tag
@@ -48,14 +114,21 @@ class TripListView(ListView):
                 Q(title__icontains=search) | Q(overview__icontains=search) | Q(tagline__icontains=search)
             )
 
+        # Filter by season and selling price; each facet is counted with
+        # every filter applied except its own
+        self.price_facet_queryset = filter_by_season(queryset, self.request.GET)
+        self.season_facet_queryset = filter_by_price(queryset, self.request.GET)
+        queryset = filter_by_price(self.price_facet_queryset, self.request.GET)
+
         # Sorting
         sort = self.request.GET.get("sort", "-is_featured")
+        # Ties fall back to the default order so pagination is stable
         if sort == "price_low":
-            queryset = queryset.order_by("price")
+            queryset = queryset.order_by("effective_price", "-is_featured", "-created_at")
         elif sort == "price_high":
-            queryset = queryset.order_by("-price")
+            queryset = queryset.order_by("-effective_price", "-is_featured", "-created_at")
         elif sort == "duration":
-            queryset = queryset.order_by("duration_days")
+            queryset = queryset.order_by("duration_days", "-is_featured", "-created_at")
         else:
             queryset = queryset.order_by("-is_featured", "-created_at")
 
@@ -65,18 +138,32 @@ class TripListView(ListView):
         context = super().get_context_data(**kwargs)
         from apps.core.models import Region, UniversalTag
 
-        context["tags"] = UniversalTag.objects.all()[:20]
-        context["regions"] = Region.objects.filter(parent__isnull=True)[:10]
+        context["tags"] = UniversalTag.objects.cached()[:20]
+        context["regions"] = Region.objects.filter(parent__isnull=True).cached()[:10]
         context["difficulties"] = Trip.DIFFICULTY_CHOICES
+        if self.facets is None:
+            self.facets = {"price": self.get_price_counts(), "season": self.season_facet_queryset.season_counts()}
+        context["price_ranges"] = price_facets(self.facets["price"])
+        context["seasons"] = season_facets(self.facets["season"])
         return context
 
+    def get_price_counts(self):
+        """Return {bucket: count} for each price bucket in a single query."""
+        return self.price_facet_queryset.order_by().aggregate(
+            **{
+                value: Count("id", distinct=True, filter=price_range_q(low, high))
+                for value, _label, low, high in PRICE_RANGES
+            }
+        )
+
 
-class TripDetailView(DetailView):
+class TripDetailView(PageCacheMixin, DetailView):
     """Trip detail page."""
 
     model = Trip
     template_name = "trips/trip_detail.html"
     context_object_name = "trip"
+    page_cache_soft = 300
 
     def get_queryset(self):
         return Trip.objects.filter(is_published=True).select_related("region")
@@ -102,8 +189,18 @@ class HeliTourListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
+        from .catalogue import TripCatalogue
+
+        catalogue = get_catalogue(TripCatalogue)
+        if catalogue is not None:
+            ids, facets = catalogue.query({"season": self.request.GET.get("season")}, trip_type="helicopter")
+            self.season_counts = facets["season"]
+            return CatalogueRows(Trip.objects.filter(is_published=True).select_related("region"), ids)
+
+        self.season_facet_queryset = Trip.objects.filter(is_published=True, trip_type="helicopter")
+        self.season_counts = None
         return (
-            Trip.objects.filter(is_published=True, trip_type="helicopter")
+            filter_by_season(self.season_facet_queryset, self.request.GET)
             .select_related("region")
             .order_by("-is_featured", "-created_at")
         )
@@ -112,5 +209,8 @@ class HeliTourListView(ListView):
         context = super().get_context_data(**kwargs)
         from apps.core.models import Region
 
-        context["regions"] = Region.objects.filter(parent__isnull=True)[:10]
+        context["regions"] = Region.objects.filter(parent__isnull=True).cached()[:10]
+        if self.season_counts is None:
+            self.season_counts = self.season_facet_queryset.season_counts()
+        context["seasons"] = season_facets(self.season_counts)
         return context
@@ -4,6 +4,7 @@ Django settings for SummitX-Django project.
 Content-Commerce Ecosystem with Unified Semantic Architecture.
 """
 import os
+import re
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -55,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.core.middleware.PerformanceInstrumentationMiddleware",  # No-op unless PERFORMANCE_INSTRUMENTATION
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Static files serving
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -64,6 +66,10 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "apps.core.middleware.SiteConfigurationMiddleware",  # Multi-site branding
+    "apps.core.middleware.RequestMemoMiddleware",  # Per-request layer of apps.core.memo
+    "apps.core.middleware.MetricsMiddleware",  # No-op unless METRICS_ENABLED
+    "apps.core.middleware.ProfilingMiddleware",  # No-op unless PROFILING_ENABLED
+    "apps.core.middleware.TemplateQueryDetectorMiddleware",  # No-op unless TEMPLATE_QUERY_DETECTOR
     # 'apps.glossary.middleware.GlossaryAutoLinkerMiddleware',  # Enable when ready
 ]
 
@@ -73,7 +79,6 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -82,10 +87,38 @@ TEMPLATES = [
                 "django.contrib.messages.context_processors.messages",
                 "apps.core.context_processors.site_config",  # Multi-site branding
             ],
+            # Compiled templates are kept per process (the runserver autoreloader
+            # clears them when a template changes)
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
 
+# Optional Jinja2 engine (needs the Jinja2 package) for the hottest templates,
+# ported to jinja2/ under the same names; anything not there falls through to
+# the Django engine.
+JINJA2_ENABLED = os.environ.get("JINJA2_ENABLED", "False") == "True"
+if JINJA2_ENABLED:
+    TEMPLATES.insert(
+        0,
+        {
+            "BACKEND": "django.template.backends.jinja2.Jinja2",
+            "DIRS": [BASE_DIR / "jinja2"],
+            "OPTIONS": {"environment": "apps.core.jinja2.environment", "auto_reload": DEBUG},
+        },
+    )
+
+# Compile every template at worker startup (config/wsgi.py), see apps.core.templating
+TEMPLATE_WARMUP = os.environ.get("TEMPLATE_WARMUP", str(not DEBUG)) == "True"
+
 WSGI_APPLICATION = "config.wsgi.application"
 
 
@@ -121,23 +154,104 @@ else:
     }
 
 # Redis Cache (for high-traffic landing pages)
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
+# Redis when REDIS_URL is set (Docker: shared by the web and worker
+# containers), otherwise a per-process in-memory cache
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "unique-snowflake",
+        }
     }
-}
 
-# Uncomment for production with Redis:
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#         }
-#     }
-# }
+# In-memory columnar catalogue for listing pages (apps.core.catalogue)
+CATALOGUE_ENGINE_ENABLED = os.environ.get("CATALOGUE_ENGINE_ENABLED", "True") == "True"
+
+# Per-request timings (apps.core.instrumentation): Server-Timing header and
+# one log line per request on the "apps.performance" logger.
+# PERFORMANCE_SERVER_TIMING: "staff" (staff users only), "all" or "off"
+PERFORMANCE_INSTRUMENTATION = os.environ.get("PERFORMANCE_INSTRUMENTATION", "False") == "True"
+PERFORMANCE_SERVER_TIMING = os.environ.get("PERFORMANCE_SERVER_TIMING", "staff")
+
+# Prometheus metrics at /metrics, aggregated across workers via per-worker
+# files in METRICS_DIR (apps.core.metrics). Staff or "Authorization: Bearer
+# <METRICS_TOKEN>" required.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "False") == "True"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_DIR = Path(os.environ.get("METRICS_DIR", BASE_DIR / "var" / "metrics"))
+
+# Queryset cache (apps.core.querycache): results of .cached() querysets,
+# invalidated per table on writes. Off switch and default timeout (seconds),
+# which also bounds cross-worker staleness with a per-process cache.
+QUERY_CACHE_ENABLED = os.environ.get("QUERY_CACHE_ENABLED", "True") == "True"
+QUERY_CACHE_TIMEOUT = int(os.environ.get("QUERY_CACHE_TIMEOUT", "300"))
+
+# Memoized model methods (apps.core.memo), cached per content version
+MEMOIZE_ENABLED = os.environ.get("MEMOIZE_ENABLED", "True") == "True"
+
+# Template fragment cache ({% fragment %} and {% cards %} in apps.core.templatetags.fragments),
+# keyed on site configuration and object updated_at
+FRAGMENT_CACHE_ENABLED = os.environ.get("FRAGMENT_CACHE_ENABLED", "True") == "True"
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get("FRAGMENT_CACHE_TIMEOUT", "3600"))
+
+# Database-backed background jobs (apps.core.jobs) run by manage.py run_workers.
+# Off: enqueued tasks run inline once the transaction commits (no worker needed).
+JOBS_ENABLED = os.environ.get("JOBS_ENABLED", "False") == "True"
+JOBS_TIMEOUT = int(os.environ.get("JOBS_TIMEOUT", "600"))  # seconds before a running job is presumed dead
+JOBS_RETRY_DELAY = 30  # seconds before the first retry, doubled per attempt
+JOBS_KEEP_DAYS = 7  # finished jobs are deleted after this many days
+
+# Width-stepped AVIF/WebP/JPEG variants of uploaded images (apps.core.images),
+# generated on save and served by {% responsive_image %}
+RESPONSIVE_IMAGES_ENABLED = os.environ.get("RESPONSIVE_IMAGES_ENABLED", "True") == "True"
+
+# Stale-while-revalidate page cache (apps.core.pagecache) for anonymous GETs
+# of views using PageCacheMixin; expiry and lock timeouts are set per view.
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "True") == "True"
+
+# Request profiler (apps.core.profiling): cProfile a PROFILING_SAMPLE_RATE
+# fraction of requests, and/or keep stack-sampled profiles of requests slower
+# than PROFILING_SLOW_MS. Browse at /admin/profiles/.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_SLOW_MS = int(os.environ["PROFILING_SLOW_MS"]) if os.environ.get("PROFILING_SLOW_MS") else None
+PROFILING_INTERVAL_MS = 5
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", "100"))
+PROFILING_DIR = Path(os.environ.get("PROFILING_DIR", BASE_DIR / "var" / "profiles"))
+
+# Memory diagnostics (apps.core.diagnostics): per-worker snapshots at
+# /admin/memory/ and `manage.py memory_report`. MEMORY_TRACEMALLOC > 0 starts
+# tracemalloc at startup with that many frames (adds CPU and memory overhead).
+MEMORY_TRACEMALLOC = int(os.environ.get("MEMORY_TRACEMALLOC", "0"))
+MEMORY_SNAPSHOT_DIR = Path(os.environ.get("MEMORY_SNAPSHOT_DIR", BASE_DIR / "var" / "memory"))
+
+# Template lazy-query detector (apps.core.template_queries), debug/test only:
+# "off", "log" (report queries run from templates) or "raise" (fail requests
+# over TEMPLATE_QUERY_BUDGET template queries or with an N+1 pattern)
+TEMPLATE_QUERY_DETECTOR = os.environ.get("TEMPLATE_QUERY_DETECTOR", "off")
+TEMPLATE_QUERY_BUDGET = int(os.environ["TEMPLATE_QUERY_BUDGET"]) if os.environ.get("TEMPLATE_QUERY_BUDGET") else None
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "apps.performance": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "apps.jobs": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
 
 
 # Password validation
@@ -164,9 +278,20 @@ STATIC_URL = "static/"
 STATIC_ROOT = os.environ.get("STATIC_ROOT", BASE_DIR / "staticfiles")
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
-# WhiteNoise for static files (production only)
+# WhiteNoise for static files (production only): hashed names plus .gz/.br copies
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
 if not DEBUG:
-    STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    STORAGES["staticfiles"]["BACKEND"] = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+
+# Build-time asset pipeline (build_assets, collectstatic, compress; see Dockerfile):
+# purged Tailwind CSS, vendored JS and self-hosted fonts instead of the CDNs. Defaults on in
+# images built with the Tailwind CLI pinned in assets.lock.json, which the Dockerfile marks
+ASSETS_PIPELINE = os.environ.get("ASSETS_PIPELINE", str((BASE_DIR / ".assets-pipeline").exists())) == "True"
+# Inline each page type's above-the-fold CSS and load the full stylesheet asynchronously
+CRITICAL_CSS_ENABLED = os.environ.get("CRITICAL_CSS_ENABLED", "True") == "True"
 
 # Django Compressor
 STATICFILES_FINDERS = [
@@ -175,6 +300,13 @@ STATICFILES_FINDERS = [
     "compressor.finders.CompressorFinder",
 ]
 COMPRESS_ENABLED = True
+COMPRESS_OFFLINE = ASSETS_PIPELINE
+COMPRESS_STORAGE = "apps.core.storage.PrecompressedCompressorFileStorage"
+
+
+def WHITENOISE_IMMUTABLE_FILE_TEST(path, url):  # noqa: N802
+    """Compressor bundles (CACHE/) and manifest-hashed files never change."""
+    return url.startswith(f"/{STATIC_URL}CACHE/") or re.search(r"\.[0-9a-f]{12}\.\w+$", url) is not None
 
 
 # Media files (uploads)
@@ -395,6 +527,22 @@ UNFOLD = {
                     },
                 ],
             },
+            {
+                "title": "Performance",
+                "separator": True,
+                "items": [
+                    {
+                        "title": "Request Profiles",
+                        "icon": "speed",
+                        "link": "/admin/profiles/",
+                    },
+                    {
+                        "title": "Memory",
+                        "icon": "memory",
+                        "link": "/admin/memory/",
+                    },
+                ],
+            },
         ],
     },
 }
@@ -8,11 +8,14 @@ from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path
 
 from apps.core.sitemaps import sitemaps
+from apps.core.views import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     # Sitemap for SEO
     path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="django.contrib.sitemaps.views.sitemap"),
+    # Prometheus metrics (protected; see apps.core.metrics)
+    path("metrics", metrics_view, name="metrics"),
     # App URLs
     path("", include("apps.core.urls", namespace="core")),
     path("trips/", include("apps.trips.urls", namespace="trips")),
@@ -0,0 +1,38 @@
+// Tailwind Play CDN theme, shared by every site (brand colors come from the site theme CSS)
+tailwind.config = {
+    theme: {
+        extend: {
+            colors: {
+                'himalaya': {
+                    50: '#f0fdf9',
+                    100: '#ccfbef',
+                    200: '#99f6df',
+                    300: '#5eeacb',
+                    400: '#2dd4b3',
+                    500: '#14b899',
+                    600: '#0d947c',
+                    700: '#0f7665',
+                    800: '#115e52',
+                    900: '#134e44',
+                    950: '#042f29',
+                },
+                'peak': {
+                    50: '#faf5ff',
+                    100: '#f3e8ff',
+                    200: '#e9d4ff',
+                    300: '#d8b4fe',
+                    400: '#c084fc',
+                    500: '#a855f7',
+                    600: '#9333ea',
+                    700: '#7c3aed',
+                    800: '#6d28d9',
+                    900: '#581c87',
+                }
+            },
+            fontFamily: {
+                'display': ['Inter', 'system-ui', 'sans-serif'],
+                'body': ['Inter', 'system-ui', 'sans-serif'],
+            },
+        }
+    }
+};
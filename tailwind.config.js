@@ -0,0 +1,14 @@
+// Tailwind CLI config for the build-time asset pipeline (python manage.py build_assets).
+// The theme is shared with the Play CDN config used in development.
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const sandbox = { tailwind: {} };
+vm.runInNewContext(fs.readFileSync(path.join(__dirname, "static/js/tailwind.config.js"), "utf8"), sandbox);
+
+module.exports = {
+    ...sandbox.tailwind.config,
+    // Only classes used in these files end up in the stylesheet
+    content: ["./templates/**/*.html", "./jinja2/**/*.html", "./apps/**/templates/**/*.html"],
+};